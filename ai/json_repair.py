@@ -0,0 +1,161 @@
+"""
+ai/json_repair.py
+Local repair of defective JSON replies (stray fences or prose around the object,
+trailing text, unterminated strings, truncated arrays/objects, raw newlines in
+strings) so a bad reply does not cost a full regeneration. Values cut short by a
+truncation are reported, so only those are requested again.
+"""
+
+import json
+
+# How many element boundaries to try when cutting back a truncated reply
+MAX_CUTS = 50
+
+_CLOSE = {"{": "}", "[": "]"}
+
+
+def _closers(stack):
+    return "".join(_CLOSE[c] for c in reversed(stack))
+
+
+def _cut_paths(containers, partial_value, last_char):
+    """
+    Key paths of the values a completion leaves incomplete: the value that was being
+    written when the reply stopped, and an array of plain values that stopped early.
+    """
+    path = tuple(key for _, key, _ in containers)
+    paths = []
+    if partial_value:
+        paths.append(path)
+    elif containers and containers[-1][0] == "[" and last_char not in "}]":
+        paths.append(path[:-1])
+    return paths
+
+
+def _closing_candidates(body):
+    """Yields (candidate, fix, cut_paths) completions for a reply that stops inside the object."""
+    # One [bracket, current key or index, expecting a key] per open container
+    containers = []
+    in_string = False
+    string_is_key = False
+    string_start = 0
+    escape = False
+    last_char = ""
+    cuts = []
+    for i, char in enumerate(body):
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+                last_char = char
+                if string_is_key:
+                    try:
+                        containers[-1][1] = json.loads(body[string_start:i + 1], strict=False)
+                    except json.JSONDecodeError:
+                        containers[-1][1] = body[string_start + 1:i]
+            continue
+        if char == '"':
+            in_string = True
+            string_start = i
+            string_is_key = bool(containers) and containers[-1][0] == "{" and containers[-1][2]
+        elif char in "{[":
+            containers.append([char, 0 if char == "[" else None, char == "{"])
+        elif char in "}]":
+            if containers:
+                containers.pop()
+            if not containers:
+                return  # The object is closed: the defect is a syntax error, not a truncation
+        elif char == ",":
+            cuts.append((i, [c[0] for c in containers], _cut_paths(containers, False, last_char)))
+            if containers[-1][0] == "[":
+                containers[-1][1] += 1
+            else:
+                containers[-1][2] = True
+        elif char == ":":
+            containers[-1][2] = False
+        if not char.isspace() and char != ",":
+            last_char = char
+
+    stack = [c[0] for c in containers]
+    expects_value = not (containers[-1][0] == "{" and containers[-1][2])
+    # 1. Close the open string and every open bracket where the reply stopped
+    tail = body[:-1] if escape else body
+    if in_string:
+        yield (tail + '"' + _closers(stack), "unterminated string",
+               _cut_paths(containers, not string_is_key, last_char))
+    else:
+        # A number or literal at the very end may have been cut short too
+        partial = expects_value and last_char not in '"}]:' and not body.rstrip().endswith(",")
+        yield (tail.rstrip().rstrip(",") + _closers(stack), "truncated structure",
+               _cut_paths(containers, partial, last_char))
+
+    # 2. Drop the last (incomplete) element, e.g. a dangling key or half a number
+    for i, cut_stack, paths in reversed(cuts[-MAX_CUTS:]):
+        yield body[:i] + _closers(cut_stack), "truncated structure (last element dropped)", paths
+
+
+def drop_paths(value, paths):
+    """
+    Removes the values a repair had to cut short, so validation reports them as missing
+    instead of accepting half a document. A cut list item removes the whole list.
+    """
+    for path in paths:
+        parent, key = None, None
+        node = value
+        for step in path:
+            if isinstance(node, dict) and step in node:
+                parent, key = node, step
+            elif not (isinstance(node, list) and isinstance(step, int) and step < len(node)):
+                break
+            node = node[step]
+        if parent is not None:
+            parent.pop(key, None)
+    return value
+
+
+def repair_json(text):
+    """
+    Parses a model reply, repairing common defects.
+
+    Returns:
+        tuple: (value, fixes, cut) where fixes lists the repairs applied (empty for clean JSON)
+        and cut holds the key paths of values the repair closed early, e.g.
+        ('files', 'cover_letter_md') for a reply that stopped inside the cover letter.
+
+    Raises:
+        ValueError: If no JSON value can be recovered.
+    """
+    text = str(text or "")
+    start = min((i for i in (text.find("{"), text.find("[")) if i >= 0), default=-1)
+    if start < 0:
+        raise ValueError("no JSON object in the reply")
+
+    fixes = []
+    preamble = text[:start].strip()
+    if preamble:
+        fixes.append("stray fences" if preamble.strip("`").lower() in ("", "json") else "leading text")
+
+    body = text[start:]
+    # strict=False accepts raw newlines/tabs inside strings
+    decoder = json.JSONDecoder(strict=False)
+    try:
+        value, end = decoder.raw_decode(body)
+        trailing = body[end:].strip()
+        if trailing and trailing.strip("`"):
+            fixes.append("trailing text")
+        elif trailing and "stray fences" not in fixes:
+            fixes.append("stray fences")
+        return value, fixes, []
+    except json.JSONDecodeError:
+        pass
+
+    for candidate, fix, cut in _closing_candidates(body.rstrip().rstrip("`").rstrip()):
+        try:
+            value, _ = decoder.raw_decode(candidate)
+        except json.JSONDecodeError:
+            continue
+        return value, fixes + [fix], cut
+    raise ValueError("reply is not repairable JSON")
@@ -0,0 +1,154 @@
+"""
+ai/prompt_cache.py
+Reuse of the invariant prompt prefix (rules, schema and resume) across jobs.
+ResumeSource keeps the resume in memory and reloads it only when the file
+changes; ContextCache implementations hand out a provider-side cache handle for
+a prefix so only the per-job suffix is sent (and billed at the full rate).
+"""
+
+import os
+import time
+import hashlib
+from core.jd_cleaner import estimate_tokens
+from core.usage_tracker import key_id
+
+
+class ResumeSource:
+    """Resume text and digest, re-read only when the file's mtime or size changes."""
+
+    def __init__(self, path="assets/resume.txt"):
+        self.path = path
+        self._stamp = None
+        self.text = None
+        self.digest = None
+
+    def load(self):
+        """Returns (text, digest). Raises FileNotFoundError if the resume is missing."""
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"❌ Resume not found at {self.path}")
+        stat = os.stat(self.path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp != self._stamp:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.text = f.read()
+            self.digest = hashlib.sha256(self.text.encode("utf-8")).hexdigest()
+            if self._stamp is not None:
+                print(f"📝 Resume changed on disk; prompt prefix rebuilt ({self.digest[:8]}).")
+            self._stamp = stamp
+        return self.text, self.digest
+
+
+class ContextCache:
+    """
+    Provider-side cache of a prompt prefix.
+
+    get() returns a handle to pass as 'cached_content' (the prefix is then not sent),
+    or None to send the prefix inline.
+    """
+
+    def __init__(self):
+        self.stats = {"hits": 0, "created": 0, "inline": 0}
+        self._unsupported = set()  # (key id, model) pairs that always send the prefix inline
+
+    def get(self, client, api_key, model, prefix):
+        raise NotImplementedError
+
+    def invalidate(self, api_key, model):
+        """Forgets the handle for a key/model (e.g. the provider expired it early)."""
+
+    def disable(self, api_key, model):
+        """Stops caching for a key/model (e.g. the provider keeps rejecting its caches)."""
+        self.invalidate(api_key, model)
+        self._unsupported.add((key_id(api_key), model))
+
+
+class GeminiContextCache(ContextCache):
+    """
+    Explicit Gemini context caching (client.caches).
+    Caches belong to the API key's project, so handles are kept per key and model.
+    Prefixes below the model's minimum size, or models/tiers without caching, fall
+    back to inline prefixes (which still benefit from implicit prefix caching).
+    """
+
+    def __init__(self, ttl_seconds=None, min_tokens=None, clock=time.time):
+        super().__init__()
+        self.ttl = int(ttl_seconds if ttl_seconds is not None else os.getenv("AI_CONTEXT_CACHE_TTL", "3600"))
+        self.min_tokens = int(min_tokens if min_tokens is not None else os.getenv("AI_CONTEXT_CACHE_MIN_TOKENS", "1024"))
+        self.clock = clock
+        self._entries = {}  # (key id, model) -> {'digest', 'name', 'expires'}
+
+    def get(self, client, api_key, model, prefix):
+        slot = (key_id(api_key), model)
+        digest = hashlib.sha256(prefix.encode("utf-8")).hexdigest()[:16]
+        entry = self._entries.get(slot)
+        # Renew a minute early so a call never references an expiring cache
+        if entry and entry["digest"] == digest and entry["expires"] - 60 > self.clock():
+            self.stats["hits"] += 1
+            return entry["name"]
+
+        if slot in self._unsupported or estimate_tokens(prefix) < self.min_tokens:
+            self.stats["inline"] += 1
+            return None
+
+        try:
+            cache = client.caches.create(model=model, config={
+                "contents": [prefix],
+                "ttl": f"{self.ttl}s",
+                "display_name": f"job-automator-{digest}"
+            })
+        except Exception as e:
+            print(f"⚠️ Context cache unavailable for {model} ({e}); sending the prefix inline.")
+            self._unsupported.add(slot)
+            self.stats["inline"] += 1
+            return None
+
+        if entry:
+            # The resume (or the rules) changed: drop the superseded cache
+            try:
+                client.caches.delete(name=entry["name"])
+            except Exception:
+                pass
+        self._entries[slot] = {"digest": digest, "name": cache.name, "expires": self.clock() + self.ttl}
+        self.stats["created"] += 1
+        return cache.name
+
+    def invalidate(self, api_key, model):
+        self._entries.pop((key_id(api_key), model), None)
+
+
+class LocalContextCache(ContextCache):
+    """In-memory stand-in with the same contract, for tests (resolve() gives the prefix back)."""
+
+    def __init__(self):
+        super().__init__()
+        self.prefixes = {}
+
+    def get(self, client, api_key, model, prefix):
+        if (key_id(api_key), model) in self._unsupported:
+            self.stats["inline"] += 1
+            return None
+        name = f"local/{key_id(api_key)}/{model}/{hashlib.sha256(prefix.encode('utf-8')).hexdigest()[:16]}"
+        if name in self.prefixes:
+            self.stats["hits"] += 1
+        else:
+            self.prefixes[name] = prefix
+            self.stats["created"] += 1
+        return name
+
+    def resolve(self, name):
+        return self.prefixes[name]
+
+
+CONTEXT_CACHES = {
+    "gemini": GeminiContextCache,
+}
+
+
+def get_context_cache(name=None):
+    """Context cache selected by AI_CONTEXT_CACHE ('off' by default)."""
+    name = (name or os.getenv("AI_CONTEXT_CACHE", "off")).lower()
+    if name in ("", "off", "none", "false"):
+        return None
+    if name not in CONTEXT_CACHES:
+        raise ValueError(f"Unknown context cache '{name}'. Available: {', '.join(CONTEXT_CACHES)}")
+    return CONTEXT_CACHES[name]()
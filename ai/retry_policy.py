@@ -0,0 +1,180 @@
+"""
+ai/retry_policy.py
+Retry decisions for Gemini calls.
+SDK errors are classified (rate limit, transient server error, timeout, permanent),
+retried with jittered exponential backoff that honours the server's retry hint,
+and a circuit breaker stops the run from hammering an unhealthy API.
+Every decision is counted in RetryPolicy.metrics for the run report.
+"""
+
+import os
+import re
+import time
+import random
+from collections import Counter
+
+RATE_LIMIT = "rate_limit"
+TRANSIENT = "transient"
+TIMEOUT = "timeout"
+PERMANENT = "permanent"
+
+_RATE_LIMIT_CODES = {429}
+_TRANSIENT_CODES = {500, 502, 503}
+_TIMEOUT_CODES = {504, 408}
+_RATE_LIMIT_WORDS = ("resource_exhausted", "rate limit", "quota", "too many requests")
+_TRANSIENT_WORDS = ("unavailable", "internal error", "overloaded", "connection reset", "connection aborted",
+                    "bad gateway", "server error")
+_TIMEOUT_WORDS = ("deadline_exceeded", "deadline exceeded", "timed out", "timeout")
+
+# "retryDelay": "17s" (google.rpc.RetryInfo) or "retry after 30 seconds" / "Retry-After: 30"
+_RETRY_DELAY_RE = re.compile(r"retry[_ ]?delay['\"]?\s*[:=]\s*['\"]?(\d+(?:\.\d+)?)s", flags=re.IGNORECASE)
+_RETRY_AFTER_RE = re.compile(r"retry[- ]after:?\s*(\d+(?:\.\d+)?)", flags=re.IGNORECASE)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the API while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive transient/timeout failures and rejects calls
+    for `reset_timeout` seconds; then a single trial call decides whether it closes again.
+    """
+
+    def __init__(self, threshold=None, reset_timeout=None, clock=time.monotonic):
+        self.threshold = int(threshold if threshold is not None else os.getenv("AI_BREAKER_THRESHOLD", "5"))
+        self.reset_timeout = float(reset_timeout if reset_timeout is not None
+                                   else os.getenv("AI_BREAKER_RESET", "120"))
+        self.clock = clock
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = None
+
+    def allow(self):
+        if self.state == "open":
+            if self.clock() - self.opened_at < self.reset_timeout:
+                return False
+            self.state = "half_open"
+        return True
+
+    def retry_in(self):
+        """Seconds until the next trial call is allowed."""
+        if self.state != "open":
+            return 0.0
+        return max(0.0, self.reset_timeout - (self.clock() - self.opened_at))
+
+    def record_success(self):
+        self.state = "closed"
+        self.failures = 0
+
+    def record_failure(self):
+        """Returns True when this failure trips the breaker."""
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.threshold:
+            tripped = self.state != "open"
+            self.state = "open"
+            self.opened_at = self.clock()
+            return tripped
+        return False
+
+
+class RetryPolicy:
+    """
+    Attributes:
+        max_attempts (int): Retries allowed per call for transient errors, timeouts and rate limits.
+        base_delay / max_delay (float): Exponential backoff bounds (full jitter).
+        max_wait (float): Longest server retry hint worth waiting for; longer means the quota is gone.
+        metrics (Counter): Decisions taken, e.g. 'retry.transient', 'rotate', 'wait_s', 'breaker.trip'.
+    """
+
+    def __init__(self, max_attempts=None, base_delay=None, max_delay=None, max_wait=None,
+                 breaker=None, sleep=time.sleep):
+        self.max_attempts = int(max_attempts if max_attempts is not None
+                                else os.getenv("AI_RETRY_MAX_ATTEMPTS", "4"))
+        self.base_delay = float(base_delay if base_delay is not None else os.getenv("AI_RETRY_BASE_DELAY", "1"))
+        self.max_delay = float(max_delay if max_delay is not None else os.getenv("AI_RETRY_MAX_DELAY", "60"))
+        self.max_wait = float(max_wait if max_wait is not None else os.getenv("AI_RETRY_MAX_WAIT", "90"))
+        self.breaker = breaker or CircuitBreaker()
+        self.sleep = sleep
+        self.metrics = Counter()
+
+    @staticmethod
+    def classify(error):
+        """Maps an SDK/network exception to RATE_LIMIT, TRANSIENT, TIMEOUT or PERMANENT."""
+        code = getattr(error, "code", None) or getattr(error, "status_code", None)
+        if isinstance(code, int):
+            if code in _RATE_LIMIT_CODES:
+                return RATE_LIMIT
+            if code in _TIMEOUT_CODES:
+                return TIMEOUT
+            if code in _TRANSIENT_CODES:
+                return TRANSIENT
+        if isinstance(error, TimeoutError):
+            return TIMEOUT
+        if isinstance(error, ConnectionError):
+            return TRANSIENT
+
+        message = f"{type(error).__name__} {error}".lower()
+        if "429" in message or any(w in message for w in _RATE_LIMIT_WORDS):
+            return RATE_LIMIT
+        if any(w in message for w in _TIMEOUT_WORDS):
+            return TIMEOUT
+        if re.search(r"\b50[023]\b", message) or any(w in message for w in _TRANSIENT_WORDS):
+            return TRANSIENT
+        return PERMANENT
+
+    @staticmethod
+    def retry_after(error):
+        """Server-provided wait in seconds (RetryInfo or Retry-After), or None."""
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None) or {}
+        try:
+            header = headers.get("retry-after") or headers.get("Retry-After")
+            if header:
+                return float(header)
+        except (TypeError, ValueError, AttributeError):
+            pass
+        message = str(error)
+        match = _RETRY_DELAY_RE.search(message) or _RETRY_AFTER_RE.search(message)
+        return float(match.group(1)) if match else None
+
+    def backoff(self, attempt, hint=None):
+        """Full-jitter exponential delay, never shorter than the server hint."""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        return max(delay, hint) if hint is not None else delay
+
+    def before_call(self):
+        if not self.breaker.allow():
+            self.metrics["breaker.rejected"] += 1
+            raise CircuitOpenError(f"API marked unhealthy; next trial in {self.breaker.retry_in():.0f}s")
+
+    def record_success(self):
+        self.breaker.record_success()
+        self.metrics["success"] += 1
+
+    def decide(self, error, attempt):
+        """
+        Returns (kind, delay): delay is the wait before retrying, or None when the
+        call must not be retried (permanent error, attempts used up, or a quota
+        whose retry hint is longer than max_wait).
+        """
+        kind = self.classify(error)
+        if kind == PERMANENT:
+            self.metrics["fail.permanent"] += 1
+            return kind, None
+
+        if kind in (TRANSIENT, TIMEOUT) and self.breaker.record_failure():
+            self.metrics["breaker.trip"] += 1
+
+        hint = self.retry_after(error)
+        daily_quota = kind == RATE_LIMIT and "perday" in str(error).lower().replace("_", "")
+        if attempt >= self.max_attempts or daily_quota or (hint is not None and hint > self.max_wait):
+            self.metrics[f"fail.{kind}"] += 1
+            return kind, None
+
+        self.metrics[f"retry.{kind}"] += 1
+        return kind, self.backoff(attempt, hint)
+
+    def wait(self, delay):
+        self.metrics["wait_s"] += round(delay, 2)
+        self.sleep(delay)
@@ -0,0 +1,97 @@
+"""
+ai/schema.py
+Validation of the generation prompts' output schema (RESULT_SCHEMA).
+Fields are checked (and coerced when the intent is clear, e.g. "7/10" -> 7.0) so
+JobFileManager never receives silently missing sections; whatever cannot be
+fixed is reported per section for a targeted follow-up request.
+"""
+
+import re
+import json
+
+# section -> field -> kind
+RESULT_FIELDS = {
+    "scores": {"original": "score", "tailored": "score"},
+    "analysis": {"fit_report": "text", "gaps": "list", "mitigation_strategy": "text"},
+    "files": {"tailored_resume_md": "document", "cover_letter_md": "document"},
+}
+_TEMPLATES = {"score": 0, "text": "", "list": [], "document": ""}
+
+_NUMBER_RE = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+def _coerce(kind, value):
+    """Returns (ok, value) for one field."""
+    if kind == "score":
+        if isinstance(value, bool):
+            return False, value
+        if isinstance(value, (int, float)):
+            return 0 <= value <= 10, value
+        match = _NUMBER_RE.search(str(value or ""))
+        if match and 0 <= float(match.group(0)) <= 10:
+            return True, float(match.group(0))
+        return False, value
+    if kind == "list":
+        if isinstance(value, list):
+            return True, [str(v) for v in value]
+        if isinstance(value, str) and value.strip():
+            return True, [part.strip() for part in re.split(r"\n|\|", value) if part.strip()]
+        return False, value
+    if kind == "text":
+        if isinstance(value, list):
+            return True, "\n".join(str(v) for v in value)
+        return isinstance(value, str), value
+    # document: must hold actual content
+    return isinstance(value, str) and bool(value.strip()), value
+
+
+def validate_result(result, required=None):
+    """
+    Validates a parsed reply in place.
+
+    Args:
+        result (dict): Parsed AI reply (coerced values are written back).
+        required (dict): section -> fields to check; defaults to the full RESULT_FIELDS.
+
+    Returns:
+        dict: section -> list of missing/invalid fields. Empty when the reply is valid.
+    """
+    required = required or {section: list(fields) for section, fields in RESULT_FIELDS.items()}
+    # Metadata is optional per field (the report shows what is there); it only has to be a dict
+    if not isinstance(result.get("metadata"), dict):
+        result["metadata"] = {}
+
+    problems = {}
+    for section, fields in required.items():
+        data = result.get(section)
+        if not isinstance(data, dict):
+            problems[section] = list(fields)
+            continue
+        for field in fields:
+            ok, value = _coerce(RESULT_FIELDS[section][field], data.get(field))
+            if ok:
+                data[field] = value
+            else:
+                problems.setdefault(section, []).append(field)
+    return problems
+
+
+def followup_template(problems):
+    """JSON template of only the sections/fields a follow-up request must return."""
+    return json.dumps({
+        section: {field: _TEMPLATES[RESULT_FIELDS[section][field]] for field in fields}
+        for section, fields in problems.items()
+    }, indent=4)
+
+
+def merge_sections(result, patch, problems):
+    """Copies the requested fields of a follow-up reply into the original result."""
+    for section, fields in problems.items():
+        if not isinstance(result.get(section), dict):
+            result[section] = {}
+        answer = patch.get(section) if isinstance(patch, dict) else None
+        if isinstance(answer, dict):
+            for field in fields:
+                if field in answer:
+                    result[section][field] = answer[field]
+    return result
@@ -0,0 +1,190 @@
+"""
+ai/stream_parser.py
+Incremental parser for streamed JSON responses.
+Top-level sections of the AI reply ('metadata', 'scores', 'analysis', 'files')
+are returned as soon as their value is complete, and a malformed or truncated
+stream is reported while it is still being received. Text after the complete
+object is kept in the buffer but never fails the reply (repair_json drops it).
+"""
+
+import json
+
+_CLOSERS = {"}": "{", "]": "["}
+_FENCE = "```json"
+
+
+class StreamFormatError(ValueError):
+    """Raised when a streamed reply cannot become the expected JSON object."""
+
+
+class IncrementalJSONParser:
+    """
+    Feed it text chunks; it tracks strings, escapes and nesting so a top-level
+    value is parsed exactly once, when its last character arrives.
+
+    Attributes:
+        sections (dict): Every top-level key/value completed so far.
+        trailing_text (str): Anything but a closing fence received after the object.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.sections = {}
+        self.done = False
+        self.trailing_text = ""
+        self._pos = 0
+        self._started = False
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        # Top-level state: 'key' -> 'colon' -> 'value' -> 'comma' -> 'key' ...
+        self._state = "key"
+        self._key = None
+        self._token_start = None
+        self._primitive = False
+        self._end = None
+
+    def feed(self, chunk):
+        """
+        Adds streamed text.
+
+        Returns:
+            list: (key, value) pairs for the top-level sections completed by this chunk.
+        """
+        self.buffer += chunk
+        completed = []
+        while self._pos < len(self.buffer):
+            char = self.buffer[self._pos]
+            if not self._started:
+                self._before_object(char)
+            elif self.done:
+                self._after_object()
+                self._pos = len(self.buffer)
+                return completed
+            else:
+                section = self._step(char)
+                if section:
+                    completed.append(section)
+            self._pos += 1
+        return completed
+
+    def close(self):
+        """Called when the stream ends. Returns the full object or raises StreamFormatError."""
+        if not self.done:
+            raise StreamFormatError(
+                f"stream ended inside the JSON object ({len(self.sections)} sections complete, "
+                f"{len(self.buffer)} chars received)"
+            )
+        return dict(self.sections)
+
+    def _before_object(self, char):
+        if char == "{":
+            self._started = True
+            self._stack.append("{")
+            return
+        # Only an optional ```json fence may precede the object
+        preamble = self.buffer[:self._pos + 1].strip().lower()
+        if preamble and not (_FENCE.startswith(preamble) or preamble == _FENCE):
+            raise StreamFormatError(f"reply does not start with a JSON object: {preamble[:40]!r}")
+
+    def _after_object(self):
+        # A complete object is a valid reply; prose after it ("Let me know if...") is ignored
+        trailing = self.buffer[self._end:].strip()
+        if trailing and not "```".startswith(trailing):
+            self.trailing_text = trailing
+
+    def _step(self, char):
+        depth = len(self._stack)
+
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif char == "\\":
+                self._escape = True
+            elif char == '"':
+                self._in_string = False
+                if depth == 1:
+                    return self._end_top_level_string()
+            return None
+
+        if depth == 1 and self._primitive:
+            if char not in ",}":
+                return None
+            section = self._emit(self.buffer[self._token_start:self._pos])
+            self._primitive = False
+            self._state = "comma"
+            if char == ",":
+                self._state = "key"
+                return section
+            self._close_bracket(char)
+            return section
+
+        if char.isspace():
+            return None
+
+        if char == '"':
+            self._in_string = True
+            if depth == 1:
+                self._expect({"key", "value"}, char)
+                self._token_start = self._pos
+            return None
+
+        if char in "{[":
+            if depth == 1:
+                self._expect({"value"}, char)
+                self._token_start = self._pos
+            self._stack.append(char)
+            return None
+
+        if char in "}]":
+            self._close_bracket(char)
+            if len(self._stack) == 1:
+                # A nested container just closed: the top-level value is complete
+                self._state = "comma"
+                return self._emit(self.buffer[self._token_start:self._pos + 1])
+            if not self._stack and self._state not in ("comma", "key"):
+                raise StreamFormatError(f"object closed while expecting a {self._state}")
+            return None
+
+        if depth == 1:
+            if char == ":":
+                self._expect({"colon"}, char)
+                self._state = "value"
+            elif char == ",":
+                self._expect({"comma"}, char)
+                self._state = "key"
+            else:
+                self._expect({"value"}, char)
+                self._token_start = self._pos
+                self._primitive = True
+                self._state = "primitive"
+        return None
+
+    def _expect(self, states, char):
+        if self._state not in states:
+            raise StreamFormatError(f"unexpected {char!r} at char {self._pos} (expected a {self._state})")
+
+    def _end_top_level_string(self):
+        text = self.buffer[self._token_start:self._pos + 1]
+        if self._state == "key":
+            self._key = json.loads(text)
+            self._state = "colon"
+            return None
+        self._state = "comma"
+        return self._emit(text)
+
+    def _close_bracket(self, char):
+        if not self._stack or self._stack[-1] != _CLOSERS[char]:
+            raise StreamFormatError(f"mismatched {char!r} at char {self._pos}")
+        self._stack.pop()
+        if not self._stack:
+            self.done = True
+            self._end = self._pos + 1
+
+    def _emit(self, text):
+        try:
+            value = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise StreamFormatError(f"section '{self._key}' is not valid JSON: {e}") from e
+        self.sections[self._key] = value
+        return self._key, value
@@ -7,22 +7,79 @@ Includes automatic API key rotation and unique job hashing for deduplication.
 import os
 import json
 import asyncio
-import re
+import time
 from google import genai
 from dotenv import load_dotenv
-from assets.prompts import SYSTEM_PROMPT
+from assets.prompts import (GENERATION_PREFIX, JOB_SUFFIX, ANALYSIS_PREFIX, REWRITE_PREFIX, REWRITE_SUFFIX,
+                            BATCH_SUFFIX, BATCH_JOB_BLOCK, FOLLOWUP_PROMPT, EXTRACTION_FIELD_PROMPTS,
+                            EXTRACTION_SKIPPED, PRESCREEN_PROMPT)
+from ai.stream_parser import IncrementalJSONParser, StreamFormatError
+from ai.json_repair import repair_json, drop_paths
+from ai.retry_policy import RetryPolicy, CircuitOpenError, RATE_LIMIT, PERMANENT
+from ai.prompt_cache import ResumeSource, get_context_cache
+from ai.schema import RESULT_FIELDS, validate_result, followup_template, merge_sections
 from core.key_manager import KeyManager
 from core.utils import generate_job_hash
+from core.prescreen import parse_model_score
+from core.jd_cleaner import estimate_tokens
+from core.usage_tracker import UsageTracker
 
 load_dotenv()
 
+# (context window, max output) tokens per model, used to size batched requests
+MODEL_LIMITS = {
+    "gemini-2.0-flash": (1_048_576, 8_192),
+    "gemini-2.0-flash-lite": (1_048_576, 8_192),
+    "gemini-2.5-flash": (1_048_576, 65_536),
+    "gemini-2.5-flash-lite": (1_048_576, 65_536),
+    "gemini-2.5-pro": (1_048_576, 65_536),
+}
+DEFAULT_MODEL_LIMITS = (1_048_576, 8_192)
+# Scores, analysis, metadata and cover letter on top of the rewritten resume
+BATCH_OUTPUT_OVERHEAD = 1000
+DEFAULT_JD_TOKENS = 1500
+
+# Parts of the schema each staged call is responsible for
+ANALYSIS_FIELDS = {"scores": ["original"], "analysis": list(RESULT_FIELDS["analysis"])}
+REWRITE_FIELDS = {"scores": ["tailored"], "files": list(RESULT_FIELDS["files"])}
+
+
+class QuotaExhaustedError(Exception):
+    """Raised when every key in the pool has hit its rate/quota limit."""
+
+
+class InvalidResultError(Exception):
+    """Raised when a reply misses required sections even after repair and follow-up."""
+
 
 class AIWriter:
-    def __init__(self):
-        """Initializes the AIWriter with KeyManager and API configuration."""
+    def __init__(self, usage=None):
+        """
+        Initializes the AIWriter with KeyManager and API configuration.
+        usage: UsageTracker shared by several writers (API workers); a new one by default.
+        """
         self.key_mgr = KeyManager()
         self.model_name = os.getenv("GEMINI_MODEL_NAME", "gemini-2.0-flash")
         self.resume_path = "assets/resume.txt"
+        # Resume read once (and again only when the file changes); prompt prefixes built from it
+        self.resume = ResumeSource(self.resume_path)
+        self._prefixes = {}
+        # Optional provider-side cache of the prefixes (AI_CONTEXT_CACHE=gemini)
+        self.context_cache = get_context_cache()
+        # Staged mode: cheap model for extraction/scoring/gaps, strong model only for rewrites
+        self.analysis_model = os.getenv("GEMINI_ANALYSIS_MODEL", "gemini-2.0-flash-lite")
+        self.rewrite_model = os.getenv("GEMINI_REWRITE_MODEL", self.model_name)
+        self.rewrite_min_score = float(os.getenv("REWRITE_MIN_SCORE", "5"))
+        self.stage_stats = {}
+        self._batch_clamps = set()
+        self.retry_policy = RetryPolicy()
+        # Per-key token/request accounting (persisted to ai_usage.json)
+        self.usage = usage or UsageTracker()
+        # Quota day the key rotation belongs to; a new day starts again from the first key
+        self._quota_day = self.usage.today()
+        # Streaming mode: sections are handed over as they finish and broken replies retried early
+        self.stream = os.getenv("AI_STREAM", "false").lower() in ("1", "true", "yes")
+        self.stream_retries = int(os.getenv("AI_STREAM_RETRIES", "1"))
         # Initialize the first client
         self._update_client()
 
@@ -33,65 +90,468 @@ class AIWriter:
             raise ValueError("❌ No valid GEMINI_API_KEY found in KeyManager.")
         self.client = genai.Client(api_key=api_key)
 
-    def process_application(self, job_description, job_title, company):
+    def quick_score(self, job_description, job_title, company, model_name):
         """
-        Generates tailored content via Gemini. Rotates API keys on quota limits (429).
-        Returns a dictionary containing the job_hash and generated content.
+        Cheap single-number fit score (0-10) used by the pre-screen for borderline jobs.
+        Returns None if the model reply cannot be parsed or the call fails.
         """
-        if not os.path.exists(self.resume_path):
-            raise FileNotFoundError(f"❌ Resume not found at {self.resume_path}")
-
-        # Generate the unique hash for this specific job posting
-        job_hash = generate_job_hash(company, job_title, job_description)
-
-        with open(self.resume_path, "r", encoding="utf-8") as f:
-            resume_text = f.read()
+        resume_text = self._load_resume()
 
-        full_prompt = SYSTEM_PROMPT.format(
+        prompt = PRESCREEN_PROMPT.format(
             job_title=job_title,
             company=company,
             job_description=job_description,
             resume_text=resume_text
         )
+        try:
+            response = self.client.models.generate_content(model=model_name, contents=prompt)
+            return parse_model_score(response.text)
+        except Exception as e:
+            print(f"⚠️ Pre-screen model error: {e}")
+            return None
+
+    @staticmethod
+    def _extraction_request(known_metadata):
+        """Builds the STEP 1 field list for fields not extracted locally."""
+        missing = [f for f in EXTRACTION_FIELD_PROMPTS if f not in known_metadata]
+        if not missing:
+            return EXTRACTION_SKIPPED
+        return "\n".join(EXTRACTION_FIELD_PROMPTS[f] for f in missing)
+
+    def _load_resume(self):
+        return self.resume.load()[0]
+
+    def _prefix(self, template):
+        """Formats a cacheable prompt prefix with the resume, once per resume version."""
+        resume_text, digest = self.resume.load()
+        key = (template, digest)
+        if key not in self._prefixes:
+            if any(k[1] != digest for k in self._prefixes):
+                self._prefixes.clear()  # Resume changed: old prefixes are stale
+            self._prefixes[key] = template.format(resume_text=resume_text)
+        return self._prefixes[key]
+
+    def _record_stage(self, stage, model_name, seconds, prompt, text, usage):
+        """Accumulates latency and token usage per generation stage, key and job."""
+        prompt_tokens = getattr(usage, "prompt_token_count", None)
+        output_tokens = getattr(usage, "candidates_token_count", None)
+        # Fall back to the local estimate when the SDK does not report usage
+        prompt_tokens = prompt_tokens if prompt_tokens is not None else estimate_tokens(prompt)
+        output_tokens = output_tokens if output_tokens is not None else estimate_tokens(text)
+
+        stats = self.stage_stats.setdefault(stage, {
+            "model": model_name, "calls": 0, "seconds": 0.0, "prompt_tokens": 0, "output_tokens": 0
+        })
+        stats["calls"] += 1
+        stats["seconds"] += seconds
+        stats["prompt_tokens"] += prompt_tokens
+        stats["output_tokens"] += output_tokens
+        stats["cached_tokens"] = stats.get("cached_tokens", 0) + (getattr(usage, "cached_content_token_count", 0) or 0)
+        self.usage.record(self.key_mgr.get_current_key(), model_name, prompt_tokens, output_tokens, seconds)
+
+    def _ensure_budget(self, prompt, model_name):
+        """
+        Rotates away from keys whose daily quota on this model is used up (before they
+        return 429s) and waits when the next call would exceed the per-minute limits.
+        """
+        if self.usage.today() != self._quota_day:
+            self.reset_keys(models=[model_name])
+        while self.usage.is_exhausted(self.key_mgr.get_current_key(), model_name):
+            if not self.key_mgr.rotate():
+                print("🚨 Daily quota used up on every key in the pool.")
+                raise QuotaExhaustedError("daily request budget used up for every key")
+            self.retry_policy.metrics["rotate.budget"] += 1
+            self._update_client()
+
+        # The slot is reserved when no wait is needed, so parallel workers cannot all pass at once
+        while True:
+            delay = self.usage.reserve(self.key_mgr.get_current_key(), model_name, estimate_tokens(prompt))
+            if delay <= 0:
+                break
+            print(f"   🐢 Per-minute limit reached; waiting {delay:.0f}s...")
+            self.retry_policy.metrics["throttle"] += 1
+            self.retry_policy.wait(delay)
 
+    def _models(self, staged=False):
+        return [self.analysis_model, self.rewrite_model] if staged else [self.model_name]
+
+    def reset_keys(self, staged=False, models=None):
+        """
+        Rotation only moves forward within a quota day: goes back to the first key that still
+        has requests left today on one of the models (e.g. at each daemon cycle or a new day).
+        """
+        models = models or self._models(staged)
+        self._quota_day = self.usage.today()
+        index = self.key_mgr.current_index
+        self.key_mgr.reset(lambda key: not all(self.usage.is_exhausted(key, m) for m in models))
+        if self.key_mgr.current_index != index:
+            self._update_client()
+
+    def forecast(self, staged=False):
+        """How many more jobs the keys still ahead in the pool support today (on every model the mode uses)."""
+        return self.usage.forecast(self.key_mgr.keys[self.key_mgr.current_index:], self._models(staged))
+
+    def _stream_response(self, contents, config, model_name, on_section=None):
+        """
+        Streams a JSON reply, handing each top-level section to on_section(key, value)
+        as soon as it is complete. Raises StreamFormatError as soon as the reply breaks.
+        Returns (text, usage_metadata).
+        """
+        parser = IncrementalJSONParser()
+        usage = None
+        try:
+            for chunk in self.client.models.generate_content_stream(
+                model=model_name,
+                contents=contents,
+                config=config
+            ):
+                usage = getattr(chunk, "usage_metadata", None) or usage
+                for key, value in parser.feed(chunk.text or ""):
+                    if on_section:
+                        on_section(key, value)
+            parser.close()
+        except StreamFormatError as e:
+            # Keep what arrived so the last attempt can still be repaired locally
+            e.partial_text = parser.buffer
+            raise
+        return parser.buffer, usage
+
+    def _call_model(self, prompt, model_name=None, stage="full", on_section=None, prefix=None):
+        """
+        Sends a JSON-mode prompt to Gemini and returns the raw response text.
+        prefix is the invariant part of the prompt: with a context cache only its handle
+        is sent, otherwise it is sent inline ahead of the prompt (same bytes every job).
+        Rate limits rotate to the next key; once the pool is used up, short server retry
+        hints are waited out and longer ones raise QuotaExhaustedError. Transient errors
+        and timeouts are retried with backoff (see RetryPolicy); permanent errors raise.
+        In streaming mode, a malformed or truncated reply is retried up to AI_STREAM_RETRIES times,
+        then the partial text is returned for local repair.
+        """
+        model_name = model_name or self.model_name
+        stream_attempts = 0
+        attempt = 0
+        cache_rebuilds = set()
         # Loop to attempt generation with available API keys
         while True:
+            self.retry_policy.before_call()
+            self._ensure_budget(prompt, model_name)
+            contents = prompt
+            config = {'response_mime_type': 'application/json'}
+            cache_name = None
+            if prefix:
+                if self.context_cache:
+                    cache_name = self.context_cache.get(self.client, self.key_mgr.get_current_key(),
+                                                        model_name, prefix)
+                if cache_name:
+                    config['cached_content'] = cache_name
+                else:
+                    contents = prefix + prompt
+
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
 
             try:
                 def call_gemini():
-                    return self.client.models.generate_content(
-                        model=self.model_name,
-                        contents=full_prompt,
-                        config={'response_mime_type': 'application/json'}
+                    if self.stream:
+                        return self._stream_response(contents, config, model_name, on_section)
+                    response = self.client.models.generate_content(
+                        model=model_name,
+                        contents=contents,
+                        config=config
                     )
+                    return response.text, getattr(response, "usage_metadata", None)
 
-                response = loop.run_until_complete(asyncio.to_thread(call_gemini))
-
-                # Clean JSON response from Markdown code blocks
-                clean_text = response.text.strip()
-                if clean_text.startswith("```"):
-                    clean_text = re.sub(r'^```json\s*|```$', '', clean_text, flags=re.MULTILINE).strip()
+                start = time.perf_counter()
+                text, usage = loop.run_until_complete(asyncio.to_thread(call_gemini))
+                self.retry_policy.record_success()
+                self._record_stage(stage, model_name, time.perf_counter() - start,
+                                   (prefix or "") + prompt, text, usage)
+                return text
 
-                parsed_result = json.loads(clean_text)
-                
-                # Attach the hash to the result for synchronization/logging
-                parsed_result["job_hash"] = job_hash
-                return parsed_result
+            except StreamFormatError as e:
+                stream_attempts += 1
+                if stream_attempts > self.stream_retries:
+                    print(f"⚠️ AI stream broken: {e}; repairing what was received.")
+                    return getattr(e, "partial_text", "")
+                print(f"   🔁 Stream broken ({e}); retrying {stream_attempts}/{self.stream_retries}...")
+                continue
 
             except Exception as e:
-                error_msg = str(e).lower()
-                # Check for rate limits (429), quota exhaustion, or service limits
-                if any(x in error_msg for x in ["429", "quota", "limit"]):
-                    if self.key_mgr.rotate():
-                        self._update_client()  # Swap key and update client
-                        continue  # Retry with the new key
+                # A cache handle the provider no longer knows: rebuild it once, then stop caching
+                # for this key/model and send the prefix inline. Either way it costs an attempt.
+                if cache_name and "cache" in str(e).lower() and self.retry_policy.classify(e) == PERMANENT:
+                    attempt += 1
+                    slot = (self.key_mgr.get_current_key(), model_name)
+                    if slot in cache_rebuilds or attempt >= self.retry_policy.max_attempts:
+                        print(f"   ♻️  Context cache rejected again ({e}); sending the prefix inline.")
+                        self.context_cache.disable(*slot)
                     else:
+                        print(f"   ♻️  Context cache rejected ({e}); rebuilding.")
+                        self.context_cache.invalidate(*slot)
+                        cache_rebuilds.add(slot)
+                    continue
+
+                # A rate-limited key is swapped for the next one without waiting
+                if self.retry_policy.classify(e) == RATE_LIMIT and self.key_mgr.rotate():
+                    self.retry_policy.metrics["rotate"] += 1
+                    self._update_client()
+                    continue
+
+                kind, delay = self.retry_policy.decide(e, attempt)
+                if delay is None:
+                    if kind == RATE_LIMIT:
                         print("🚨 All API keys in the pool have been exhausted.")
-                        raise e
+                        raise QuotaExhaustedError(str(e)) from e
+                    print(f"⚠️ AI Generation Error ({kind}): {e}")
+                    raise e
 
-                print(f"⚠️ AI Generation Error: {e}")
-                raise e
+                attempt += 1
+                print(f"   ⏳ {kind.replace('_', ' ')} error; retrying in {delay:.1f}s "
+                      f"({attempt}/{self.retry_policy.max_attempts})")
+                self.retry_policy.wait(delay)
             finally:
-                loop.close()
\ No newline at end of file
+                loop.close()
+
+    @staticmethod
+    def _parse_reply(text):
+        """
+        Parses a model reply, repairing fences, trailing text and truncation locally.
+        Values the repair had to cut short (e.g. half a cover letter) are dropped, so
+        validation reports them and the follow-up regenerates them.
+        Returns {} when nothing is recoverable (every section is then requested again).
+        """
+        try:
+            parsed, fixes, cut = repair_json(text)
+        except ValueError as e:
+            print(f"   ⚠️ Unreadable AI reply ({e}).")
+            return {}
+        if fixes:
+            print(f"   🩹 JSON repaired locally: {', '.join(fixes)}")
+        if cut:
+            print(f"   ✂️  Cut short: {', '.join('.'.join(map(str, path)) for path in cut)}")
+            drop_paths(parsed, cut)
+        return parsed if isinstance(parsed, dict) else {}
+
+    def _ensure_complete(self, result, job_description, job_title, company, required=None, model_name=None):
+        """
+        Validates a reply against the output schema and asks the model only for the
+        sections/fields that are still missing. Raises InvalidResultError if they stay invalid.
+        """
+        problems = validate_result(result, required)
+        if not problems:
+            return result
+
+        wanted = ", ".join(f"{section}.{field}" for section, fields in problems.items() for field in fields)
+        print(f"   🧩 Incomplete reply; requesting only: {wanted}")
+        answered = {k: result[k] for k in ("scores", "analysis") if isinstance(result.get(k), dict)}
+        patch = self._parse_reply(self._call_model(FOLLOWUP_PROMPT.format(
+            job_title=job_title,
+            company=company,
+            answered=json.dumps(answered, indent=4, ensure_ascii=False),
+            template=followup_template(problems),
+            job_description=job_description,
+            resume_text=self._load_resume()
+        ), model_name=model_name, stage="followup"))
+
+        merge_sections(result, patch, problems)
+        remaining = validate_result(result, required)
+        if remaining:
+            raise InvalidResultError(f"AI reply still invalid after follow-up: {remaining}")
+        return result
+
+    @staticmethod
+    def _section_callback(on_section, known_metadata, prefix=""):
+        """Wraps on_section so streamed metadata already includes the locally extracted fields."""
+        if not on_section:
+            return None
+
+        def handle(key, value):
+            if key == "metadata" and isinstance(value, dict):
+                value = {**value, **known_metadata}
+            on_section(prefix + key, value)
+        return handle
+
+    def process_application(self, job_description, job_title, company, known_metadata=None, on_section=None):
+        """
+        Generates tailored content via Gemini. Rotates API keys on quota limits (429).
+        known_metadata holds fields already extracted locally; the AI is only asked for the rest.
+        on_section(key, value) is called as each top-level section finishes (AI_STREAM mode).
+        Returns a dictionary containing the job_hash and generated content.
+        """
+        known_metadata = known_metadata or {}
+        prefix = self._prefix(GENERATION_PREFIX)
+        self.usage.begin_job()
+
+        # Generate the unique hash for this specific job posting
+        job_hash = generate_job_hash(company, job_title, job_description)
+
+        # Only the job part changes between calls; the rules and resume are the cached prefix
+        extraction_fields = self._extraction_request(known_metadata)
+        job_prompt = JOB_SUFFIX.format(
+            job_title=job_title,
+            company=company,
+            extraction_fields=extraction_fields,
+            job_description=job_description
+        )
+
+        parsed_result = self._parse_reply(self._call_model(
+            job_prompt, on_section=self._section_callback(on_section, known_metadata), prefix=prefix))
+        self._ensure_complete(parsed_result, job_description, job_title, company)
+
+        # Locally extracted fields take precedence over (and complete) the AI metadata
+        parsed_result["metadata"] = {**(parsed_result.get("metadata") or {}), **known_metadata}
+
+        # Attach the hash and the tokens spent to the result for synchronization/logging
+        parsed_result["job_hash"] = job_hash
+        parsed_result["usage"] = self.usage.end_job()
+        return parsed_result
+
+    def process_staged(self, job_description, job_title, company, known_metadata=None, on_section=None):
+        """
+        Two-tier generation: the analysis model extracts metadata, scores the original
+        resume and lists gaps; the rewrite model is only called when the score reaches
+        REWRITE_MIN_SCORE. Low-fit jobs come back with empty files and status 'Low Fit'.
+        """
+        known_metadata = known_metadata or {}
+        job_hash = generate_job_hash(company, job_title, job_description)
+        self.usage.begin_job()
+
+        extraction_fields = self._extraction_request(known_metadata)
+        analysis = self._parse_reply(self._call_model(JOB_SUFFIX.format(
+            job_title=job_title,
+            company=company,
+            extraction_fields=extraction_fields,
+            job_description=job_description
+        ), model_name=self.analysis_model, stage="analysis",
+            on_section=self._section_callback(on_section, known_metadata),
+            prefix=self._prefix(ANALYSIS_PREFIX)))
+        self._ensure_complete(analysis, job_description, job_title, company,
+                              required=ANALYSIS_FIELDS, model_name=self.analysis_model)
+
+        result = {
+            "metadata": {**analysis["metadata"], **known_metadata},
+            "scores": {"original": analysis["scores"]["original"], "tailored": None},
+            "analysis": analysis["analysis"],
+            "files": {"tailored_resume_md": "", "cover_letter_md": ""},
+            "job_hash": job_hash
+        }
+
+        original_score = float(result["scores"]["original"])
+        if original_score < self.rewrite_min_score:
+            print(f"   📉 Score {original_score} < {self.rewrite_min_score}: rewrite skipped.")
+            result["status"] = "Low Fit"
+            result["usage"] = self.usage.end_job()
+            return result
+
+        rewrite = self._parse_reply(self._call_model(REWRITE_SUFFIX.format(
+            job_title=job_title,
+            company=company,
+            original_score=original_score,
+            gaps="; ".join(result["analysis"].get("gaps") or []) or "None listed",
+            mitigation_strategy=result["analysis"].get("mitigation_strategy") or "",
+            job_description=job_description
+        ), model_name=self.rewrite_model, stage="rewrite",
+            on_section=self._section_callback(on_section, known_metadata, prefix="rewrite_"),
+            prefix=self._prefix(REWRITE_PREFIX)))
+        self._ensure_complete(rewrite, job_description, job_title, company,
+                              required=REWRITE_FIELDS, model_name=self.rewrite_model)
+
+        result["scores"]["tailored"] = rewrite["scores"]["tailored"]
+        result["files"].update(rewrite["files"])
+        result["usage"] = self.usage.end_job()
+        return result
+
+    def plan_batch_size(self, job_descriptions=()):
+        """
+        How many jobs fit in one batched request for the current model.
+        Output is the binding limit: every job returns a full resume + cover letter.
+        """
+        limit = int(os.getenv("AI_BATCH_SIZE", "1"))
+        if limit <= 1:
+            return 1
+        context_limit, output_limit = MODEL_LIMITS.get(self.model_name, DEFAULT_MODEL_LIMITS)
+        output_limit = int(os.getenv("GEMINI_MAX_OUTPUT_TOKENS", output_limit))
+
+        resume_tokens = estimate_tokens(self._load_resume())
+        per_job_output = int(resume_tokens * 1.1) + BATCH_OUTPUT_OVERHEAD
+        jd_tokens = max([estimate_tokens(jd) for jd in job_descriptions] or [DEFAULT_JD_TOKENS])
+        prompt_tokens = estimate_tokens(GENERATION_PREFIX + BATCH_SUFFIX) + resume_tokens
+
+        by_output = output_limit // per_job_output
+        by_context = (context_limit - prompt_tokens) // (jd_tokens + per_job_output)
+        size = max(1, min(limit, by_output, by_context))
+        if size < limit and (self.model_name, limit, size) not in self._batch_clamps:
+            # Logged once per model/size: otherwise AI_BATCH_SIZE silently does nothing
+            self._batch_clamps.add((self.model_name, limit, size))
+            print(f"   📦 AI_BATCH_SIZE={limit} clamped to {size} for {self.model_name} "
+                  f"(~{per_job_output} output tokens per job, {output_limit} max output).")
+        return size
+
+    def process_batch(self, jobs):
+        """
+        Generates several applications in one request. Resume and rules are sent once, as
+        the same prefix (and context cache) as single-job requests.
+
+        Args:
+            jobs (list): dicts with 'job_description', 'job_title', 'company' and 'known_metadata'.
+
+        Returns:
+            list: one result per job, in the same order. Incomplete members get a targeted
+            follow-up; members missing from the reply fall back to a single-job call.
+            A member that still fails is returned as its exception (the others are kept);
+            QuotaExhaustedError on the shared request propagates.
+        """
+        if len(jobs) == 1:
+            job = jobs[0]
+            return [self.process_application(job["job_description"], job["job_title"], job["company"],
+                                             job.get("known_metadata"))]
+
+        # Rules and resume are the same cached prefix as single jobs; each block names its own fields
+        blocks = []
+        for i, job in enumerate(jobs):
+            known = job.get("known_metadata") or {}
+            missing = [f for f in EXTRACTION_FIELD_PROMPTS if f not in known]
+            blocks.append(BATCH_JOB_BLOCK.format(
+                job_id=f"job{i}",
+                job_title=job["job_title"],
+                company=job["company"],
+                fields=", ".join(missing) or "none",
+                job_description=job["job_description"]
+            ))
+        prompt = BATCH_SUFFIX.format(job_count=len(jobs), jobs_block="".join(blocks))
+
+        self.usage.begin_job()
+        try:
+            members = self._parse_reply(self._call_model(
+                prompt, stage="batch", prefix=self._prefix(GENERATION_PREFIX))).get("jobs", [])
+            by_id = {str(m.get("job_id")): m.get("result") for m in members if isinstance(m, dict)}
+        except (QuotaExhaustedError, CircuitOpenError):
+            raise
+        except Exception as e:
+            print(f"⚠️ Batch reply unusable ({e}); falling back to single-job calls.")
+            by_id = {}
+        # The shared request is split evenly between the jobs it answered
+        served = sum(1 for i in range(len(jobs)) if isinstance(by_id.get(f"job{i}"), dict))
+        batch_usage = self.usage.end_job(jobs=served)
+
+        results = []
+        for i, job in enumerate(jobs):
+            try:
+                results.append(self._batch_member(job, by_id.get(f"job{i}"), batch_usage))
+            except Exception as e:
+                # The members already generated are paid for; only this one is lost
+                print(f"   ❌ Batch member '{job['job_title']}' failed: {e}")
+                results.append(e)
+        return results
+
+    def _batch_member(self, job, result, batch_usage):
+        """Completes one member of a batched reply (or generates it alone when it is missing)."""
+        known = job.get("known_metadata") or {}
+        if not isinstance(result, dict):
+            print(f"   ↩️  Batch member '{job['job_title']}' missing; retrying it alone.")
+            return self.process_application(job["job_description"], job["job_title"], job["company"], known)
+        self._ensure_complete(result, job["job_description"], job["job_title"], job["company"])
+        result["metadata"] = {**result["metadata"], **known}
+        result["job_hash"] = generate_job_hash(job["company"], job["job_title"], job["job_description"])
+        result["usage"] = dict(batch_usage)
+        return result
@@ -0,0 +1,82 @@
+"""
+api_server.py
+Local HTTP entry point for JDs that do not come from LinkedIn (recruiters, other boards).
+
+    python api_server.py
+    curl -X POST localhost:8765/jobs -d '{"company": "Acme", "title": "Data Engineer", "description": "...", "url": ""}'
+    curl localhost:8765/jobs/<id>
+
+Each worker thread owns an AIWriter (its own client and key rotation); the usage
+tracker, the file manager and the PDF render processes are shared.
+"""
+
+from ai.writer import AIWriter, QuotaExhaustedError
+from ai.retry_policy import CircuitOpenError
+from core.file_manager import JobFileManager
+from core.pdf_service import PDFRenderService
+from core.usage_tracker import UsageTracker
+from core.jd_cleaner import JDNormalizer
+from core.metadata_extractor import MetadataExtractor
+from core.job_service import JobService, create_server
+from main import STAGED_GENERATION, load_processed_hashes
+
+
+def build_processor(usage, manager):
+    """Returns the per-worker job function: clean the JD, generate, export."""
+    writer = AIWriter(usage=usage)
+    normalizer = JDNormalizer()
+    extractor = MetadataExtractor()
+    generate = writer.process_staged if STAGED_GENERATION else writer.process_application
+
+    def process(job):
+        job_hash = job.pop("job_hash")
+        clean_description, _ = normalizer.normalize(job["description"])
+        known_metadata = extractor.confident_values(extractor.extract(job["description"]))
+        results = generate(clean_description, job["title"], job["company"], known_metadata)
+        # Same export path as the CLI and daemon: a failed export parks the AI result for replay
+        _, export = manager.submit(job, results, job_hash)
+        folder = export.result()
+        return {
+            "folder": folder,
+            "status": results.get("status", "Generated"),
+            "scores": results.get("scores"),
+            "analysis": results.get("analysis"),
+            "metadata": results.get("metadata"),
+            "usage": results.get("usage")
+        }
+
+    return process
+
+
+def main():
+    pdf_service = PDFRenderService()
+    manager = JobFileManager(pdf_service=pdf_service)
+    usage = UsageTracker()
+
+    service = JobService(lambda: build_processor(usage, manager),
+                         known_hashes=load_processed_hashes(manager.folder_index),
+                         retryable=(QuotaExhaustedError, CircuitOpenError))
+    # AI results whose export failed on a previous run are exported again (no new generation)
+    for job_hash, job_data, ai_res in manager.parked_results():
+        if job_hash in service.known_hashes:
+            manager.clear_partial(job_hash)
+        else:
+            manager.submit(job_data, ai_res, job_hash, on_success=lambda _, h=job_hash: service.known_hashes.add(h))
+    server = create_server(service)
+    service.start()
+
+    host, port = server.server_address[:2]
+    print(f"🌐 Job API listening on http://{host}:{port} (POST /jobs, GET /jobs/<id>). Ctrl+C to stop.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Shutting down (finishing running jobs)...")
+    finally:
+        server.server_close()
+        service.shutdown(wait=True)
+        manager.close()
+        pdf_service.shutdown(wait=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+core/archive.py
+Monthly zip bundles for old job folders (zzz_output/.archive/YYYY-MM.zip).
+Each bundle holds the folders' files plus an internal index (_index/<job_hash>.json)
+so it can be listed without reading the documents. Archived jobs are extracted
+back on demand (ensure_local) when a tool needs their files.
+"""
+
+import os
+import json
+import shutil
+import zipfile
+from datetime import datetime
+
+ARCHIVE_DIR = ".archive"
+INDEX_PREFIX = "_index/"
+
+
+def bundle_name(entry):
+    """Bundle of a job: the month of its folder date (YYYYMMDD prefix), else the current month."""
+    date = entry.get("date") or ""
+    if len(date) >= 6 and date[:6].isdigit():
+        return f"{date[:4]}-{date[4:6]}.zip"
+    return f"{datetime.now():%Y-%m}.zip"
+
+
+class ArchiveStore:
+    def __init__(self, base_path="zzz_output"):
+        self.base_path = base_path
+        self.archive_path = os.path.join(base_path, ARCHIVE_DIR)
+
+    def bundle_path(self, name):
+        return os.path.join(self.archive_path, name)
+
+    def bundles(self):
+        if not os.path.isdir(self.archive_path):
+            return []
+        return sorted(f for f in os.listdir(self.archive_path) if f.endswith(".zip"))
+
+    def iter_index(self):
+        """Yields (bundle, job_hash, manifest) for every archived job (reads only the internal index)."""
+        for name in self.bundles():
+            with zipfile.ZipFile(self.bundle_path(name)) as bundle:
+                for member in bundle.namelist():
+                    if member.startswith(INDEX_PREFIX) and member.endswith(".json"):
+                        manifest = json.loads(bundle.read(member))
+                        yield name, manifest["job_hash"], manifest
+
+    def _same_as_bundle(self, name, folder, folder_path, files):
+        with zipfile.ZipFile(self.bundle_path(name)) as bundle:
+            stored = sorted(os.path.basename(m) for m in bundle.namelist() if m.startswith(f"{folder}/"))
+            if stored != files:
+                return False
+            for filename in files:
+                with open(os.path.join(folder_path, filename), "rb") as f:
+                    if f.read() != bundle.read(f"{folder}/{filename}"):
+                        return False
+        return True
+
+    def _stage(self, name, drop):
+        """
+        Temp copy of a bundle to append to: a byte copy, or a rewrite without the members
+        of `drop` (folder -> job_hash, newer copies of those jobs are about to be added).
+        """
+        path = self.bundle_path(name)
+        tmp_path = f"{path}.tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)  # Left by a crash; the bundle itself is intact
+        if not os.path.exists(path):
+            return tmp_path
+        if not drop:
+            shutil.copyfile(path, tmp_path)
+            return tmp_path
+        dropped = {f"{INDEX_PREFIX}{job_hash}.json" for job_hash in drop.values()}
+        with zipfile.ZipFile(path) as src, \
+                zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED, compresslevel=9) as dst:
+            for info in src.infolist():
+                if info.filename.split("/", 1)[0] in drop or info.filename in dropped:
+                    continue
+                dst.writestr(info, src.read(info.filename))
+        return tmp_path
+
+    def archive(self, job_hash, entry):
+        """
+        Moves a job folder into its monthly bundle and deletes the folder.
+
+        Args:
+            entry (dict): FolderIndex entry ('folder', 'date', 'company', 'title', 'status', 'documents',
+                and 'archive' when a copy was archived before).
+
+        Returns:
+            str: The bundle name.
+        """
+        result = self.archive_many([(job_hash, entry)])[job_hash]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def archive_many(self, jobs):
+        """
+        Moves job folders into their monthly bundles. Each bundle is written once per call:
+        new members go into a temp copy, are verified (only they are read back), and the copy
+        replaces the bundle; folders are deleted only after that, so a crash never leaves a
+        damaged bundle or a job in neither place.
+
+        Args:
+            jobs (list): (job_hash, FolderIndex entry) pairs.
+
+        Returns:
+            dict: job_hash -> bundle name, or the exception that kept the job's folder.
+        """
+        results = {}
+        by_bundle = {}
+        for job_hash, entry in jobs:
+            name = entry.get("archive") or bundle_name(entry)
+            by_bundle.setdefault(name, []).append((job_hash, entry))
+        os.makedirs(self.archive_path, exist_ok=True)
+
+        for name, bundle_jobs in by_bundle.items():
+            pending, drop = [], {}
+            for job_hash, entry in bundle_jobs:
+                folder = entry["folder"]
+                folder_path = os.path.join(self.base_path, folder)
+                try:
+                    files = sorted(f for f in os.listdir(folder_path) if os.path.isfile(os.path.join(folder_path, f)))
+                    if entry.get("archive") and os.path.exists(self.bundle_path(name)):
+                        # Extracted earlier: drop the folder if untouched, else replace the bundled copy
+                        if self._same_as_bundle(name, folder, folder_path, files):
+                            shutil.rmtree(folder_path)
+                            results[job_hash] = name
+                            continue
+                        drop[folder] = job_hash
+                except OSError as e:
+                    results[job_hash] = e
+                    continue
+                pending.append((job_hash, entry, folder_path, files))
+            if not pending:
+                continue
+
+            tmp_path = None
+            try:
+                tmp_path = self._stage(name, drop)
+                added = []
+                with zipfile.ZipFile(tmp_path, "a", zipfile.ZIP_DEFLATED, compresslevel=9) as bundle:
+                    for job_hash, entry, folder_path, files in pending:
+                        manifest = {
+                            "job_hash": job_hash,
+                            "folder": entry["folder"],
+                            "company": entry.get("company"),
+                            "title": entry.get("title"),
+                            "date": entry.get("date"),
+                            "status": entry.get("status"),
+                            "files": files,
+                            "documents": entry.get("documents"),
+                            "archived_at": datetime.now().isoformat()
+                        }
+                        for filename in files:
+                            bundle.write(os.path.join(folder_path, filename), f"{entry['folder']}/{filename}")
+                            added.append(f"{entry['folder']}/{filename}")
+                        bundle.writestr(f"{INDEX_PREFIX}{job_hash}.json", json.dumps(manifest, ensure_ascii=False))
+                        added.append(f"{INDEX_PREFIX}{job_hash}.json")
+
+                # Reading a member back checks its CRC; the members copied over were verified when added
+                with zipfile.ZipFile(tmp_path) as bundle:
+                    stored = set(bundle.namelist())
+                    for member in added:
+                        if member not in stored:
+                            raise IOError(f"{member} missing")
+                        with bundle.open(member) as f:
+                            while f.read(1 << 20):
+                                pass
+                os.replace(tmp_path, self.bundle_path(name))
+            except (OSError, zipfile.BadZipFile) as e:
+                if tmp_path and os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                error = IOError(f"Bundle {name} failed verification ({e}); folders kept.")
+                for job_hash, *_ in pending:
+                    results[job_hash] = error
+                continue
+
+            for job_hash, entry, folder_path, files in pending:
+                shutil.rmtree(folder_path)
+                results[job_hash] = name
+        return results
+
+    def extract(self, entry):
+        """Restores an archived job folder into base_path and returns its path."""
+        folder = entry["folder"]
+        folder_path = os.path.join(self.base_path, folder)
+        with zipfile.ZipFile(self.bundle_path(entry["archive"])) as bundle:
+            members = [m for m in bundle.namelist() if m.startswith(f"{folder}/") and not m.endswith("/")]
+            if not members:
+                raise FileNotFoundError(f"{folder} not found in {entry['archive']}.")
+            os.makedirs(folder_path, exist_ok=True)
+            for member in members:
+                filename = os.path.basename(member)
+                with bundle.open(member) as src, open(os.path.join(folder_path, filename), "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+        return folder_path
+
+    def read(self, entry, filename):
+        """Reads one file of an archived job without extracting the folder."""
+        with zipfile.ZipFile(self.bundle_path(entry["archive"])) as bundle:
+            return bundle.read(f"{entry['folder']}/{filename}")
@@ -2,65 +2,256 @@
 core/file_manager.py
 Handles the creation of directories and persistence of job application data.
 Integrates job_hash for deterministic tracking and prevents duplicate processing.
+Folders are written to a staging directory and renamed into place, so a crash
+never leaves a half-written job; exports can run on a background writer thread
+(EXPORT_WRITE_BEHIND) and Master CSV rows are flushed in batches. The AI result
+of a failed export is parked in .inflight/<hash>/result.json and exported again
+on the next start (parked_results()).
 """
 
 import os
 import json
 import re
-import csv
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
 from datetime import datetime
-from core.pdf_generator import PDFGenerator
+from core.pdf_service import PDFRenderService
+from core.folder_index import FolderIndex
+from core.master_log import MasterLogWriter
+from core.utils import generate_job_hash
+
+STAGING_PREFIX = ".staging-"
+# Previous export of a job while the new one is renamed into place (never removed by _clean_staging)
+BACKUP_PREFIX = ".old-"
 
 
 class JobFileManager:
-    def __init__(self, base_path="zzz_output"):
+    def __init__(self, base_path="zzz_output", pdf_service=None):
         self.base_path = base_path
-        self.pdf_gen = PDFGenerator()
+        # PDFs are rendered in worker processes; the service can be shared between managers
+        self.pdf_service = pdf_service or PDFRenderService()
         # The CSV remains in the project root for safety and easy access
         self.master_csv_path = "applications_master_log.csv"
+        # Rows are buffered and appended in batches (one fsync per flush)
+        self.master_log = MasterLogWriter(self.master_csv_path)
+        # job_hash -> folder lookups for the tools (sync, re-render) without walking base_path
+        self.folder_index = FolderIndex(base_path)
+        # Write-behind: exports run on one background thread so generation never waits on disk
+        self.write_behind = os.getenv("EXPORT_WRITE_BEHIND", "true").lower() in ("1", "true", "yes")
+        self._writer = None
+        self._in_flight = {}  # job_hash -> Future of exports not finished yet
+        self._lock = threading.Lock()
+        self._clean_staging()
 
-    def save_all(self, job_data, ai_res, job_hash):
+    def _clean_staging(self):
         """
-        Saves all job-related files, generates PDFs, and updates the Master CSV.
-        Now requires job_hash to ensure unique identification.
+        Removes folders left half-written by a crash (their AI output stays in .inflight when streamed).
+        A backup left by a crash in the middle of _publish is moved back when the job has no folder.
         """
-        # 1. Folder Setup (YYYYMMDD-Company-Title-HashShort)
+        if not os.path.isdir(self.base_path):
+            return
+        for name in os.listdir(self.base_path):
+            path = os.path.join(self.base_path, name)
+            if name.startswith(STAGING_PREFIX):
+                shutil.rmtree(path, ignore_errors=True)
+                print(f"🧹 Removed unfinished export {name[len(STAGING_PREFIX):]}")
+            elif name.startswith(BACKUP_PREFIX):
+                final_path = os.path.join(self.base_path, name[len(BACKUP_PREFIX):])
+                if os.path.exists(final_path):
+                    shutil.rmtree(path, ignore_errors=True)  # The new export was published
+                else:
+                    os.replace(path, final_path)
+                    print(f"♻️  Restored previous export {name[len(BACKUP_PREFIX):]}")
+
+    def folder_path(self, job_data, job_hash):
+        """Final folder of a job (YYYYMMDD-Company-Title-HashShort)."""
         date_str = datetime.now().strftime("%Y%m%d")
         clean_company = re.sub(r'[\\/*?:"<>|]', "", job_data['company']).replace(' ', '_')
         clean_job_title = re.sub(r'[\\/*?:"<>|]', "", job_data['title']).replace(' ', '_')
+        return os.path.join(self.base_path, f"{date_str}-{clean_company}-{clean_job_title}-{job_hash[:8]}")
 
-        folder_name = f"{date_str}-{clean_company}-{clean_job_title}-{job_hash[:8]}"
-        path = os.path.join(self.base_path, folder_name)
-        os.makedirs(path, exist_ok=True)
+    def submit(self, job_data, ai_res, job_hash, on_success=None):
+        """
+        Queues save_all on the background writer (or runs it inline when EXPORT_WRITE_BEHIND=false).
+
+        Args:
+            on_success (callable): Called with the folder path once the export is complete,
+                while the job still counts as pending (see is_pending).
+
+        Returns:
+            tuple: (final folder path, Future of save_all).
+        """
+        path = self.folder_path(job_data, job_hash)
+        if not self.write_behind:
+            future = Future()
+            try:
+                future.set_result(self._save_or_park(job_data, ai_res, job_hash, path, on_success))
+            except Exception as e:
+                future.set_exception(e)
+            return path, future
+
+        with self._lock:
+            if self._writer is None:
+                self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="export")
+            future = self._writer.submit(self._save_or_park, job_data, ai_res, job_hash, path, on_success)
+            self._in_flight[job_hash] = future
+        future.add_done_callback(lambda _: self._in_flight.pop(job_hash, None))
+        return path, future
+
+    def _save_or_park(self, job_data, ai_res, job_hash, path, on_success=None):
+        try:
+            folder = self.save_all(job_data, ai_res, job_hash, path)
+        except Exception:
+            # Keep the paid-for AI output so the export can be redone without a new generation
+            self.save_partial(job_hash, "result", {"job_hash": job_hash, "job_data": job_data, "ai_res": ai_res})
+            raise
+        if on_success:
+            on_success(folder)
+        return folder
+
+    def parked_results(self):
+        """
+        AI results whose export failed on a previous run (.inflight/<hash>/result.json).
+
+        Returns:
+            list: (job_hash, job_data, ai_res) tuples; the export is redone with submit().
+        """
+        inflight = os.path.join(self.base_path, ".inflight")
+        parked = []
+        for name in sorted(os.listdir(inflight)) if os.path.isdir(inflight) else []:
+            result_path = os.path.join(inflight, name, "result.json")
+            if not os.path.exists(result_path):
+                continue  # Streamed sections of a generation that never finished
+            try:
+                with open(result_path, "r", encoding="utf-8") as f:
+                    result = json.load(f)
+                job_data = result["job_data"]
+                job_hash = result.get("job_hash") or generate_job_hash(
+                    job_data["company"], job_data["title"], job_data["description"])
+            except (OSError, ValueError, KeyError) as e:
+                print(f"   ⚠️  Skipping parked result {name}: {e}")
+                continue
+            parked.append((job_hash, job_data, result["ai_res"]))
+        return parked
+
+    def is_pending(self, job_hash):
+        """True while a job is being exported or its CSV row is not flushed yet."""
+        return job_hash in self._in_flight or job_hash in self.master_log.pending_hashes()
+
+    def drain(self):
+        """Waits for every queued export."""
+        for future in list(self._in_flight.values()):
+            try:
+                future.result()
+            except Exception:
+                pass  # Reported by the submitter's callback
+
+    def close(self):
+        """Finishes queued exports and flushes the Master CSV (clean shutdown)."""
+        if self._writer:
+            self._writer.shutdown(wait=True)
+            self._writer = None
+        self.master_log.close()
+
+    def save_all(self, job_data, ai_res, job_hash, path=None):
+        """
+        Saves all job-related files, generates PDFs, and updates the Master CSV.
+        Now requires job_hash to ensure unique identification.
+        Everything is written to a staging folder first and renamed into place at the end.
+        """
+        # 1. Folder Setup (YYYYMMDD-Company-Title-HashShort)
+        final_path = path or self.folder_path(job_data, job_hash)
+        path = os.path.join(self.base_path, STAGING_PREFIX + os.path.basename(final_path))
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path)
 
         # 2. Data Extraction
         files_data = ai_res.get('files', {})
         resume_md = files_data.get('tailored_resume_md', "")
         cover_letter_md = files_data.get('cover_letter_md', "")
 
-        # 3. Save Physical Markdown Files
+        # 3. Queue PDF rendering first so it runs while the remaining files are written
+        # (analysis-only results from the staged mode have no documents to render)
+        documents = {
+            f"Resume_{job_data['title']}": resume_md,
+            f"CoverLetter_{job_data['title']}": cover_letter_md
+        }
+        documents = {title: md for title, md in documents.items() if md.strip()}
+        if documents:
+            print(f"   📄 Generating PDFs for {job_data['title']}...")
+        pdf_futures = {}
+        for title, md_content in documents.items():
+            # A failed submission only costs that PDF, never the rest of the export
+            try:
+                pdf_futures[title] = self.pdf_service.submit(md_content, title, path)
+            except Exception as e:
+                print(f"   ⚠️ PDF Error ({title}): {e}")
+
+        # 4. Save Physical Markdown Files
         self._write(path, "1_job_description.md", job_data.get('description', ""))
-        self._write(path, "2_tailored_resume.md", resume_md)
-        self._write(path, "3_cover_letter.md", cover_letter_md)
+        if resume_md.strip():
+            self._write(path, "2_tailored_resume.md", resume_md)
+        if cover_letter_md.strip():
+            self._write(path, "3_cover_letter.md", cover_letter_md)
         
         report = self._build_human_report(job_data, ai_res)
         self._write(path, "0_analysis_report.md", report)
 
-        # 4. PDF Generation
-        try:
-            print(f"   📄 Generating PDFs for {job_data['title']}...")
-            self.pdf_gen.convert_resume(resume_md, f"Resume_{job_data['title']}", path)
-            self.pdf_gen.convert_resume(cover_letter_md, f"CoverLetter_{job_data['title']}", path)
-        except Exception as e:
-            print(f"   ⚠️ PDF Error: {e}")
+        # 5. Collect PDF results (failures are reported per document)
+        for title, future in pdf_futures.items():
+            outcome = self.pdf_service.collect(title, path, future)
+            if outcome["error"]:
+                print(f"   ⚠️ PDF Error ({title}): {outcome['error']}")
 
-        # 5. Build and Save Metadata JSON (FIXED: Now passes and uses job_hash)
+        # 6. Build and Save Metadata JSON (FIXED: Now passes and uses job_hash)
         full_metadata = self._build_metadata_dict(job_data, ai_res, job_hash)
         with open(os.path.join(path, "metadata.json"), "w", encoding="utf-8") as f:
             json.dump(full_metadata, f, indent=4, ensure_ascii=False)
 
-        # 6. Update Master CSV
+        # 7. Publish the complete folder in one rename
+        self._publish(path, final_path)
+
+        # 8. Update Master CSV and the folder index
         self._update_master_csv(full_metadata)
+        self.folder_index.update(job_hash, final_path, job_data['company'], job_data['title'],
+                                 status=full_metadata["application_meta"]["status"])
+
+        # 9. Streamed sections are now part of the job folder
+        self.clear_partial(job_hash)
+
+        return final_path
+
+    @staticmethod
+    def _publish(staging_path, final_path):
+        """Renames the staging folder into place, replacing an older export of the same job."""
+        if not os.path.exists(final_path):
+            os.replace(staging_path, final_path)
+            return
+        old_path = os.path.join(os.path.dirname(final_path), BACKUP_PREFIX + os.path.basename(final_path))
+        os.replace(final_path, old_path)
+        os.replace(staging_path, final_path)
+        shutil.rmtree(old_path, ignore_errors=True)
+
+    def _partial_dir(self, job_hash):
+        return os.path.join(self.base_path, ".inflight", job_hash[:8])
+
+    def save_partial(self, job_hash, section, value):
+        """
+        Persists one finished section of a streamed AI reply (e.g. 'metadata', 'scores')
+        while the rest is still generating, so an interrupted run keeps what was done.
+        """
+        path = self._partial_dir(job_hash)
+        os.makedirs(path, exist_ok=True)
+        final_path = os.path.join(path, f"{section}.json")
+        tmp_path = f"{final_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(value, f, indent=4, ensure_ascii=False)
+        os.replace(tmp_path, final_path)
+        return final_path
+
+    def clear_partial(self, job_hash):
+        shutil.rmtree(self._partial_dir(job_hash), ignore_errors=True)
 
     def _update_master_csv(self, data):
         """Flattens metadata dictionary for CSV row appending."""
@@ -81,7 +272,7 @@ class JobFileManager:
             "resume_content_md": data["generated_content"]["resume_markdown"],
             "cover_letter_md": data["generated_content"]["cover_letter_markdown"],
             "job_description_raw": data["generated_content"]["job_description_raw"],
-            "status": "Generated",
+            "status": data["application_meta"]["status"],
             "applied_date": "", 
             "contact_person": "",
             "interview_date": "",
@@ -89,13 +280,7 @@ class JobFileManager:
             "notes": ""
         }
 
-        file_exists = os.path.isfile(self.master_csv_path)
-        with open(self.master_csv_path, mode='a', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=row.keys())
-            if not file_exists:
-                writer.writeheader()
-            writer.writerow(row)
-
+        self.master_log.append(row)
         print(f"   📊 Job registered in Master CSV with Hash: {row['job_hash'][:8]}")
 
     def _build_metadata_dict(self, job_data, ai_res, job_hash):
@@ -107,7 +292,9 @@ class JobFileManager:
         return {
             "application_meta": {
                 "job_hash": job_hash,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": datetime.now().isoformat(),
+                "status": ai_res.get('status', "Generated"),
+                "ai_usage": ai_res.get('usage')
             },
             "job_info": {
                 "company": job_data['company'],
@@ -144,6 +331,8 @@ class JobFileManager:
         report = f"# 📊 Application Analysis: {job_data['title']}\n\n"
         # Match Score comparison
         report += f"**Match Score:** {scores.get('original', 0)} → **Optimized:** {scores.get('tailored', 0)}\n\n"
+        if ai_res.get('status') == "Low Fit":
+            report += "> Analysis only: the score was below REWRITE_MIN_SCORE, so no resume or cover letter was generated.\n\n"
         # Application Instructions
         report += f"## 🛠️ How to Apply\n{metadata_ai.get('apply_instructions', 'Verify application link.')}\n\n"
         # Fit Analysis section
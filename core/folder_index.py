@@ -0,0 +1,332 @@
+"""
+core/folder_index.py
+Index of the job folders in zzz_output (.folder_index.json).
+Maps job_hash -> folder, company, title, status, document digests and last sync
+time, and keeps in-memory lookups by hash prefix and company/title words, so
+tools resolve a job without listing the directory or opening metadata files.
+Maintained by JobFileManager.save_all, scripts.sync_utils and scripts.archive_jobs,
+possibly at the same time: each save appends only the changed fields of the changed
+jobs to a journal (.folder_index.journal.jsonl) under a file lock, after replaying
+what other processes appended, and the journal is folded into the JSON snapshot
+once it grows. A missing index is rebuilt once from the folders' metadata.json and
+the archive bundles' index.
+Archived jobs stay resolvable; ensure_local() extracts them when files are needed.
+"""
+
+import os
+import re
+import json
+import uuid
+import bisect
+import hashlib
+import threading
+from datetime import datetime
+from core.archive import ArchiveStore
+from core.utils import file_lock
+
+DOCUMENT_EXTENSIONS = (".md", ".pdf")
+# The journal is folded into the snapshot once it has more lines than this (or than jobs indexed)
+COMPACT_LINES = 500
+_WORD_RE = re.compile(r"[a-z0-9+#]+")
+_HEX_RE = re.compile(r"^[0-9a-f]{4,64}$")
+
+
+def _words(text):
+    return set(_WORD_RE.findall(str(text or "").lower()))
+
+
+def digest_documents(folder_path):
+    """SHA-256 of every markdown/PDF document in a job folder."""
+    digests = {}
+    if not os.path.isdir(folder_path):
+        return digests
+    for filename in sorted(os.listdir(folder_path)):
+        if filename.endswith(DOCUMENT_EXTENSIONS):
+            with open(os.path.join(folder_path, filename), "rb") as f:
+                digests[filename] = hashlib.sha256(f.read()).hexdigest()
+    return digests
+
+
+class FolderIndex:
+    """
+    Attributes:
+        entries (dict): job_hash -> {'folder' (name inside base_path), 'company', 'title',
+            'date', 'status', 'documents', 'updated_at', 'synced_at'}, plus 'archive'
+            (bundle name) and 'archived_documents' once the job has been archived.
+    """
+
+    def __init__(self, base_path="zzz_output", index_path=None):
+        self.base_path = base_path
+        self.index_path = index_path or os.path.join(base_path, ".folder_index.json")
+        stem = os.path.splitext(self.index_path)[0]
+        self.journal_path = f"{stem}.journal.jsonl"
+        self.lock_path = f"{stem}.lock"
+        self.entries = {}
+        self._words = {}
+        self._sorted_hashes = None
+        self._lock = threading.RLock()
+        # Changes not written yet: (job_hash, changed fields, or None for a removal)
+        self._pending = []
+        # Journal generation (changes when it is folded into the snapshot), bytes and lines replayed
+        self._generation = None
+        self._journal_offset = 0
+        self._journal_lines = 0
+        self.archive = ArchiveStore(base_path)
+        self._load()
+
+    def _load(self):
+        if os.path.exists(self.index_path):
+            try:
+                with self._lock, self._locked():
+                    self._replay_journal(reload=True)
+                return
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Folder index unreadable ({e}); rebuilding.")
+        if os.path.isdir(self.base_path):
+            self.rebuild()
+
+    def _locked(self):
+        os.makedirs(os.path.dirname(self.lock_path) or ".", exist_ok=True)
+        return file_lock(self.lock_path)
+
+    def _read_snapshot(self):
+        self.entries, self._words, self._sorted_hashes = {}, {}, None
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                for job_hash, entry in json.load(f).items():
+                    self._insert(job_hash, entry)
+
+    def _replay_journal(self, reload=False):
+        """Applies the journal lines other processes appended since the last replay (file lock held)."""
+        if not os.path.exists(self.journal_path):
+            self._read_snapshot()
+            self._generation, self._journal_offset, self._journal_lines = None, 0, 0
+            return
+        with open(self.journal_path, "rb") as f:
+            first = f.readline()
+            generation = json.loads(first).get("generation") if first.strip() else None
+            if reload or generation != self._generation:
+                # Folded into a new snapshot since the last replay (or first load)
+                self._read_snapshot()
+                self._generation, self._journal_offset, self._journal_lines = generation, len(first), 0
+            f.seek(self._journal_offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # Cut short by a crash; the next append starts a fresh line
+                self._journal_offset += len(line)
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                self._journal_lines += 1
+                self._apply(record["job_hash"], record.get("set"))
+
+    def _apply(self, job_hash, changes):
+        if changes is None:
+            self._drop(job_hash)
+            return
+        entry = dict(self.entries.get(job_hash, {}))
+        entry.update(changes)
+        entry.setdefault("synced_at", None)
+        self._insert(job_hash, entry)
+
+    def _change(self, job_hash, changes, save):
+        self._pending.append((job_hash, changes))
+        self._apply(job_hash, changes)
+        if save:
+            self.save()
+
+    def save(self):
+        """Appends the pending changes to the journal, merged with what other processes wrote."""
+        with self._lock:
+            if not self._pending:
+                return
+            with self._locked():
+                self._replay_journal()
+                # Other processes' changes are in; ours go on top, as in the journal
+                for job_hash, changes in self._pending:
+                    self._apply(job_hash, changes)
+                lines = "".join(json.dumps({"job_hash": h, "set": c}, ensure_ascii=False) + "\n"
+                                for h, c in self._pending)
+                if not os.path.exists(self.journal_path):
+                    self._write_snapshot()
+                else:
+                    with open(self.journal_path, "ab") as f:
+                        if f.tell() > self._journal_offset:
+                            f.write(b"\n")  # Terminate a line cut short by a crash
+                        f.write(lines.encode("utf-8"))
+                        self._journal_offset = f.tell()
+                    self._journal_lines += len(self._pending)
+                    if self._journal_lines > max(COMPACT_LINES, len(self.entries)):
+                        self._write_snapshot()
+                self._pending = []
+
+    def _write_snapshot(self):
+        """Folds every change into the JSON snapshot and starts a new, empty journal (file lock held)."""
+        os.makedirs(os.path.dirname(self.index_path) or ".", exist_ok=True)
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
+
+        generation = uuid.uuid4().hex
+        header = (json.dumps({"generation": generation}) + "\n").encode("utf-8")
+        with open(f"{self.journal_path}.tmp", "wb") as f:
+            f.write(header)
+        os.replace(f"{self.journal_path}.tmp", self.journal_path)
+        self._generation, self._journal_offset, self._journal_lines = generation, len(header), 0
+
+    def _insert(self, job_hash, entry):
+        old = self.entries.get(job_hash)
+        if old:
+            for word in _words(old.get("company")) | _words(old.get("title")):
+                self._words.get(word, set()).discard(job_hash)
+        else:
+            self._sorted_hashes = None
+        self.entries[job_hash] = entry
+        for word in _words(entry.get("company")) | _words(entry.get("title")):
+            self._words.setdefault(word, set()).add(job_hash)
+
+    def rebuild(self):
+        """Re-indexes every folder from its metadata.json (one walk). Returns the number indexed."""
+        with self._lock, self._locked():
+            self.entries, self._words, self._sorted_hashes = {}, {}, None
+            for folder_name in sorted(os.listdir(self.base_path)) if os.path.isdir(self.base_path) else []:
+                folder_path = os.path.join(self.base_path, folder_name)
+                metadata_path = os.path.join(folder_path, "metadata.json")
+                if folder_name.startswith(".") or not os.path.exists(metadata_path):
+                    continue  # Archive, in-flight and staging folders
+                try:
+                    with open(metadata_path, "r", encoding="utf-8") as f:
+                        metadata = json.load(f)
+                    job_hash = metadata["application_meta"]["job_hash"]
+                except (OSError, ValueError, KeyError) as e:
+                    print(f"   ⚠️  Skipping {folder_name}: {e}")
+                    continue
+                self.update(job_hash, folder_path, metadata["job_info"]["company"], metadata["job_info"]["title"],
+                            status=metadata["application_meta"].get("status"), save=False)
+            for bundle, job_hash, manifest in self.archive.iter_index():
+                entry = self.entries.get(job_hash) or {
+                    key: manifest.get(key) for key in ("folder", "company", "title", "date", "status", "documents")}
+                entry.setdefault("synced_at", None)
+                entry.update({"archive": bundle, "archived_documents": manifest.get("documents")})
+                self._insert(job_hash, entry)
+            self._pending = []
+            self._write_snapshot()
+            print(f"🗂️  Folder index rebuilt: {len(self.entries)} jobs.")
+            return len(self.entries)
+
+    def update(self, job_hash, folder_path, company=None, title=None, status=None, synced=False, save=True):
+        """Adds or refreshes a job's entry, re-hashing its documents. Only the fields given are changed."""
+        with self._lock:
+            folder = os.path.basename(os.path.normpath(folder_path))
+            changes = {"folder": folder, "documents": digest_documents(folder_path),
+                       "updated_at": datetime.now().isoformat()}
+            if folder[:8].isdigit():
+                changes["date"] = folder[:8]
+            for key, value in (("company", company), ("title", title), ("status", status)):
+                if value is not None:
+                    changes[key] = value
+            if synced:
+                changes["synced_at"] = changes["updated_at"]
+            self._change(job_hash, changes, save)
+            return self.entries[job_hash]
+
+    def _drop(self, job_hash):
+        entry = self.entries.pop(job_hash, None)
+        if entry:
+            for word in _words(entry.get("company")) | _words(entry.get("title")):
+                self._words.get(word, set()).discard(job_hash)
+            self._sorted_hashes = None
+        return entry
+
+    def remove(self, job_hash, save=True):
+        with self._lock:
+            entry = self.entries.get(job_hash)
+            if entry:
+                self._change(job_hash, None, save)
+            return entry
+
+    def path(self, job_hash):
+        entry = self.entries.get(job_hash)
+        return os.path.join(self.base_path, entry["folder"]) if entry else None
+
+    def is_local(self, job_hash):
+        path = self.path(job_hash)
+        return bool(path) and os.path.isdir(path)
+
+    def ensure_local(self, job_hash):
+        """Folder path of a job, extracting it from its archive bundle first if needed."""
+        with self._lock:
+            path = self.path(job_hash)
+            entry = self.entries.get(job_hash)
+            if entry and not os.path.isdir(path) and entry.get("archive"):
+                path = self.archive.extract(entry)
+                print(f"   📦 {entry['folder']} extracted from {entry['archive']}")
+            return path
+
+    def mark_archived(self, job_hash, bundle, save=True):
+        with self._lock:
+            entry = self.entries[job_hash]
+            self._change(job_hash, {"archive": bundle, "archived_documents": entry.get("documents"),
+                                    "archived_at": datetime.now().isoformat()}, save)
+
+    def _with_hash(self, job_hash):
+        return {**self.entries[job_hash], "job_hash": job_hash, "path": self.path(job_hash)}
+
+    def all(self):
+        with self._lock:
+            return [self._with_hash(h) for h in self.entries]
+
+    def by_prefix(self, prefix):
+        """Jobs whose hash starts with `prefix` (binary search over the sorted hashes)."""
+        prefix = prefix.lower()
+        with self._lock:
+            if self._sorted_hashes is None:
+                self._sorted_hashes = sorted(self.entries)
+            hashes = self._sorted_hashes
+            matches = []
+            for i in range(bisect.bisect_left(hashes, prefix), len(hashes)):
+                if not hashes[i].startswith(prefix):
+                    break
+                matches.append(self._with_hash(hashes[i]))
+            return matches
+
+    def search(self, text):
+        """Jobs whose company/title contain every word of `text`."""
+        words = _words(text)
+        if not words:
+            return []
+        with self._lock:
+            sets = [self._words.get(word, set()) for word in words]
+            hashes = set.intersection(*sorted(sets, key=len))
+            return [self._with_hash(h) for h in sorted(hashes, key=lambda h: self.entries[h].get("date") or "")]
+
+    def resolve(self, query):
+        """
+        Resolves a folder path, hash (prefix, min. 4 chars), or company/title words to index entries.
+
+        Returns:
+            list: Matching entries with 'job_hash' and 'path' added.
+        """
+        query = str(query).strip()
+        if os.path.isdir(query):
+            # Folder names end with the first 8 characters of the hash
+            name = os.path.basename(os.path.normpath(query))
+            matches = [e for e in self.by_prefix(name[-8:].lower()) if e["folder"] == name]
+            return matches or [{"job_hash": None, "path": query, "folder": name}]
+        if _HEX_RE.match(query.lower()):
+            matches = self.by_prefix(query)
+            if matches:
+                return matches
+        return self.search(query)
+
+    def prune(self):
+        """Drops entries whose folder was deleted or moved by hand. Returns how many were removed."""
+        with self._lock:
+            missing = [h for h, e in self.entries.items() if not e.get("archive") and not os.path.isdir(self.path(h))]
+            for job_hash in missing:
+                self.remove(job_hash, save=False)
+            if missing:
+                self.save()
+            return len(missing)
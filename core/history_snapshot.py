@@ -0,0 +1,104 @@
+"""
+core/history_snapshot.py
+Incremental reader of the Master CSV for the columnar query snapshot (scripts/query_log.py).
+Only the narrow CRM columns are kept (the markdown/JD blobs are skipped), and
+only bytes appended since the previous refresh are parsed. A rewritten file
+(sync_utils, migrations, spreadsheet edits) is detected and read in full again.
+"""
+
+import io
+import os
+import csv
+import sys
+import hashlib
+
+# Narrow CRM columns; the blob columns (resume/cover letter/JD markdown) stay in the CSV
+SNAPSHOT_COLUMNS = [
+    "job_hash", "date_generated", "company", "title", "salary", "country", "work_model",
+    "apply_method", "url", "original_score", "tailored_score", "status",
+    "applied_date", "contact_person", "interview_date", "next_steps"
+]
+NUMERIC_COLUMNS = ("original_score", "tailored_score")
+TAIL_BYTES = 4096
+
+# Blob cells easily exceed the csv module's default 128 KB field limit
+csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+
+
+def _tail_digest(f, offset):
+    """Digest of the bytes just before `offset`; changes if the file was rewritten, not appended to."""
+    start = max(0, offset - TAIL_BYTES)
+    f.seek(start)
+    return hashlib.sha256(f.read(offset - start)).hexdigest()
+
+
+def _complete_records_end(data):
+    """
+    Length of the leading part of `data` made of whole CSV records. A record ends at a
+    newline outside quotes; blob cells hold quoted newlines, so the last newline is not
+    enough. Quote bytes never occur inside UTF-8 multi-byte characters.
+    """
+    end = 0
+    pos = 0
+    # Splitting on quotes alternates unquoted (even) and quoted (odd) text; "" escapes are an empty quoted part
+    for i, part in enumerate(data.split(b'"')):
+        if i % 2 == 0:
+            newline = part.rfind(b"\n")
+            if newline >= 0:
+                end = pos + newline + 1
+        pos += len(part) + 1
+    return end
+
+
+def _to_number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def narrow_row(row):
+    """Keeps the snapshot columns of one CSV row (empty cells -> None, scores -> float)."""
+    out = {}
+    for column in SNAPSHOT_COLUMNS:
+        value = row.get(column)
+        if column in NUMERIC_COLUMNS:
+            out[column] = _to_number(value)
+        else:
+            out[column] = value if value not in (None, "") else None
+    return out
+
+
+def read_new_rows(csv_path, state=None):
+    """
+    Parses the rows appended to the CSV since `state` was taken.
+
+    Args:
+        state (dict): Returned by the previous call ('offset', 'header', 'tail_digest'), or None.
+
+    Returns:
+        tuple: (rows, new_state, rebuilt) where rebuilt is True when every row was
+        read from the start, i.e. the previous snapshot must be replaced, not extended.
+    """
+    if not os.path.exists(csv_path):
+        return [], {"offset": 0, "header": None, "tail_digest": None}, True
+
+    with open(csv_path, "rb") as f:
+        header_line = f.readline()
+        header = next(csv.reader([header_line.decode("utf-8-sig")]), [])
+        size = os.fstat(f.fileno()).st_size
+
+        rebuilt = (not state or state.get("header") != header or size < state.get("offset", 0)
+                   or _tail_digest(f, state["offset"]) != state.get("tail_digest"))
+        offset = len(header_line) if rebuilt else state["offset"]
+
+        f.seek(offset)
+        data = f.read(size - offset)
+        # Keep a half-written last record (possibly cut inside a multi-line cell) for the next refresh
+        data = data[:_complete_records_end(data)]
+        new_offset = offset + len(data)
+
+        reader = csv.DictReader(io.StringIO(data.decode("utf-8"), newline=""), fieldnames=header)
+        rows = [narrow_row(row) for row in reader if row.get("job_hash")]
+        new_state = {"offset": new_offset, "header": header, "tail_digest": _tail_digest(f, new_offset)}
+    return rows, new_state, rebuilt
@@ -0,0 +1,153 @@
+"""
+core/jd_cleaner.py
+Job description normalisation between the scraper and the AI.
+Removes LinkedIn UI chrome (apply/save buttons, premium upsells, hiring-team cards),
+collapses whitespace and optionally drops legal/EEO boilerplate, so fewer input
+tokens are billed on every Gemini call.
+"""
+
+import os
+import re
+import math
+
+# Whole lines that are LinkedIn UI, never part of the job itself
+CHROME_LINES = {
+    "apply", "easy apply", "save", "saved", "show more options", "show match details",
+    "tailor my resume", "help me update my profile", "create cover letter", "beta",
+    "is this information helpful?", "message", "job poster", "about the job",
+    "show more", "show less", "see more", "see less", "1st", "2nd", "3rd", "3rd+",
+}
+
+CHROME_PATTERNS = [
+    r"^save .+ at .+$",
+    r"^reactivate premium.*$",
+    r"^try premium.*$",
+    r"^get personalized tips to stand out.*$",
+    r"^find jobs where you.re a top applicant.*$",
+    r"^your profile matches .*qualifications$",
+    r"^matches your job preferences.*$",
+    r"^promoted by hirer.*$",
+    r"^responses managed (off|on) linkedin$",
+    r"^\d[\d,]* applicants?$",
+]
+_CHROME_RE = re.compile("|".join(CHROME_PATTERNS), flags=re.IGNORECASE)
+
+# Volatile fragments inside otherwise useful lines ("Toronto, ON · Reposted 4 days ago · ...")
+_VOLATILE_FRAGMENT_RE = re.compile(
+    r"\s*·\s*((re)?posted \d+ \w+ ago|over \d[\d,]* people clicked apply|\d[\d,]* applicants?"
+    r"|promoted by hirer|responses managed (off|on) linkedin)",
+    flags=re.IGNORECASE
+)
+
+# The hiring-team card runs from its header until the job body starts
+_HIRING_TEAM_START = "meet the hiring team"
+_HIRING_TEAM_END = {"message", "about the job"}
+
+# Repeated title/company lines are only dropped around the body: before "About the job"
+# (or in the first HEADER_LINES lines when the marker is missing) and in the last FOOTER_LINES
+_BODY_START = "about the job"
+HEADER_LINES = 15
+FOOTER_LINES = 6
+
+LEGAL_KEYWORDS = [
+    "equal opportunity", "affirmative action", "do not discriminate", "does not discriminate",
+    "protected veteran", "reasonable accommodation", "criminal histories", "e-verify",
+    "without regard to race", "sexual orientation", "gender identity",
+]
+
+
+def estimate_tokens(text):
+    """Rough Gemini token estimate (~4 characters per token)."""
+    return math.ceil(len(text or "") / 4)
+
+
+class JDNormalizer:
+    """
+    Cleans raw job description text before prompting.
+
+    Attributes:
+        strip_legal (bool): Also drop EEO/legal paragraphs (JD_STRIP_LEGAL=true).
+    """
+
+    def __init__(self, strip_legal=None):
+        if strip_legal is None:
+            strip_legal = os.getenv("JD_STRIP_LEGAL", "false").lower() in ("1", "true", "yes")
+        self.strip_legal = strip_legal
+
+    def normalize(self, text):
+        """
+        Returns:
+            tuple: (clean_text, report) where report has tokens_before, tokens_after and tokens_saved.
+        """
+        raw = str(text or "")
+        lines = self._strip_chrome(raw.splitlines())
+        clean = self._collapse("\n".join(lines))
+        if self.strip_legal:
+            clean = self._strip_legal(clean)
+
+        before = estimate_tokens(raw)
+        after = estimate_tokens(clean)
+        report = {"tokens_before": before, "tokens_after": after, "tokens_saved": before - after}
+        return clean, report
+
+    @staticmethod
+    def _chrome_blocks(keys):
+        """Returns (header_end, footer_start): line indexes bounding the job body."""
+        non_blank = [i for i, key in enumerate(keys) if key]
+        if _BODY_START in keys:
+            header_end = keys.index(_BODY_START)
+        else:
+            header_end = non_blank[HEADER_LINES - 1] + 1 if len(non_blank) >= HEADER_LINES else len(keys)
+        footer_start = non_blank[-FOOTER_LINES] if len(non_blank) >= FOOTER_LINES else 0
+        return header_end, max(header_end, footer_start)
+
+    def _strip_chrome(self, lines):
+        kept = []
+        seen_short = set()
+        in_hiring_team = False
+        keys = [re.sub(r"\s+", " ", line).strip().lower() for line in lines]
+        header_end, footer_start = self._chrome_blocks(keys)
+
+        for i, line in enumerate(lines):
+            stripped = re.sub(r"\s+", " ", line).strip()
+            key = keys[i]
+
+            if key == _HIRING_TEAM_START:
+                in_hiring_team = True
+                continue
+            if in_hiring_team:
+                if key in _HIRING_TEAM_END:
+                    in_hiring_team = False
+                continue
+
+            if not stripped:
+                kept.append("")
+                continue
+            if key in CHROME_LINES or _CHROME_RE.match(stripped):
+                continue
+
+            stripped = _VOLATILE_FRAGMENT_RE.sub("", stripped).strip(" ·")
+            if not stripped:
+                continue
+
+            # The header (and sticky footer) repeats title/company lines; keep the first copy.
+            # Repeated bullets and section labels inside the body are left alone.
+            if len(stripped) < 80 and (i < header_end or i >= footer_start):
+                if key in seen_short:
+                    continue
+                seen_short.add(key)
+
+            kept.append(stripped)
+        return kept
+
+    @staticmethod
+    def _collapse(text):
+        text = re.sub(r"[ \t]+", " ", text)
+        text = re.sub(r"\n{3,}", "\n\n", text)
+        return text.strip()
+
+    @staticmethod
+    def _strip_legal(text):
+        paragraphs = text.split("\n\n")
+        kept = [p for p in paragraphs if not any(k in p.lower() for k in LEGAL_KEYWORDS)]
+        return "\n\n".join(kept)
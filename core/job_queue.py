@@ -0,0 +1,126 @@
+"""
+core/job_queue.py
+Priority queue feeding the AI generation stage.
+Jobs are ordered by a locally computed value (resume similarity, recency and
+salary presence, with user-defined weights) so the best matches are generated
+before the key pool runs out. Leftover jobs are persisted as a backlog; jobs that
+keep failing are parked in a separate file instead of being retried forever.
+"""
+
+import os
+import re
+import json
+import heapq
+import itertools
+from datetime import datetime, timedelta
+
+DEFAULT_WEIGHTS = {"similarity": 0.6, "recency": 0.25, "salary": 0.15}
+
+_POSTED_RE = re.compile(r"(?:re)?posted\s+(\d+)\s+(minute|hour|day|week|month)s?\s+ago", flags=re.IGNORECASE)
+_UNIT_DAYS = {"minute": 1 / 1440, "hour": 1 / 24, "day": 1, "week": 7, "month": 30}
+
+
+def parse_weights(raw=None):
+    """Reads 'similarity=0.6,recency=0.25,salary=0.15' (QUEUE_WEIGHTS) into a dict."""
+    raw = raw if raw is not None else os.getenv("QUEUE_WEIGHTS", "")
+    weights = dict(DEFAULT_WEIGHTS)
+    for part in raw.split(","):
+        if "=" in part:
+            name, value = part.split("=", 1)
+            weights[name.strip().lower()] = float(value)
+    return weights
+
+
+def estimate_posted_at(description, scraped_at=None):
+    """Turns 'Reposted 4 days ago' into an ISO date, or None if the JD does not say."""
+    match = _POSTED_RE.search(str(description or ""))
+    if not match:
+        return None
+    scraped_at = scraped_at or datetime.now()
+    age = int(match.group(1)) * _UNIT_DAYS[match.group(2).lower()]
+    return (scraped_at - timedelta(days=age)).isoformat()
+
+
+class PriorityJobQueue:
+    """
+    Max-priority queue of pending generations.
+
+    Each item is a JSON-serialisable dict with a 'features' dict holding
+    'similarity' (0-10), 'posted_at' (ISO date or None) and 'has_salary' (bool).
+    """
+
+    def __init__(self, weights=None, backlog_path="ai_backlog.jsonl", failed_path="ai_failed.jsonl"):
+        self.weights = weights or parse_weights()
+        self.backlog_path = backlog_path
+        self.failed_path = failed_path
+        self._heap = []
+        self._counter = itertools.count()
+        self._hashes = set()
+
+    def priority(self, features):
+        """Weighted score in [0, 1]; recency halves roughly every week."""
+        similarity = min(1.0, float(features.get("similarity") or 0) / 10)
+        posted_at = features.get("posted_at")
+        if posted_at:
+            age_days = max(0.0, (datetime.now() - datetime.fromisoformat(posted_at)).total_seconds() / 86400)
+            recency = 1 / (1 + age_days / 7)
+        else:
+            recency = 0.5
+        salary = 1.0 if features.get("has_salary") else 0.0
+
+        return (self.weights.get("similarity", 0) * similarity
+                + self.weights.get("recency", 0) * recency
+                + self.weights.get("salary", 0) * salary)
+
+    def push(self, item):
+        """Queues an item (ignoring a second copy of the same job_hash)."""
+        if item["job_hash"] in self._hashes:
+            return False
+        self._hashes.add(item["job_hash"])
+        item["priority"] = round(self.priority(item["features"]), 4)
+        # heapq is a min-heap: negate the priority; the counter keeps FIFO order on ties
+        heapq.heappush(self._heap, (-item["priority"], next(self._counter), item))
+        return True
+
+    def pop(self):
+        _, _, item = heapq.heappop(self._heap)
+        self._hashes.discard(item["job_hash"])
+        return item
+
+    def __len__(self):
+        return len(self._heap)
+
+    def save_backlog(self):
+        """Persists every queued item (highest priority first) for the next run."""
+        items = [entry[2] for entry in sorted(self._heap)]
+        tmp_path = f"{self.backlog_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for item in items:
+                f.write(json.dumps(item, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.backlog_path)
+        return len(items)
+
+    def load_backlog(self):
+        """
+        Re-queues the backlog left by a previous run. The file is kept until it is
+        replaced by save_backlog() or the queue is fully drained (clear_backlog()),
+        so a crash in between does not lose it.
+        """
+        if not os.path.exists(self.backlog_path):
+            return 0
+        loaded = 0
+        with open(self.backlog_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip() and self.push(json.loads(line)):
+                    loaded += 1
+        return loaded
+
+    def clear_backlog(self):
+        """Removes the backlog file once every job in it was handled."""
+        if os.path.exists(self.backlog_path):
+            os.remove(self.backlog_path)
+
+    def park(self, item, error):
+        """Appends a job that failed too many times to failed_path (with the last error) for manual review."""
+        with open(self.failed_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({**item, "error": str(error)}, ensure_ascii=False) + "\n")
@@ -0,0 +1,331 @@
+"""
+core/job_service.py
+Job submission service behind the local HTTP API (api_server.py).
+Submitted JDs are deduplicated by job_hash, queued, and processed by a pool of
+worker threads; each worker builds its own processor (AI client, key rotation)
+once and reuses it. Clients poll GET /jobs/<id> for the status and results.
+Accepted jobs that are not finished are persisted to api_backlog.jsonl and
+queued again when the service restarts.
+"""
+
+import os
+import json
+import time
+import heapq
+import itertools
+import threading
+from datetime import datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from core.utils import generate_job_hash
+
+REQUIRED_FIELDS = ("company", "title", "description")
+MAX_BODY_BYTES = 1_000_000
+KEEP_FINISHED = 1000
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+ALREADY_PROCESSED = "already_processed"
+
+
+class JobService:
+    """
+    Attributes:
+        jobs (dict): Job id (first 16 chars of the job_hash) -> public status record.
+        known_hashes (set): Hashes already in the Master CSV; resubmissions are not regenerated.
+        backlog_path (str): Payloads of the accepted jobs not finished yet, one JSON per line.
+    """
+
+    def __init__(self, worker_factory, workers=None, known_hashes=None, retryable=(), retry_pause=None,
+                 backlog_path=None):
+        """
+        Args:
+            worker_factory (callable): Called once per worker thread; returns process(job) -> result dict.
+            retryable (tuple): Exceptions that put the job back in the queue (quota, API health),
+                not to be picked up again for retry_pause seconds.
+        """
+        self.worker_factory = worker_factory
+        self.workers = int(workers if workers is not None else os.getenv("API_WORKERS", "2"))
+        self.known_hashes = known_hashes if known_hashes is not None else set()
+        self.retryable = retryable
+        self.retry_pause = float(retry_pause if retry_pause is not None else os.getenv("API_RETRY_PAUSE", "300"))
+        self.backlog_path = backlog_path or os.getenv("API_BACKLOG", "api_backlog.jsonl")
+        self.jobs = {}
+        self._payloads = {}
+        # (not before (monotonic), FIFO counter, job id); workers take the earliest due job
+        self._pending = []
+        self._counter = itertools.count()
+        self._ready = threading.Condition()
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        loaded = self.load_backlog()
+        if loaded:
+            print(f"📥 {loaded} API jobs loaded from {self.backlog_path}.")
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"job-worker-{i + 1}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        print(f"👷 {self.workers} job workers started.")
+
+    def submit(self, payload):
+        """
+        Validates and queues a job.
+
+        Returns:
+            tuple: (record, created) where created is False for a duplicate submission.
+
+        Raises:
+            ValueError: If a required field is missing or empty.
+        """
+        if not isinstance(payload, dict):
+            raise ValueError("Body must be a JSON object.")
+        missing = [f for f in REQUIRED_FIELDS if not str(payload.get(f) or "").strip()]
+        if missing:
+            raise ValueError(f"Missing required fields: {', '.join(missing)}")
+
+        job_data = {
+            "company": str(payload["company"]).strip(),
+            "title": str(payload["title"]).strip(),
+            "description": str(payload["description"]),
+            "url": str(payload.get("url") or ""),
+            "scraped_at": datetime.now().isoformat()
+        }
+        job_hash = generate_job_hash(job_data["company"], job_data["title"], job_data["description"])
+        job_id = job_hash[:16]
+
+        with self._lock:
+            record = self.jobs.get(job_id)
+            # A failed job may be retried by posting it again; anything else is a duplicate
+            if record and record["status"] != FAILED:
+                return dict(record), False
+            if job_hash in self.known_hashes:
+                record = self._new_record(job_id, job_hash, job_data, ALREADY_PROCESSED)
+                return dict(record), False
+
+            record = self._new_record(job_id, job_hash, job_data, QUEUED)
+            self._payloads[job_id] = job_data
+            self._prune()
+        self.save_backlog()
+        self._schedule(job_id)
+        return dict(record), True
+
+    def _schedule(self, job_id, delay=0.0):
+        with self._ready:
+            heapq.heappush(self._pending, (time.monotonic() + delay, next(self._counter), job_id))
+            self._ready.notify()
+
+    def _next_job(self):
+        """Blocks until a queued job is due (None once the service stops)."""
+        with self._ready:
+            while not self._stop.is_set():
+                timeout = None
+                if self._pending:
+                    timeout = self._pending[0][0] - time.monotonic()
+                    if timeout <= 0:
+                        return heapq.heappop(self._pending)[2]
+                self._ready.wait(timeout)
+        return None
+
+    def save_backlog(self):
+        """Persists the payloads of every accepted job not finished yet (queued or running)."""
+        with self._save_lock:
+            with self._lock:
+                entries = [{"id": job_id, "job_hash": self.jobs[job_id]["job_hash"],
+                            "attempts": self.jobs[job_id]["attempts"], "job_data": job_data}
+                           for job_id, job_data in self._payloads.items() if job_id in self.jobs]
+            if not entries:
+                if os.path.exists(self.backlog_path):
+                    os.remove(self.backlog_path)
+                return 0
+            tmp_path = f"{self.backlog_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for entry in entries:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            os.replace(tmp_path, self.backlog_path)
+            return len(entries)
+
+    def load_backlog(self):
+        """Queues again the jobs a previous run accepted but did not finish."""
+        if not os.path.exists(self.backlog_path):
+            return 0
+        loaded = []
+        with open(self.backlog_path, "r", encoding="utf-8") as f:
+            entries = [json.loads(line) for line in f if line.strip()]
+        with self._lock:
+            for entry in entries:
+                if entry["id"] in self.jobs or entry["job_hash"] in self.known_hashes:
+                    continue
+                record = self._new_record(entry["id"], entry["job_hash"], entry["job_data"], QUEUED)
+                record["attempts"] = entry.get("attempts", 0)
+                self._payloads[entry["id"]] = entry["job_data"]
+                loaded.append(entry["id"])
+        for job_id in loaded:
+            self._schedule(job_id)
+        return len(loaded)
+
+    def _new_record(self, job_id, job_hash, job_data, status):
+        record = {
+            "id": job_id,
+            "job_hash": job_hash,
+            "status": status,
+            "company": job_data["company"],
+            "title": job_data["title"],
+            "url": job_data["url"],
+            "submitted_at": job_data["scraped_at"],
+            "started_at": None,
+            "finished_at": None,
+            "attempts": 0,
+            "retry_at": None,
+            "error": None,
+            "result": None
+        }
+        self.jobs[job_id] = record
+        return record
+
+    def _prune(self):
+        finished = [j for j in self.jobs.values() if j["status"] not in (QUEUED, RUNNING)]
+        for record in sorted(finished, key=lambda j: j["submitted_at"])[:max(0, len(finished) - KEEP_FINISHED)]:
+            del self.jobs[record["id"]]
+
+    def get(self, job_id):
+        with self._lock:
+            record = self.jobs.get(job_id)
+            return dict(record) if record else None
+
+    def list(self):
+        with self._lock:
+            return [{k: v for k, v in j.items() if k != "result"} for j in self.jobs.values()]
+
+    def stats(self):
+        with self._lock:
+            counts = {}
+            for record in self.jobs.values():
+                counts[record["status"]] = counts.get(record["status"], 0) + 1
+        with self._ready:
+            depth = len(self._pending)
+        return {"workers": self.workers, "queue_depth": depth, "jobs": counts}
+
+    def _update(self, job_id, **fields):
+        with self._lock:
+            if job_id in self.jobs:
+                self.jobs[job_id].update(fields)
+
+    def _work(self):
+        process = self.worker_factory()
+        while True:
+            job_id = self._next_job()
+            if job_id is None:
+                break
+            job_data = self._payloads.get(job_id)
+            record = self.get(job_id)
+            if job_data is None or record is None:
+                continue
+
+            self._update(job_id, status=RUNNING, started_at=datetime.now().isoformat(),
+                         attempts=record["attempts"] + 1, retry_at=None, error=None)
+            try:
+                result = process(dict(job_data, job_hash=record["job_hash"]))
+                with self._lock:
+                    self.known_hashes.add(record["job_hash"])
+                    self._payloads.pop(job_id, None)
+                self._update(job_id, status=DONE, result=result, finished_at=datetime.now().isoformat())
+                self.save_backlog()
+                print(f"   ✅ [API] {record['title']} @ {record['company']} done ({job_id[:8]})")
+            except self.retryable as e:
+                # Quota or API health: the job waits in the queue, the worker moves on to others
+                retry_at = datetime.fromtimestamp(time.time() + self.retry_pause).isoformat()
+                self._update(job_id, status=QUEUED, retry_at=retry_at, error=f"Waiting to retry: {e}")
+                print(f"   ⏸️  [API] {job_id[:8]} paused for {self.retry_pause:.0f}s: {e}")
+                self._schedule(job_id, delay=self.retry_pause)
+            except Exception as e:
+                self._payloads.pop(job_id, None)
+                self._update(job_id, status=FAILED, error=str(e), finished_at=datetime.now().isoformat())
+                self.save_backlog()
+                print(f"   ❌ [API] {job_id[:8]} failed: {e}")
+
+    def shutdown(self, wait=True):
+        """Stops the workers after their current job; unfinished jobs stay in the backlog for the next start."""
+        self._stop.set()
+        with self._ready:
+            self._ready.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+        saved = self.save_backlog()
+        if saved:
+            print(f"💾 {saved} API jobs saved to {self.backlog_path}.")
+
+
+def make_handler(service, token=None):
+    """HTTP handler class for POST /jobs, GET /jobs, GET /jobs/<id> and GET /health."""
+
+    class JobRequestHandler(BaseHTTPRequestHandler):
+        server_version = "JobAutomator/1.0"
+
+        def _send(self, code, body, headers=None):
+            data = json.dumps(body, ensure_ascii=False, indent=2).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _authorized(self):
+            if not token or self.headers.get("Authorization") == f"Bearer {token}":
+                return True
+            self._send(401, {"error": "Missing or invalid bearer token."})
+            return False
+
+        def do_POST(self):
+            if not self._authorized():
+                return
+            if self.path.rstrip("/") != "/jobs":
+                return self._send(404, {"error": "Not found."})
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+                if length < 0:
+                    raise ValueError(length)
+            except ValueError:
+                return self._send(400, {"error": "Invalid Content-Length header."})
+            if length > MAX_BODY_BYTES:
+                return self._send(413, {"error": f"Body larger than {MAX_BODY_BYTES} bytes."})
+            try:
+                payload = json.loads(self.rfile.read(length).decode("utf-8") or "null")
+                record, created = service.submit(payload)
+            except ValueError as e:
+                return self._send(400, {"error": str(e)})
+            self._send(202 if created else 200, dict(record, duplicate=not created),
+                       {"Location": f"/jobs/{record['id']}"})
+
+        def do_GET(self):
+            if not self._authorized():
+                return
+            path = self.path.split("?", 1)[0].rstrip("/")
+            if path == "/health":
+                return self._send(200, service.stats())
+            if path == "/jobs":
+                return self._send(200, {"jobs": service.list()})
+            if path.startswith("/jobs/"):
+                record = service.get(path[len("/jobs/"):])
+                if record:
+                    return self._send(200, record)
+            self._send(404, {"error": "Not found."})
+
+        def log_message(self, format, *args):
+            print(f"   🌐 {self.address_string()} {format % args}")
+
+    return JobRequestHandler
+
+
+def create_server(service, host=None, port=None, token=None):
+    host = host or os.getenv("API_HOST", "127.0.0.1")
+    port = int(port if port is not None else os.getenv("API_PORT", "8765"))
+    token = token if token is not None else os.getenv("API_TOKEN", "")
+    return ThreadingHTTPServer((host, port), make_handler(service, token or None))
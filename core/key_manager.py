@@ -39,3 +39,14 @@ class KeyManager:
             print(f"🔄 Rotação: Usando chave #{self.current_index + 1} ({hint}...)")
             return True
         return False
+
+    def reset(self, is_available):
+        """Volta para a primeira chave com cota (is_available(chave)), ex.: quando a cota diária renova.
+        Retorna False se nenhuma estiver disponível (o índice atual é mantido)."""
+        for index, key in enumerate(self.keys):
+            if is_available(key):
+                if index != self.current_index:
+                    self.current_index = index
+                    print(f"🔄 Rotação: Voltando para a chave #{index + 1} ({key[:6]}...)")
+                return True
+        return False
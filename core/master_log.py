@@ -0,0 +1,81 @@
+"""
+core/master_log.py
+Batched appends to the Master CSV.
+Rows are buffered and written in one append + fsync when MASTER_LOG_FLUSH_ROWS
+rows are waiting or MASTER_LOG_FLUSH_SECONDS have passed (background timer),
+and on close(). Hashes of buffered rows are exposed so duplicate checks do not
+miss jobs that are exported but not yet flushed.
+"""
+
+import os
+import csv
+import threading
+
+
+class MasterLogWriter:
+    def __init__(self, path="applications_master_log.csv", flush_rows=None, flush_seconds=None):
+        self.path = path
+        self.flush_rows = int(flush_rows if flush_rows is not None else os.getenv("MASTER_LOG_FLUSH_ROWS", "20"))
+        self.flush_seconds = float(flush_seconds if flush_seconds is not None
+                                   else os.getenv("MASTER_LOG_FLUSH_SECONDS", "5"))
+        self._rows = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._timer = None
+        self.flushes = 0
+
+    def pending_hashes(self):
+        with self._lock:
+            return {row["job_hash"] for row in self._rows}
+
+    def append(self, row):
+        with self._lock:
+            self._rows.append(row)
+            full = len(self._rows) >= self.flush_rows
+        if full:
+            self.flush()
+        elif self.flush_seconds > 0:
+            self._start_timer()
+
+    def _start_timer(self):
+        if self._timer is None and not self._stop.is_set():
+            self._timer = threading.Thread(target=self._run_timer, name="master-log-flush", daemon=True)
+            self._timer.start()
+
+    def _run_timer(self):
+        while not self._stop.wait(self.flush_seconds):
+            try:
+                self.flush()
+            except OSError as e:
+                # The rows are back in the buffer; the thread must survive to try again
+                print(f"   ⚠️  Master CSV flush failed ({e}); retrying in {self.flush_seconds:.0f}s")
+
+    def flush(self):
+        """Appends every buffered row in one write and fsyncs. Returns the number of rows written."""
+        with self._lock:
+            rows, self._rows = self._rows, []
+            if not rows:
+                return 0
+            try:
+                file_exists = os.path.isfile(self.path) and os.path.getsize(self.path) > 0
+                with open(self.path, mode='a', newline='', encoding='utf-8') as f:
+                    writer = csv.DictWriter(f, fieldnames=rows[0].keys())
+                    if not file_exists:
+                        writer.writeheader()
+                    writer.writerows(rows)
+                    f.flush()
+                    os.fsync(f.fileno())
+            except OSError:
+                self._rows = rows + self._rows  # Keep them for the next attempt
+                raise
+            self.flushes += 1
+        print(f"   📊 Master CSV: {len(rows)} rows flushed")
+        return len(rows)
+
+    def close(self):
+        """Stops the timer and writes what is left (clean shutdown)."""
+        self._stop.set()
+        if self._timer:
+            self._timer.join()
+            self._timer = None
+        return self.flush()
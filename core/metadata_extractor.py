@@ -0,0 +1,208 @@
+"""
+core/metadata_extractor.py
+Deterministic extraction of job metadata (salary, country, work model, benefits
+and apply instructions) with confidence scores.
+Fields found here with enough confidence are not requested from the AI, and are
+available instantly for filtering before any LLM call.
+"""
+
+import os
+import re
+from collections import Counter
+
+METADATA_FIELDS = ["salary", "country", "work_model", "benefits", "apply_instructions"]
+
+_CURRENCY = r"(?:US\$|CA\$|C\$|R\$|A\$|[$€£]|USD|CAD|EUR|GBP|BRL|AUD)"
+_AMOUNT = r"\d{1,3}(?:[,.]\d{3})+(?:\.\d{2})?|\d+(?:\.\d+)?\s?[kK]|\d{2,3}(?:\.\d{2})?"
+_SALARY_RANGE_RE = re.compile(
+    rf"(?P<cur1>{_CURRENCY})?\s?(?P<low>{_AMOUNT})\s*(?:-|–|—|to)\s*(?P<cur2>{_CURRENCY})?\s?(?P<high>{_AMOUNT})"
+    rf"(?:\s*(?P<code>USD|CAD|EUR|GBP|BRL|AUD))?"
+    rf"(?:\s*(?:/|per|an?)\s*(?P<period>hour|hr|year|yr|annum|month))?",
+    flags=re.IGNORECASE
+)
+_SALARY_SINGLE_RE = re.compile(
+    rf"(?:salary|pay|compensation|base)[^\n.]{{0,40}}?(?P<cur>{_CURRENCY})\s?(?P<amount>{_AMOUNT})"
+    rf"(?:\s*(?P<code>USD|CAD|EUR|GBP|BRL|AUD))?",
+    flags=re.IGNORECASE
+)
+# Funding rounds, revenue and valuations use the same notation ("raised $20-30 million")
+_MAGNITUDE_RE = re.compile(r"\s*(?:million|billion|trillion|mm|bn|[mb])\b", flags=re.IGNORECASE)
+_FUNDING_RE = re.compile(r"\b(?:rais(?:ed|ing)|funding|funded|series [a-f]|seed|revenue|arr|valuation|valued|"
+                         r"investment|invested|backed|round|assets under management|aum)\b[^\n.]*$",
+                         flags=re.IGNORECASE)
+
+_WORK_MODEL_TAG_RE = re.compile(r"\((remote|hybrid|on-?site)\)|workplace type is (remote|hybrid|on-?site)",
+                                flags=re.IGNORECASE)
+_WORK_MODEL_WORD_RE = re.compile(r"\b(remote|hybrid|on-?site|in[- ]office)\b", flags=re.IGNORECASE)
+_WORK_MODEL_LABELS = {"remote": "Remote", "hybrid": "Hybrid", "onsite": "On-Site", "on-site": "On-Site",
+                      "in-office": "On-Site", "in office": "On-Site"}
+
+CA_PROVINCES = {"AB", "BC", "MB", "NB", "NL", "NS", "NT", "NU", "ON", "PE", "QC", "SK", "YT"}
+US_STATES = {
+    "AL", "AK", "AZ", "AR", "CA", "CO", "CT", "DE", "FL", "GA", "HI", "ID", "IL", "IN", "IA", "KS", "KY",
+    "LA", "ME", "MD", "MA", "MI", "MN", "MS", "MO", "MT", "NE", "NV", "NH", "NJ", "NM", "NY", "NC", "ND",
+    "OH", "OK", "OR", "PA", "RI", "SC", "SD", "TN", "TX", "UT", "VT", "VA", "WA", "WV", "WI", "WY", "DC"
+}
+COUNTRY_ALIASES = {
+    "canada": "Canada", "united states": "United States", "usa": "United States", "u.s.": "United States",
+    "united kingdom": "United Kingdom", "uk": "United Kingdom", "england": "United Kingdom",
+    "ireland": "Ireland", "germany": "Germany", "france": "France", "spain": "Spain", "portugal": "Portugal",
+    "netherlands": "Netherlands", "brazil": "Brazil", "brasil": "Brazil", "mexico": "Mexico",
+    "india": "India", "australia": "Australia", "poland": "Poland", "argentina": "Argentina",
+}
+_LOCATION_RE = re.compile(r"\b[A-Z][A-Za-z .'-]+,\s(?P<code>[A-Z]{2})\b")
+_COUNTRY_RE = re.compile(r"\b(" + "|".join(re.escape(k) for k in COUNTRY_ALIASES) + r")\b", flags=re.IGNORECASE)
+_CURRENCY_COUNTRY = {"CAD": "Canada", "CA$": "Canada", "C$": "Canada", "GBP": "United Kingdom", "£": "United Kingdom",
+                     "BRL": "Brazil", "R$": "Brazil", "AUD": "Australia", "A$": "Australia"}
+
+BENEFIT_KEYWORDS = {
+    "401(k)": r"401\(?k\)?",
+    "RRSP": r"\brrsp\b",
+    "Health": r"\b(health|medical)\b",
+    "Dental": r"\bdental\b",
+    "Vision": r"\bvision (insurance|care|coverage)\b",
+    "PTO": r"\b(pto|paid time off|vacation|unlimited time off)\b",
+    "Parental Leave": r"\b(parental|maternity|paternity) leave\b",
+    "Equity": r"\b(stock options?|rsus?|equity (grant|package|compensation|plan))\b",
+    "Bonus": r"\b((annual|performance|signing|sign-on|target) bonus|bonus (plan|program|eligib\w*))\b",
+    "Learning Budget": r"\b(learning|education|training) (budget|stipend|allowance)\b",
+    "Home Office Stipend": r"\b(home office|remote work|wfh) (stipend|allowance)\b",
+}
+_BENEFIT_RES = {label: re.compile(p, flags=re.IGNORECASE) for label, p in BENEFIT_KEYWORDS.items()}
+
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+_APPLY_URL_RE = re.compile(r"apply[^\n]{0,60}?(https?://\S+)", flags=re.IGNORECASE)
+
+
+class MetadataExtractor:
+    """
+    Regex/heuristic extractor for the STEP 1 fields of the generation prompt.
+
+    Attributes:
+        min_confidence (float): Fields at or above this score are trusted and not sent to the AI.
+    """
+
+    def __init__(self, min_confidence=None):
+        if min_confidence is None:
+            min_confidence = float(os.getenv("EXTRACTOR_MIN_CONFIDENCE", "0.8"))
+        self.min_confidence = min_confidence
+
+    def extract(self, text):
+        """
+        Returns:
+            dict: field -> {'value': str, 'confidence': float} for every field found.
+        """
+        text = str(text or "")
+        header = "\n".join(text.splitlines()[:20])
+        found = {}
+        for field, finder in (
+            ("salary", self._salary),
+            ("country", lambda t: self._country(t, header)),
+            ("work_model", lambda t: self._work_model(t, header)),
+            ("benefits", self._benefits),
+            ("apply_instructions", self._apply_instructions),
+        ):
+            result = finder(text)
+            if result:
+                found[field] = {"value": result[0], "confidence": round(result[1], 2)}
+        return found
+
+    def confident_values(self, extracted):
+        """Keeps only the values trusted enough to skip the AI extraction."""
+        return {
+            field: data["value"]
+            for field, data in extracted.items()
+            if data["confidence"] >= self.min_confidence
+        }
+
+    @staticmethod
+    def _is_company_figure(text, match):
+        """True for amounts in millions/billions or introduced by funding/revenue wording in the same sentence."""
+        if _MAGNITUDE_RE.match(text, match.end()):
+            return True
+        return bool(_FUNDING_RE.search(text[max(0, match.start() - 80):match.start()]))
+
+    @classmethod
+    def _salary(cls, text):
+        for match in _SALARY_RANGE_RE.finditer(text):
+            currency = match.group("cur1") or match.group("cur2")
+            code = match.group("code")
+            if not (currency or code):
+                continue  # Bare number ranges ("3-5 years") are not salaries
+            if cls._is_company_figure(text, match):
+                continue  # "$20-30 million" is funding or revenue, not pay
+            value = match.group(0).strip()
+            confidence = 0.95 if (currency and (code or match.group("period"))) else 0.85
+            return value, confidence
+
+        match = next((m for m in _SALARY_SINGLE_RE.finditer(text) if not cls._is_company_figure(text, m)), None)
+        if match:
+            value = f"{match.group('cur')}{match.group('amount')}"
+            if match.group("code"):
+                value += f" {match.group('code')}"
+            return value, 0.7
+        return None
+
+    @staticmethod
+    def _work_model(text, header):
+        tags = [a or b for a, b in _WORK_MODEL_TAG_RE.findall(text)]
+        if tags:
+            labels = {_WORK_MODEL_LABELS[t.lower().replace("onsite", "on-site")] for t in tags}
+            if len(labels) == 1:
+                return labels.pop(), 0.95
+            return " / ".join(sorted(labels)), 0.6
+
+        words = Counter(
+            _WORK_MODEL_LABELS.get(w.lower().replace("onsite", "on-site"), "On-Site")
+            for w in _WORK_MODEL_WORD_RE.findall(text)
+        )
+        if words:
+            label = words.most_common(1)[0][0]
+            return label, 0.75 if _WORK_MODEL_WORD_RE.search(header) else 0.5
+        return None
+
+    @staticmethod
+    def _country(text, header):
+        for match in _LOCATION_RE.finditer(header):
+            code = match.group("code")
+            if code in CA_PROVINCES:
+                return "Canada", 0.9
+            if code in US_STATES:
+                return "United States", 0.9
+
+        header_match = _COUNTRY_RE.search(header)
+        if header_match:
+            return COUNTRY_ALIASES[header_match.group(1).lower()], 0.85
+
+        mentions = Counter(COUNTRY_ALIASES[m.lower()] for m in _COUNTRY_RE.findall(text))
+        if mentions:
+            return mentions.most_common(1)[0][0], 0.65
+
+        for currency, country in _CURRENCY_COUNTRY.items():
+            if currency in text:
+                return country, 0.5
+        return None
+
+    @staticmethod
+    def _benefits(text):
+        labels = [label for label, pattern in _BENEFIT_RES.items() if pattern.search(text)]
+        if labels:
+            # We can confirm what is there, but not prove the list is complete
+            return ", ".join(labels), 0.7 if len(labels) < 3 else 0.8
+        return None
+
+    @staticmethod
+    def _apply_instructions(text):
+        if re.search(r"\beasy apply\b", text, flags=re.IGNORECASE):
+            return "Easy Apply (LinkedIn)", 0.9
+        url = _APPLY_URL_RE.search(text)
+        if url:
+            return f"Apply at {url.group(1).rstrip('.,)')}", 0.85
+        for line in text.splitlines():
+            if re.search(r"\b(apply|send|email)\b", line, flags=re.IGNORECASE):
+                email = _EMAIL_RE.search(line)
+                if email:
+                    return f"Send application to {email.group(0).rstrip('.')}", 0.85
+        if re.search(r"responses managed off linkedin", text, flags=re.IGNORECASE):
+            return "Apply on the company website (via LinkedIn 'Apply')", 0.75
+        return None
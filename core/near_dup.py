@@ -0,0 +1,255 @@
+"""
+core/near_dup.py
+Near-duplicate job detection with 64-bit SimHash fingerprints.
+generate_job_hash is exact, so a repost with a new "Reposted 4 days ago" line or
+applicant count would cost another full AI generation. This index catches those
+reposts before the AI call and links them to the folder already generated.
+Each indexed job is appended to a journal (near_dup_index.journal.jsonl) under a
+file lock; the journal is folded into the JSON snapshot once it grows.
+"""
+
+import os
+import re
+import json
+import hashlib
+from datetime import datetime
+from core.utils import file_lock
+
+FINGERPRINT_BITS = 64
+# Pigeonhole banding: with 4 bands of 16 bits, any pair within 3 bits of each
+# other shares at least one identical band, so lookups only touch candidates.
+BAND_COUNT = 4
+BAND_BITS = FINGERPRINT_BITS // BAND_COUNT
+BAND_MASK = (1 << BAND_BITS) - 1
+# The journal is folded into the snapshot once it has more lines than this (or than the snapshot has jobs)
+COMPACT_LINES = 500
+
+# LinkedIn lines that change between reposts without changing the job itself
+VOLATILE_PATTERNS = [
+    r"(re)?posted\s+\d+\s+\w+\s+ago",
+    r"over\s+\d[\d,]*\s+(people|applicants)\s+clicked\s+apply",
+    r"\d[\d,]*\s+(applicants?|people clicked apply)",
+    r"promoted by hirer",
+    r"responses managed (off|on) linkedin",
+    r"actively (recruiting|reviewing applicants)",
+]
+_VOLATILE_RE = re.compile("|".join(VOLATILE_PATTERNS), flags=re.IGNORECASE)
+_TOKEN_RE = re.compile(r"[a-z0-9+#]+")
+
+
+def normalize_description(text):
+    """Lowercases, drops volatile LinkedIn lines and returns the word tokens."""
+    text = _VOLATILE_RE.sub(" ", str(text or ""))
+    return _TOKEN_RE.findall(text.lower())
+
+
+def simhash(text, shingle_size=3):
+    """
+    Computes a 64-bit SimHash over word shingles of the normalised text.
+    Similar descriptions produce fingerprints with a small Hamming distance.
+    """
+    tokens = normalize_description(text)
+    if len(tokens) < shingle_size:
+        shingles = [" ".join(tokens)] if tokens else []
+    else:
+        shingles = [" ".join(tokens[i:i + shingle_size]) for i in range(len(tokens) - shingle_size + 1)]
+
+    weights = [0] * FINGERPRINT_BITS
+    for shingle in shingles:
+        h = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(FINGERPRINT_BITS):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming_distance(a, b):
+    return (a ^ b).bit_count()
+
+
+class NearDuplicateIndex:
+    """
+    Persistent SimHash index of every processed job.
+
+    Attributes:
+        max_distance (int): Max differing bits to consider two postings the same job.
+        action (str): 'skip' reposts before the AI call, or just 'flag' them.
+    """
+
+    def __init__(self, index_path=None, max_distance=None, action=None):
+        self.index_path = index_path or os.getenv("NEAR_DUP_INDEX", "near_dup_index.json")
+        self.max_distance = int(max_distance if max_distance is not None else os.getenv("NEAR_DUP_MAX_DISTANCE", "3"))
+        self.action = (action or os.getenv("NEAR_DUP_ACTION", "skip")).lower()
+        if self.max_distance >= BAND_COUNT:
+            # Banding only guarantees recall below BAND_COUNT bits; fall back to a full scan
+            print(f"⚠️  NEAR_DUP_MAX_DISTANCE={self.max_distance} disables banded lookups (slower).")
+        stem = os.path.splitext(self.index_path)[0]
+        self.journal_path = f"{stem}.journal.jsonl"
+        self.lock_path = f"{stem}.lock"
+        self.entries = {}
+        self._bands = [dict() for _ in range(BAND_COUNT)]
+        self._journal_lines = 0
+        self._load()
+
+    def _load(self):
+        for job_hash, entry in self._read_disk().items():
+            self._insert(job_hash, entry)
+
+    def _read_disk(self):
+        """Snapshot plus journal as stored on disk: job_hash -> entry (fingerprints as ints)."""
+        stored = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        self._journal_lines = 0
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # Cut short by a crash
+                    stored[record.pop("job_hash")] = record
+                    self._journal_lines += 1
+        for entry in stored.values():
+            entry["fingerprint"] = int(entry["fingerprint"], 16)
+        return stored
+
+    @staticmethod
+    def _stored(entry):
+        return {**entry, "fingerprint": f"{entry['fingerprint']:016x}"}
+
+    def _locked(self):
+        os.makedirs(os.path.dirname(self.lock_path) or ".", exist_ok=True)
+        return file_lock(self.lock_path)
+
+    def _append(self, job_hash):
+        """Appends one indexed job to the journal (folded into the snapshot once the journal grows)."""
+        line = json.dumps({"job_hash": job_hash, **self._stored(self.entries[job_hash])}, ensure_ascii=False)
+        with self._locked():
+            with open(self.journal_path, "a+b") as f:
+                if f.tell():
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        line = "\n" + line  # Terminate a line cut short by a crash
+                f.write((line + "\n").encode("utf-8"))
+            self._journal_lines += 1
+            if self._journal_lines > max(COMPACT_LINES, len(self.entries) - self._journal_lines):
+                self._compact()
+
+    def save(self):
+        """Writes the whole index as the snapshot (kept with what other processes appended)."""
+        with self._locked():
+            self._compact()
+
+    def _compact(self):
+        """Folds the journal and the in-memory entries into the snapshot (file lock held)."""
+        for job_hash, entry in self._read_disk().items():
+            if job_hash not in self.entries:
+                self._insert(job_hash, entry)
+        data = {job_hash: self._stored(entry) for job_hash, entry in self.entries.items()}
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        self._journal_lines = 0
+
+    def _insert(self, job_hash, entry):
+        self.entries[job_hash] = entry
+        fingerprint = entry["fingerprint"]
+        for band in range(BAND_COUNT):
+            key = (fingerprint >> (band * BAND_BITS)) & BAND_MASK
+            self._bands[band].setdefault(key, set()).add(job_hash)
+
+    def _candidates(self, fingerprint):
+        if self.max_distance >= BAND_COUNT:
+            return self.entries.keys()
+        candidates = set()
+        for band in range(BAND_COUNT):
+            key = (fingerprint >> (band * BAND_BITS)) & BAND_MASK
+            candidates.update(self._bands[band].get(key, ()))
+        return candidates
+
+    def find_similar(self, description, fingerprint=None):
+        """
+        Returns the closest indexed job within max_distance, or None.
+
+        Returns:
+            dict | None: The stored entry plus 'job_hash' and 'distance'.
+        """
+        if fingerprint is None:
+            fingerprint = simhash(description)
+        best = None
+        for job_hash in self._candidates(fingerprint):
+            distance = hamming_distance(fingerprint, self.entries[job_hash]["fingerprint"])
+            if distance <= self.max_distance and (best is None or distance < best["distance"]):
+                best = {**self.entries[job_hash], "job_hash": job_hash, "distance": distance}
+        return best
+
+    def add(self, job_hash, description, company, title, folder, fingerprint=None, save=True):
+        """Indexes a processed job and the folder holding its documents."""
+        self._insert(job_hash, {
+            "fingerprint": fingerprint if fingerprint is not None else simhash(description),
+            "company": company,
+            "title": title,
+            "folder": folder,
+            "added": datetime.now().isoformat()
+        })
+        if save:
+            self._append(job_hash)
+
+    def backfill(self, base_path="zzz_output"):
+        """Indexes job folders generated before the index existed (one-off walk)."""
+        added = 0
+        if not os.path.isdir(base_path):
+            return added
+        for folder_name in os.listdir(base_path):
+            metadata_path = os.path.join(base_path, folder_name, "metadata.json")
+            if folder_name.startswith(".") or not os.path.exists(metadata_path):
+                continue
+            with open(metadata_path, "r", encoding="utf-8") as f:
+                metadata = json.load(f)
+            job_hash = metadata["application_meta"].get("job_hash")
+            if not job_hash or job_hash in self.entries:
+                continue
+            self.add(job_hash, metadata["generated_content"].get("job_description_raw", ""),
+                     metadata["job_info"]["company"], metadata["job_info"]["title"],
+                     os.path.join(base_path, folder_name), save=False)
+            added += 1
+        if added:
+            self.save()
+        return added
+
+    def link_repost(self, original, job_data, job_hash, fingerprint=None):
+        """
+        Records a repost against the folder of the original job (linked_postings.json)
+        and indexes the new hash so later lookups resolve to the same folder.
+        """
+        if job_hash in self.entries:
+            return  # Already linked on a previous run
+        folder = original.get("folder")
+        if folder and os.path.isdir(folder):
+            links_path = os.path.join(folder, "linked_postings.json")
+            links = []
+            if os.path.exists(links_path):
+                with open(links_path, "r", encoding="utf-8") as f:
+                    links = json.load(f)
+            links.append({
+                "job_hash": job_hash,
+                "company": job_data.get("company"),
+                "title": job_data.get("title"),
+                "url": job_data.get("url"),
+                "distance": original["distance"],
+                "seen_at": datetime.now().isoformat()
+            })
+            with open(links_path, "w", encoding="utf-8") as f:
+                json.dump(links, f, indent=4, ensure_ascii=False)
+
+        self.add(job_hash, job_data.get("description", ""), job_data.get("company"),
+                 job_data.get("title"), folder, fingerprint=fingerprint)
@@ -0,0 +1,76 @@
+"""
+core/pdf_backends.py
+Interchangeable engines that turn the final HTML document into a PDF file.
+xhtml2pdf runs in-process; the Chromium backend keeps one warm headless browser
+and renders every document through the same page.
+"""
+
+from xhtml2pdf import pisa
+from playwright.sync_api import sync_playwright
+
+
+class XHTML2PDFBackend:
+    """Pure-Python renderer (default). Limited CSS support, no external process."""
+
+    name = "xhtml2pdf"
+
+    def render(self, html, dest_path):
+        with open(dest_path, "wb") as result_file:
+            pisa_status = pisa.CreatePDF(html, dest=result_file)
+
+        if pisa_status.err:
+            raise Exception(f"Erro ao gerar PDF: {pisa_status.err}")
+
+    def close(self):
+        pass
+
+
+class ChromiumPDFBackend:
+    """
+    Headless Chromium renderer using Playwright's page.pdf().
+
+    The browser is launched on the first render and reused until close(),
+    so the startup cost is paid once per process instead of once per document.
+    """
+
+    name = "chromium"
+
+    def __init__(self):
+        self._playwright = None
+        self._browser = None
+        self._page = None
+
+    def _ensure_page(self):
+        if self._page is None:
+            self._playwright = sync_playwright().start()
+            self._browser = self._playwright.chromium.launch(headless=True)
+            self._page = self._browser.new_page()
+        return self._page
+
+    def render(self, html, dest_path):
+        page = self._ensure_page()
+        page.set_content(html, wait_until="load")
+        # prefer_css_page_size keeps the @page size/margins defined in the stylesheet
+        page.pdf(path=dest_path, format="A4", print_background=True, prefer_css_page_size=True)
+
+    def close(self):
+        """Shuts down the warm browser (safe to call more than once)."""
+        if self._browser is not None:
+            self._browser.close()
+        if self._playwright is not None:
+            self._playwright.stop()
+        self._playwright = self._browser = self._page = None
+
+
+class PDFBackendFactory:
+    BACKENDS = {
+        XHTML2PDFBackend.name: XHTML2PDFBackend,
+        ChromiumPDFBackend.name: ChromiumPDFBackend,
+    }
+
+    @staticmethod
+    def get_backend(name):
+        backend_cls = PDFBackendFactory.BACKENDS.get(name.strip().lower())
+        if backend_cls is None:
+            raise ValueError(f"❌ PDF backend não suportado: {name}")
+        return backend_cls()
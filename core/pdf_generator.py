@@ -1,78 +1,130 @@
 # Create PDF from Resume Markdown file
 # core/pdf_generator.py
-# core/pdf_generator.py
 import os
 import re
-from markdown import markdown
-from xhtml2pdf import pisa
+import hashlib
+from markdown import Markdown
+from core.pdf_backends import PDFBackendFactory
+from core.render_cache import RenderCache
+
+STYLESHEET = """
+    @page {
+        size: a4;
+        margin: 2cm;
+    }
+    body {
+        font-family: Helvetica, Arial, sans-serif;
+        font-size: 10pt;
+        line-height: 1.4;
+        color: #333;
+    }
+    h1 {
+        color: #2c3e50;
+        font-size: 18pt;
+        margin-bottom: 5pt;
+        text-align: left; /* Alinha com o padrão do MD */
+    }
+    h3 {
+        color: #2c3e50;
+        margin-top: 15pt;
+        border-bottom: 1px solid #eee;
+        font-size: 12pt;
+    }
+    b, strong {
+        color: #000;
+    }
+    ul {
+        padding-left: 15pt;
+    }
+    li {
+        margin-bottom: 4pt;
+    }
+    p {
+        margin-bottom: 8pt;
+    }
+"""
+
+# HTML completo montado uma única vez por processo; só o corpo muda entre documentos
+_HTML_HEAD = f"""
+<html>
+<head>
+    <meta charset="utf-8">
+    <style>{STYLESHEET}</style>
+</head>
+<body>
+"""
+_HTML_TAIL = """
+</body>
+</html>
+"""
+
+# Qualquer mudança no template invalida o cache de PDFs
+TEMPLATE_VERSION = hashlib.sha256((_HTML_HEAD + _HTML_TAIL).encode("utf-8")).hexdigest()[:12]
+
+_md_converter = None
+
+
+def _markdown_to_html(md_content):
+    """Reuses a single Markdown converter per process (extensions are loaded once)."""
+    global _md_converter
+    if _md_converter is None:
+        _md_converter = Markdown(extensions=['extra', 'smarty'])
+    return _md_converter.reset().convert(md_content)
+
+
+def build_html(md_content):
+    """Wraps the rendered markdown in the shared HTML/CSS template."""
+    return _HTML_HEAD + _markdown_to_html(md_content) + _HTML_TAIL
 
 
 class PDFGenerator:
-    def __init__(self):
+    def __init__(self, cache=None, backend=None):
         self.user_name = os.getenv("USER_FULL_NAME", "Candidato")
+        self.cache = cache or RenderCache()
+        # PDF_BACKEND: 'xhtml2pdf' (default) or 'chromium'
+        self.backend = backend or PDFBackendFactory.get_backend(os.getenv("PDF_BACKEND", "xhtml2pdf"))
 
     def convert_resume(self, md_content, job_title, output_path):
+        return self.render(md_content, job_title, output_path)[0]
+
+    def render(self, md_content, job_title, output_path, force=False):
+        """
+        Renders a PDF unless an identical one is already cached (or force is set).
+
+        Returns:
+            tuple: (pdf_path, status) where status is 'rendered', 'linked' or 'skipped'.
+        """
         # 1. Preparar nome do arquivo
         clean_title = re.sub(r'[\\/*?:"<>|]', "", job_title).replace(" ", "_")
         filename = f"{self.user_name}_{clean_title}.pdf"
         final_pdf_path = os.path.join(output_path, filename)
 
-        # 2. Converter Markdown para HTML
-        html_body = markdown(md_content, extensions=['extra', 'smarty'])
-
-        # 3. HTML completo (SEM o bloco centralizado duplicado)
-        full_html = f"""
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <style>
-                @page {{
-                    size: a4;
-                    margin: 2cm;
-                }}
-                body {{
-                    font-family: Helvetica, Arial, sans-serif;
-                    font-size: 10pt;
-                    line-height: 1.4;
-                    color: #333;
-                }}
-                h1 {{
-                    color: #2c3e50;
-                    font-size: 18pt;
-                    margin-bottom: 5pt;
-                    text-align: left; /* Alinha com o padrão do MD */
-                }}
-                h3 {{
-                    color: #2c3e50;
-                    margin-top: 15pt;
-                    border-bottom: 1px solid #eee;
-                    font-size: 12pt;
-                }}
-                b, strong {{
-                    color: #000;
-                }}
-                ul {{
-                    padding-left: 15pt;
-                }}
-                li {{
-                    margin-bottom: 4pt;
-                }}
-                p {{
-                    margin-bottom: 8pt;
-                }}
-            </style>
-        </head>
-        <body>
-            {html_body}
-        </body>
-        </html>
-        """
+        # 2. Verificar o cache (markdown + template/backend + nome do usuário)
+        key = RenderCache.make_key(md_content, f"{TEMPLATE_VERSION}-{self.backend.name}", self.user_name)
+        status = None if force else self.cache.lookup(key, final_pdf_path)
+        if status:
+            return final_pdf_path, status
+
+        # 3. Converter Markdown para HTML
+        full_html = build_html(md_content)
+
+        # 4. Gerar o PDF em arquivo temporário (nunca sobrescreve um blob do cache já linkado)
+        tmp_pdf_path = f"{final_pdf_path}.tmp-{os.getpid()}"
+        try:
+            self.backend.render(full_html, tmp_pdf_path)
+        except Exception:
+            if os.path.exists(tmp_pdf_path):
+                os.remove(tmp_pdf_path)
+            raise
 
-        # 4. Gerar o PDF
-        with open(final_pdf_path, "wb") as result_file:
-            pisa_status = pisa.CreatePDF(full_html, dest=result_file)
+        os.replace(tmp_pdf_path, final_pdf_path)
+        self.cache.store(key, final_pdf_path, replace=force)
+        return final_pdf_path, "rendered"
 
-        if pisa_status.err:
-            raise Exception(f"Erro ao gerar PDF: {pisa_status.err}")
+    def cache_stats(self):
+        """Hit/miss counters of the render cache for this process."""
+        return dict(self.cache.stats)
 
-        return final_pdf_path
+    def close(self):
+        """Releases backend resources (e.g. the warm Chromium browser)."""
+        self.backend.close()
@@ -0,0 +1,148 @@
+"""
+core/pdf_service.py
+PDF rendering service backed by a process pool.
+xhtml2pdf is CPU-bound and holds the GIL, so documents are rendered in worker
+processes and callers receive futures instead of blocking the pipeline thread.
+"""
+
+import os
+import time
+import threading
+from multiprocessing.util import Finalize
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from core.pdf_generator import PDFGenerator
+
+# One generator per worker process, created by the pool initializer
+_worker_generator = None
+
+
+def _init_worker():
+    """Builds the PDFGenerator once per worker process."""
+    global _worker_generator
+    _worker_generator = PDFGenerator()
+    # Worker processes skip atexit, so register the backend cleanup with multiprocessing
+    Finalize(None, _worker_generator.close, exitpriority=10)
+
+
+def _render_document(md_content, job_title, output_path, force=False):
+    """Runs inside a worker process. Returns (pdf_path, cache status, seconds)."""
+    global _worker_generator
+    if _worker_generator is None:
+        _init_worker()
+    start = time.perf_counter()
+    pdf_path, status = _worker_generator.render(md_content, job_title, output_path, force=force)
+    return pdf_path, status, time.perf_counter() - start
+
+
+class PDFRenderService:
+    """
+    Submits render jobs to a pool of worker processes.
+
+    Each document is an independent future, so a failure in one PDF never
+    blocks or cancels the other documents of the same export.
+    """
+
+    def __init__(self, max_workers=None):
+        if max_workers is None:
+            max_workers = int(os.getenv("PDF_RENDER_WORKERS", "0")) or None
+        self.max_workers = max_workers or max(1, min(4, os.cpu_count() or 1))
+        self._executor = None
+        self._lock = threading.Lock()
+        # Outcome counters aggregated from every collected document
+        self.stats = {"rendered": 0, "linked": 0, "skipped": 0, "failed": 0}
+
+    def _get_executor(self):
+        # The pool is started lazily so importing the service stays cheap
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    initializer=_init_worker
+                )
+            return self._executor
+
+    def _restart_if_broken(self):
+        """Replaces a pool whose worker died (e.g. killed by the OOM killer); later documents use the new one."""
+        with self._lock:
+            broken = self._executor
+            if broken is not None and broken._broken:
+                print("   ⚠️  PDF worker pool broken; restarting it.")
+                broken.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def submit(self, md_content, job_title, output_path, force=False):
+        """Queues a single document and returns a Future resolving to (pdf_path, status, seconds)."""
+        try:
+            return self._get_executor().submit(_render_document, md_content, job_title, output_path, force)
+        except BrokenProcessPool:
+            self._restart_if_broken()
+            return self._get_executor().submit(_render_document, md_content, job_title, output_path, force)
+
+    def submit_job(self, documents, output_path, force=False):
+        """
+        Queues every document of one job folder.
+
+        Args:
+            documents (dict): Maps a PDF title (e.g. 'Resume_Engineer') to its markdown.
+            output_path (str): Folder where the PDFs are written.
+            force (bool): Re-render even when the cache says the PDF is current.
+
+        Returns:
+            dict: Maps each PDF title to its Future.
+        """
+        return {
+            title: self.submit(md_content, title, output_path, force)
+            for title, md_content in documents.items()
+        }
+
+    def render_many(self, jobs, force=False):
+        """
+        Renders the documents of many jobs at once across all workers.
+
+        Args:
+            jobs (list): Tuples of (documents dict, output_path).
+            force (bool): Bypass the render cache.
+
+        Returns:
+            list: One dict per document with 'title', 'output_path', 'pdf_path', 'status',
+            'seconds' and 'error'.
+        """
+        pending = []
+        for documents, output_path in jobs:
+            for title, future in self.submit_job(documents, output_path, force).items():
+                pending.append((title, output_path, future))
+
+        return [self.collect(title, output_path, future) for title, output_path, future in pending]
+
+    def collect(self, title, output_path, future):
+        """Waits for a single future and reports its outcome without raising."""
+        outcome = {"title": title, "output_path": output_path, "pdf_path": None,
+                   "status": "failed", "seconds": None, "error": None}
+        try:
+            outcome["pdf_path"], outcome["status"], outcome["seconds"] = future.result()
+        except BrokenProcessPool as e:
+            outcome["error"] = str(e)
+            self._restart_if_broken()
+        except Exception as e:
+            outcome["error"] = str(e)
+        self.stats[outcome["status"]] += 1
+        return outcome
+
+    def cache_stats(self):
+        """Cache hits are documents that were linked or skipped instead of rendered."""
+        hits = self.stats["linked"] + self.stats["skipped"]
+        return {"hits": hits, "misses": self.stats["rendered"], **self.stats}
+
+    def shutdown(self, wait=True):
+        """Stops the worker processes once all queued documents are done."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown(wait=True)
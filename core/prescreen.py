@@ -0,0 +1,233 @@
+"""
+core/prescreen.py
+Cheap local fit pre-screen that gates the expensive AI generation.
+Scores the JD against assets/resume.txt with a NumPy TF-IDF cosine plus keyword
+coverage; jobs below PRESCREEN_MIN_SCORE are skipped or deferred (with the reason
+logged) so quota and time only go to viable applications.
+IDF comes from the JDs of earlier runs (prescreen_corpus.json), frozen when the
+screener is created, so the same JD always gets the same score within a run.
+Deferred jobs are screened again once the threshold or the resume changes.
+"""
+
+import os
+import re
+import csv
+import json
+import hashlib
+from collections import Counter
+from datetime import datetime
+import numpy as np
+
+STOPWORDS = set("""
+a about above across after all also an and any are as at be been being both but by can could do does
+for from has have having how if in into is it its just may more most must no not of on or our ours out
+over own per should so such than that the their them then there these they this those through to under
+up us very was we were what when where which while who will with within would you your yours
+ability able across etc experience experienced team teams work working role roles strong skills
+including include new using use help join looking plus well years year knowledge understanding
+re ll ve don
+""".split())
+
+_TOKEN_RE = re.compile(r"[a-z][a-z0-9+#.]*[a-z0-9+#]|[a-z]")
+
+
+def _stem(token):
+    """Light plural folding so 'pipelines' matches 'pipeline'."""
+    if not token.isalpha():
+        return token  # node.js, c#, c++
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    return token
+
+
+def tokenize(text, exclude=()):
+    """Lowercase terms (keeps tech tokens like c++, c#, node.js) without stopwords."""
+    tokens = _TOKEN_RE.findall(str(text or "").lower())
+    return [_stem(t) for t in tokens if t not in STOPWORDS and t not in exclude and len(t) > 1]
+
+
+class PreScreener:
+    """
+    Local resume/JD similarity scorer (0-10).
+
+    Attributes:
+        min_score (float): Jobs scoring below this are not sent to the full generation.
+        action (str): 'defer' persists low-fit jobs until the threshold or resume changes, 'skip' only logs them.
+        doc_freq, doc_count: IDF corpus snapshot (the resume plus the JDs learned by earlier runs).
+    """
+
+    def __init__(self, resume_path="assets/resume.txt", min_score=None, action=None,
+                 log_path="prescreen_log.csv", deferred_path="prescreen_deferred.jsonl",
+                 corpus_path="prescreen_corpus.json"):
+        self.min_score = float(min_score if min_score is not None else os.getenv("PRESCREEN_MIN_SCORE", "3.5"))
+        self.action = (action or os.getenv("PRESCREEN_ACTION", "defer")).lower()
+        self.borderline = float(os.getenv("PRESCREEN_BORDERLINE", "1.0"))
+        self.top_keywords = int(os.getenv("PRESCREEN_TOP_KEYWORDS", "40"))
+        self.log_path = log_path
+        self.deferred_path = deferred_path
+        self._deferred_hashes = set()
+        if os.path.exists(deferred_path):
+            with open(deferred_path, "r", encoding="utf-8") as f:
+                self._deferred_hashes = {json.loads(line)["job_hash"] for line in f if line.strip()}
+
+        with open(resume_path, "r", encoding="utf-8") as f:
+            resume_text = f.read()
+        self.resume_counts = Counter(tokenize(resume_text))
+        self.resume_digest = hashlib.sha256(resume_text.encode("utf-8")).hexdigest()[:12]
+
+        # Generic JD words lose weight as the corpus grows; the snapshot stays fixed for this process
+        self.corpus_path = corpus_path
+        self._learned = Counter()
+        self._learned_docs = 0
+        self._learned_hashes = set()
+        self.doc_freq = Counter(self.resume_counts.keys())
+        self.doc_count = 1
+        if corpus_path and os.path.exists(corpus_path):
+            with open(corpus_path, "r", encoding="utf-8") as f:
+                corpus = json.load(f)
+            self.doc_freq.update(corpus["doc_freq"])
+            self.doc_count += corpus["doc_count"]
+
+    def score(self, job_description, company=""):
+        """
+        Scores one JD against the resume. Pure: the corpus snapshot is never modified here.
+
+        Returns:
+            dict: 'score' (0-10), 'cosine', 'coverage' and the top JD keywords missing from the resume.
+        """
+        # The company name is repeated all over the JD but says nothing about fit
+        jd_counts = Counter(tokenize(job_description, exclude=set(tokenize(company))))
+        if not jd_counts:
+            return {"score": 0.0, "cosine": 0.0, "coverage": 0.0, "missing": []}
+
+        vocab = list(jd_counts.keys() | self.resume_counts.keys())
+        jd_tf = np.array([jd_counts.get(t, 0) for t in vocab], dtype=float)
+        resume_tf = np.array([self.resume_counts.get(t, 0) for t in vocab], dtype=float)
+        # The JD being scored counts as one more document of the corpus
+        df = np.array([self.doc_freq[t] for t in vocab], dtype=float) + (jd_tf > 0)
+        doc_count = self.doc_count + 1
+
+        # Sublinear TF and smoothed IDF
+        idf = np.log((1 + doc_count) / (1 + df)) + 1
+        jd_vec = np.where(jd_tf > 0, 1 + np.log(np.maximum(jd_tf, 1)), 0) * idf
+        resume_vec = np.where(resume_tf > 0, 1 + np.log(np.maximum(resume_tf, 1)), 0) * idf
+        norm = np.linalg.norm(jd_vec) * np.linalg.norm(resume_vec)
+        cosine = float(jd_vec @ resume_vec / norm) if norm else 0.0
+
+        # Keyword coverage: share of the JD's heaviest terms that the resume mentions
+        top = np.argsort(-jd_vec)[:self.top_keywords]
+        top = top[jd_vec[top] > 0]
+        covered = resume_tf[top] > 0
+        weights = jd_vec[top]
+        coverage = float(weights[covered].sum() / weights.sum()) if weights.sum() else 0.0
+        missing = [vocab[i] for i in top[~covered]][:10]
+
+        # A strong real-world match covers ~70% of the JD keywords with a cosine around 0.4
+        score = round(10 * (0.6 * min(1.0, coverage / 0.7) + 0.4 * min(1.0, cosine / 0.4)), 1)
+        return {"score": score, "cosine": round(cosine, 3), "coverage": round(coverage, 3), "missing": missing}
+
+    def learn(self, job_hash, job_description, company=""):
+        """Adds a screened JD to the corpus of later runs (written by save_corpus, not used by this one)."""
+        if job_hash in self._learned_hashes:
+            return
+        terms = set(tokenize(job_description, exclude=set(tokenize(company))))
+        if terms:
+            self._learned_hashes.add(job_hash)
+            self._learned.update(terms)
+            self._learned_docs += 1
+
+    def save_corpus(self):
+        """Merges the JDs learned in this run into prescreen_corpus.json (re-read first, so runs add up)."""
+        if not self._learned_docs or not self.corpus_path:
+            return 0
+        corpus = {"doc_count": 0, "doc_freq": {}}
+        if os.path.exists(self.corpus_path):
+            with open(self.corpus_path, "r", encoding="utf-8") as f:
+                corpus = json.load(f)
+        doc_freq = Counter(corpus["doc_freq"])
+        doc_freq.update(self._learned)
+        corpus = {"doc_count": corpus["doc_count"] + self._learned_docs, "doc_freq": dict(doc_freq)}
+        tmp_path = f"{self.corpus_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(corpus, f, ensure_ascii=False)
+        os.replace(tmp_path, self.corpus_path)
+        saved, self._learned, self._learned_docs = self._learned_docs, Counter(), 0
+        return saved
+
+    def is_borderline(self, score):
+        """True when the local score is too close to the threshold to trust on its own."""
+        return abs(score - self.min_score) <= self.borderline
+
+    def decide(self, result):
+        """Returns (passed, reason) for a score dict (optionally with a 'model_score')."""
+        final = result.get("model_score", result["score"])
+        if final >= self.min_score:
+            return True, f"score {final} ≥ {self.min_score}"
+        reason = f"score {final} < {self.min_score}"
+        if result["missing"]:
+            reason += f"; missing: {', '.join(result['missing'][:6])}"
+        return False, reason
+
+    def record(self, job_data, job_hash, result, passed, reason):
+        """Appends the decision to the pre-screen log and defers low-fit jobs if configured."""
+        row = {
+            "timestamp": datetime.now().isoformat(),
+            "job_hash": job_hash,
+            "company": job_data.get("company"),
+            "title": job_data.get("title"),
+            "score": result["score"],
+            "model_score": result.get("model_score", ""),
+            "cosine": result["cosine"],
+            "coverage": result["coverage"],
+            "decision": "pass" if passed else self.action,
+            "reason": reason
+        }
+        file_exists = os.path.isfile(self.log_path)
+        with open(self.log_path, mode="a", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=row.keys())
+            if not file_exists:
+                writer.writeheader()
+            writer.writerow(row)
+
+        if not passed and self.action == "defer" and job_hash not in self._deferred_hashes:
+            self._deferred_hashes.add(job_hash)
+            with open(self.deferred_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"job_hash": job_hash, "job_data": job_data, "prescreen": result,
+                                    "reason": reason, "min_score": self.min_score,
+                                    "resume_digest": self.resume_digest}, ensure_ascii=False) + "\n")
+
+    def take_reconsidered(self):
+        """
+        Deferred jobs decided under another threshold or resume version. They are removed
+        from the deferred file so the caller can screen them again (a job that still fails
+        is deferred again by record()); the others stay deferred.
+
+        Returns:
+            list: Deferred entries ('job_hash', 'job_data', 'prescreen', 'reason').
+        """
+        if not os.path.exists(self.deferred_path):
+            return []
+        with open(self.deferred_path, "r", encoding="utf-8") as f:
+            entries = [json.loads(line) for line in f if line.strip()]
+
+        def changed(entry):
+            return entry.get("min_score") != self.min_score or entry.get("resume_digest") != self.resume_digest
+
+        reconsidered = [e for e in entries if changed(e)]
+        if reconsidered:
+            kept = [e for e in entries if not changed(e)]
+            tmp_path = f"{self.deferred_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for entry in kept:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            os.replace(tmp_path, self.deferred_path)
+            self._deferred_hashes = {e["job_hash"] for e in kept}
+        return reconsidered
+
+
+def parse_model_score(text):
+    """Reads the first 0-10 number from a cheap-model reply."""
+    match = re.search(r"\b(10|\d)(?:\.\d+)?\b", str(text or ""))
+    return min(10.0, float(match.group(0))) if match else None
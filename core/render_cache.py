@@ -0,0 +1,82 @@
+"""
+core/render_cache.py
+Content-addressed cache for rendered PDFs.
+A PDF is identified by a hash of its markdown, the HTML template version and the
+user name, so unchanged documents are re-linked or copied instead of re-rendered.
+"""
+
+import os
+import shutil
+import filecmp
+import hashlib
+
+
+class RenderCache:
+    """
+    Stores one PDF blob per render key and links it into job folders.
+
+    Attributes:
+        cache_dir (str): Folder holding the '<key>.pdf' blobs.
+        stats (dict): Hit/miss counters for the current process.
+    """
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or os.getenv("PDF_CACHE_DIR", os.path.join("zzz_output", ".pdf_cache"))
+        self.stats = {"hits": 0, "misses": 0, "skipped": 0, "linked": 0}
+
+    @staticmethod
+    def make_key(md_content, template_version, user_name):
+        """Builds the deterministic render key for one document."""
+        data = f"{template_version}|{user_name}|{md_content}"
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def blob_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pdf")
+
+    def lookup(self, key, final_pdf_path):
+        """
+        Tries to satisfy a render from the cache.
+
+        Returns:
+            str | None: 'skipped' if the output already matches, 'linked' if the cached
+            blob was linked/copied into place, or None on a cache miss.
+        """
+        blob = self.blob_path(key)
+        if not os.path.exists(blob):
+            self.stats["misses"] += 1
+            return None
+
+        self.stats["hits"] += 1
+        if os.path.exists(final_pdf_path) and self._same_content(final_pdf_path, blob):
+            self.stats["skipped"] += 1
+            return "skipped"
+
+        self._place(blob, final_pdf_path)
+        self.stats["linked"] += 1
+        return "linked"
+
+    def store(self, key, final_pdf_path, replace=False):
+        """Registers a freshly rendered PDF under its key (replace=True refreshes the blob)."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        blob = self.blob_path(key)
+        if replace or not os.path.exists(blob):
+            self._place(final_pdf_path, blob)
+
+    @staticmethod
+    def _same_content(path_a, path_b):
+        try:
+            if os.path.samefile(path_a, path_b):
+                return True
+        except OSError:
+            return False
+        return filecmp.cmp(path_a, path_b, shallow=False)
+
+    @staticmethod
+    def _place(src, dest):
+        """Hard-links src to dest (copying across filesystems), replacing dest atomically."""
+        tmp_dest = f"{dest}.tmp-{os.getpid()}"
+        try:
+            os.link(src, tmp_dest)
+        except OSError:
+            shutil.copyfile(src, tmp_dest)
+        os.replace(tmp_dest, dest)
@@ -0,0 +1,104 @@
+"""
+core/saved_searches.py
+Saved LinkedIn searches polled by the daemon, and the memory of postings already seen.
+The config is re-read every cycle so searches can be added or paused without a
+restart. SeenJobs keeps LinkedIn job ids between runs so known cards are never
+opened (or screened) twice.
+"""
+
+import os
+import json
+import time
+
+DEFAULT_CONFIG_PATH = "saved_searches.json"
+KEEP_SEEN_DAYS = 60
+
+
+def load_searches(path=None, default_interval=None):
+    """
+    Reads the saved searches config:
+
+        {"interval_minutes": 30,
+         "searches": [{"name": "Data Eng", "url": "https://www.linkedin.com/jobs/search/?...",
+                       "interval_minutes": 15, "enabled": true}]}
+
+    Returns:
+        list: Enabled searches, each with 'name', 'url' and 'interval_minutes'.
+    """
+    path = path or os.getenv("DAEMON_CONFIG", DEFAULT_CONFIG_PATH)
+    if default_interval is None:
+        default_interval = float(os.getenv("DAEMON_INTERVAL_MINUTES", "30"))
+    with open(path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+
+    interval = float(config.get("interval_minutes", default_interval))
+    searches = []
+    for i, search in enumerate(config.get("searches", [])):
+        if not search.get("url"):
+            raise ValueError(f"Saved search #{i + 1} in {path} has no 'url'.")
+        if not search.get("enabled", True):
+            continue
+        searches.append({
+            "name": search.get("name") or f"search-{i + 1}",
+            "url": search["url"],
+            "interval_minutes": float(search.get("interval_minutes", interval))
+        })
+    return searches
+
+
+class SearchSchedule:
+    """Tracks when each saved search last ran and which ones are due."""
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self.last_run = {}
+
+    def due(self, searches):
+        now = self.clock()
+        return [s for s in searches
+                if now - self.last_run.get(s["name"], float("-inf")) >= s["interval_minutes"] * 60]
+
+    def mark(self, search):
+        self.last_run[search["name"]] = self.clock()
+
+    def seconds_until_next(self, searches):
+        """Seconds until the earliest search is due again (0 if one is due now)."""
+        if not searches:
+            return None
+        now = self.clock()
+        return max(0.0, min(self.last_run.get(s["name"], float("-inf")) + s["interval_minutes"] * 60 - now
+                            for s in searches))
+
+
+class SeenJobs:
+    """LinkedIn job ids already scraped, persisted as {job_id: first_seen_timestamp}."""
+
+    def __init__(self, path="daemon_seen.json", clock=time.time):
+        self.path = path
+        self.clock = clock
+        self.ids = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.ids = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Could not read {path}: {e}")
+
+    def __contains__(self, job_id):
+        return job_id in self.ids
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, job_id):
+        if job_id and job_id not in self.ids:
+            self.ids[job_id] = self.clock()
+
+    def save(self):
+        # Postings older than this are long gone from the search results
+        cutoff = self.clock() - KEEP_SEEN_DAYS * 86400
+        self.ids = {k: v for k, v in self.ids.items() if v >= cutoff}
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.ids, f)
+        os.replace(tmp_path, self.path)
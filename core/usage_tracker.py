@@ -0,0 +1,290 @@
+"""
+core/usage_tracker.py
+Token and request accounting per API key, model, day and run.
+Usage is persisted to ai_usage.json (keys are stored as short hashes, never in
+clear) so the daily budget survives restarts. Gemini quotas apply per key and
+model, so are the limits: the tracker throttles calls to stay under the
+per-minute limits, flags key/model pairs whose daily quota is used up before
+they return a 429, and forecasts how many more jobs the pool supports.
+The CLI, the daemon and the API server can share the file: each call is added
+to the totals on disk under a file lock, never over another process's counts.
+"""
+
+import os
+import json
+import time
+import hashlib
+import uuid
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from core.utils import file_lock
+
+try:
+    from zoneinfo import ZoneInfo
+    # Gemini daily quotas reset at midnight Pacific time
+    QUOTA_TZ = ZoneInfo("America/Los_Angeles")
+except Exception:
+    QUOTA_TZ = timezone.utc
+
+# No limits unless configured (quotas depend on the tier); 0 disables a limit
+DEFAULT_LIMITS = {"rpm": 0, "tpm": 0, "rpd": 0}
+KEEP_DAYS = 30
+KEEP_RUNS = 50
+
+_EMPTY_TOTALS = {"requests": 0, "prompt_tokens": 0, "output_tokens": 0, "seconds": 0.0}
+
+
+def parse_limits(raw=None, base=None):
+    """Reads 'rpm=15,tpm=1000000,rpd=200' (GEMINI_KEY_LIMITS) into a dict."""
+    raw = raw if raw is not None else os.getenv("GEMINI_KEY_LIMITS", "")
+    limits = dict(base or DEFAULT_LIMITS)
+    for part in raw.split(","):
+        if "=" in part:
+            name, value = part.split("=", 1)
+            limits[name.strip().lower()] = int(value)
+    return limits
+
+
+def parse_model_limits(raw=None, base=None):
+    """
+    Reads 'gemini-2.0-flash:rpm=15,rpd=200;gemini-2.0-flash-lite:rpm=30,rpd=1500'
+    (GEMINI_MODEL_LIMITS) into {model: limits}; unset fields fall back to base.
+    """
+    raw = raw if raw is not None else os.getenv("GEMINI_MODEL_LIMITS", "")
+    models = {}
+    for part in raw.split(";"):
+        if ":" in part:
+            model, limits = part.split(":", 1)
+            models[model.strip()] = parse_limits(limits, base=base)
+    return models
+
+
+def key_id(api_key):
+    """Stable, non-reversible label for an API key."""
+    return hashlib.sha256(str(api_key).encode("utf-8")).hexdigest()[:10]
+
+
+def _add(totals, prompt_tokens, output_tokens, seconds):
+    totals["requests"] += 1
+    totals["prompt_tokens"] += prompt_tokens
+    totals["output_tokens"] += output_tokens
+    totals["seconds"] = round(totals["seconds"] + seconds, 3)
+
+
+class UsageTracker:
+    """
+    Attributes:
+        limits (dict): 'rpm', 'tpm' and 'rpd' of each key/model pair (0 = unlimited).
+        model_limits (dict): Overrides of limits for specific models.
+        run (dict): Totals of the current process ('jobs' counts finished generations).
+    """
+
+    def __init__(self, path="ai_usage.json", limits=None, model_limits=None, clock=time.time):
+        self.path = path
+        self.limits = limits if limits is not None else parse_limits()
+        self.model_limits = model_limits if model_limits is not None else parse_model_limits(base=self.limits)
+        self.clock = clock
+        self.lock_path = f"{path}.lock"
+        self.run = {"id": uuid.uuid4().hex, "started_at": datetime.now().isoformat(), "jobs": 0,
+                    **_EMPTY_TOTALS, "models": {}}
+        self._mtime = None
+        self._read()
+        self._windows = {}  # (key id, model) -> deque of [timestamp, tokens] for the last minute
+        # Shared by the API workers: one lock for the totals, per-thread job accounting
+        self._lock = threading.RLock()
+        self._local = threading.local()
+
+    def _read(self):
+        """Loads the file as other processes left it, with this run's totals in place of its stored copy."""
+        self.data = {"days": {}, "runs": []}
+        if os.path.exists(self.path):
+            try:
+                self._mtime = os.stat(self.path).st_mtime_ns
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.data = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Could not read {self.path}: {e}")
+        self.data.setdefault("days", {})
+        runs = [r for r in self.data.setdefault("runs", []) if r.get("id") != self.run["id"]]
+        self.data["runs"] = runs + [self.run]
+
+    def _refresh(self):
+        """Re-reads the file when another process has written it since (cheap stat otherwise)."""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return
+        if mtime != self._mtime:
+            self._read()
+
+    def today(self):
+        return datetime.fromtimestamp(self.clock(), QUOTA_TZ).date().isoformat()
+
+    def limits_for(self, model):
+        return self.model_limits.get(model, self.limits)
+
+    def _day(self, kid):
+        return self.data["days"].setdefault(self.today(), {}).setdefault(kid, {**_EMPTY_TOTALS, "models": {}})
+
+    def record(self, api_key, model, prompt_tokens, output_tokens, seconds):
+        """
+        Adds one successful call to the key/model/day, run and current-job totals.
+        The day totals are added to the file's current counts under the file lock.
+        """
+        kid = key_id(api_key)
+        with self._lock:
+            _add(self.run, prompt_tokens, output_tokens, seconds)
+            run_models = self.run.setdefault("models", {})
+            run_models[model] = run_models.get(model, 0) + 1
+            slot = getattr(self._local, "slot", None)
+            self._local.slot = None
+            if slot and slot[2] == (kid, model):
+                slot[1] = prompt_tokens + output_tokens  # The reserved slot now holds the real usage
+            else:
+                self._window(kid, model).append([self.clock(), prompt_tokens + output_tokens])
+            with self._locked():
+                self._read()
+                day = self._day(kid)
+                _add(day, prompt_tokens, output_tokens, seconds)
+                _add(day["models"].setdefault(model, dict(_EMPTY_TOTALS)), prompt_tokens, output_tokens, seconds)
+                self._write()
+        job = getattr(self._local, "job", None)
+        if job is not None:
+            _add(job, prompt_tokens, output_tokens, seconds)
+
+    def begin_job(self):
+        self._local.job = dict(_EMPTY_TOTALS)
+
+    def end_job(self, jobs=1):
+        """Closes the current job(s); returns the usage per job (a batched request is split evenly)."""
+        usage, self._local.job = getattr(self._local, "job", None) or dict(_EMPTY_TOTALS), None
+        with self._lock:
+            self.run["jobs"] += jobs
+        if jobs > 1:
+            usage = {k: round(v / jobs, 3) for k, v in usage.items()}
+        return usage
+
+    def requests_left(self, api_key, model):
+        """Requests left today for this key and model (None when there is no daily limit)."""
+        rpd = self.limits_for(model).get("rpd")
+        if not rpd:
+            return None
+        with self._lock:
+            self._refresh()
+            day = self.data["days"].get(self.today(), {}).get(key_id(api_key), {})
+            used = day.get("models", {}).get(model, {}).get("requests", 0)
+        return max(0, rpd - used)
+
+    def is_exhausted(self, api_key, model):
+        left = self.requests_left(api_key, model)
+        return left is not None and left <= 0
+
+    def _window(self, kid, model):
+        """Calls (and reserved slots) of the last minute: [timestamp, tokens] entries."""
+        window = self._windows.setdefault((kid, model), deque())
+        now = self.clock()
+        while window and now - window[0][0] >= 60:
+            window.popleft()
+        return window
+
+    def reserve(self, api_key, model, upcoming_tokens=0):
+        """
+        Like throttle_delay(), but when no wait is needed the call's slot is taken in the
+        same step, so concurrent workers cannot all pass the limit together. The slot
+        holds the estimate until record() replaces it with the real usage.
+        """
+        kid = key_id(api_key)
+        with self._lock:
+            delay = self.throttle_delay(api_key, model, upcoming_tokens)
+            if delay <= 0:
+                slot = [self.clock(), upcoming_tokens, (kid, model)]
+                self._window(kid, model).append(slot)
+                self._local.slot = slot
+            return delay
+
+    def throttle_delay(self, api_key, model, upcoming_tokens=0):
+        """Seconds to wait so the next call stays under the key/model RPM/TPM in a sliding minute."""
+        now = self.clock()
+        with self._lock:
+            window = [entry[:2] for entry in self._window(key_id(api_key), model)]
+        if not window:
+            return 0.0
+
+        delay = 0.0
+        limits = self.limits_for(model)
+        rpm, tpm = limits.get("rpm"), limits.get("tpm")
+        if rpm and len(window) >= rpm:
+            delay = max(delay, 60 - (now - window[len(window) - rpm][0]))
+        if tpm:
+            excess = sum(tokens for _, tokens in window) + upcoming_tokens - tpm
+            for ts, tokens in window:
+                if excess <= 0:
+                    break
+                excess -= tokens
+                delay = max(delay, 60 - (now - ts))
+        return max(0.0, delay)
+
+    def _calls_per_job(self, runs, model, single_model):
+        """Average calls per job on a model (runs from before per-model totals count when it is the only one)."""
+        per_model = [r for r in runs if "models" in r]
+        jobs = sum(r["jobs"] for r in per_model)
+        if jobs:
+            return sum(r["models"].get(model, 0) for r in per_model) / jobs
+        jobs = sum(r["jobs"] for r in runs)
+        if single_model and jobs:
+            return sum(r["requests"] for r in runs) / jobs
+        return 1.0
+
+    def forecast(self, api_keys, models):
+        """
+        Estimates how many more jobs today's remaining quota supports. Each model has its
+        own daily budget; the one that runs out first bounds the forecast.
+
+        Returns:
+            dict: 'requests_left' and 'jobs_left' (None when unlimited) of the bounding 'model',
+            plus the averages used.
+        """
+        runs = [r for r in self.data["runs"] if r.get("jobs")]
+        total_jobs = sum(r["jobs"] for r in runs)
+        tokens_per_job = (sum(r["prompt_tokens"] + r["output_tokens"] for r in runs) / total_jobs
+                          if total_jobs else None)
+
+        models = list(dict.fromkeys(models))
+        bound = {"model": models[0] if models else None, "requests_left": None, "jobs_left": None,
+                 "calls_per_job": self._calls_per_job(runs, models[0], len(models) == 1) if models else 1.0}
+        for model in models:
+            lefts = [self.requests_left(k, model) for k in api_keys]
+            if any(left is None for left in lefts):
+                continue
+            calls_per_job = self._calls_per_job(runs, model, len(models) == 1)
+            if calls_per_job <= 0:
+                continue  # Not used by this pipeline (e.g. no rewrites yet)
+            jobs_left = int(sum(lefts) // calls_per_job)
+            if bound["jobs_left"] is None or jobs_left < bound["jobs_left"]:
+                bound = {"model": model, "requests_left": sum(lefts), "jobs_left": jobs_left,
+                         "calls_per_job": calls_per_job}
+        bound["calls_per_job"] = round(bound["calls_per_job"], 2)
+        bound["tokens_per_job"] = round(tokens_per_job) if tokens_per_job else None
+        return bound
+
+    def _locked(self):
+        os.makedirs(os.path.dirname(self.lock_path) or ".", exist_ok=True)
+        return file_lock(self.lock_path)
+
+    def save(self):
+        """Writes this run's totals, merged with what other processes recorded."""
+        with self._lock, self._locked():
+            self._read()
+            self._write()
+
+    def _write(self):
+        # Only keep recent days/runs; older totals do not affect any quota (file lock held)
+        for day in sorted(self.data["days"])[:-KEEP_DAYS]:
+            del self.data["days"][day]
+        self.data["runs"] = self.data["runs"][-KEEP_RUNS:]
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, indent=2)
+        os.replace(tmp_path, self.path)
+        self._mtime = os.stat(self.path).st_mtime_ns
@@ -1,10 +1,18 @@
 """
 core/utils.py
 Centralized utilities for the Job Application Automator.
-Contains the primary hashing logic used for deduplication across the project.
+Contains the primary hashing logic used for deduplication across the project,
+and the file lock shared by the indexes several processes append to.
 """
 
 import hashlib
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
 
 
 def generate_job_hash(company, job_title, job_description):
@@ -19,3 +27,22 @@ def generate_job_hash(company, job_title, job_description):
 
     data_to_hash = f"{c}|{t}|{d}"
     return hashlib.sha256(data_to_hash.encode('utf-8')).hexdigest()
+
+
+@contextmanager
+def file_lock(path):
+    """Exclusive lock on `path` shared by every process maintaining the same file."""
+    with open(path, "a+b") as f:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
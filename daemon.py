@@ -0,0 +1,163 @@
+"""
+daemon.py
+Service mode: polls the saved searches (saved_searches.json) with a headless
+browser and pushes only postings not seen before through the usual pipeline.
+The browser, the Gemini clients and the dedup indexes stay warm between cycles.
+
+Log in once with `python main.py` (visible browser) so ./playwright_data holds the session, then:
+    python daemon.py            # poll forever
+    python daemon.py --once     # single cycle (e.g. from cron)
+"""
+
+import os
+import time
+import signal
+import argparse
+from collections import Counter
+from datetime import datetime
+from main import JobPipeline, load_processed_hashes, STAGED_GENERATION
+from scrapers.linkedin import HeadlessLinkedInSession, LoginRequiredError
+from core.saved_searches import load_searches, SearchSchedule, SeenJobs, DEFAULT_CONFIG_PATH
+
+
+class SearchDaemon:
+    """
+    Attributes:
+        seen (SeenJobs): LinkedIn job ids already screened; their cards are not opened again.
+        retries (Counter): Incomplete scrapes of postings not seen yet (in memory only).
+        schedule (SearchSchedule): Last run of each saved search.
+    """
+
+    def __init__(self, config_path=None, pipeline=None, session=None):
+        self.config_path = config_path or os.getenv("DAEMON_CONFIG", DEFAULT_CONFIG_PATH)
+        self.pipeline = pipeline or JobPipeline()
+        self.pipeline.known_hashes = load_processed_hashes(self.pipeline.manager.folder_index)
+        self.session = session or HeadlessLinkedInSession()
+        self.seen = SeenJobs(os.getenv("DAEMON_SEEN_PATH", "daemon_seen.json"))
+        self.retries = Counter()
+        self.max_retries = int(os.getenv("DAEMON_SCREEN_RETRIES", "3"))
+        self.schedule = SearchSchedule()
+        self.searches = []
+        self.stopping = False
+
+    def stop(self, *_):
+        if not self.stopping:
+            print("\n🛑 Stop requested; finishing the current job...")
+        self.stopping = True
+
+    def _reload_config(self):
+        try:
+            self.searches = load_searches(self.config_path)
+        except (OSError, ValueError) as e:
+            # Keep polling the previous searches while the config is being edited
+            print(f"⚠️  Could not load {self.config_path}: {e}")
+
+    def poll(self, search):
+        """
+        Scrapes one saved search and queues its new postings. Returns how many were queued.
+        A posting is marked as seen once it is queued or rejected for good; one whose scrape
+        was incomplete (e.g. the description did not load) is opened again next cycle,
+        up to DAEMON_SCREEN_RETRIES times.
+        """
+        queued = 0
+        for job_data in self.session.scrape(search["url"], skip_ids=self.seen):
+            job_id = job_data.get("job_id")
+            job_data.setdefault("scraped_at", datetime.now().isoformat())
+            item, final = self.pipeline.screen_outcome(job_data)
+            if item and self.pipeline.queue.push(item):
+                queued += 1
+            if final:
+                self.retries.pop(job_id, None)
+                self.seen.add(job_id)
+            else:
+                self.retries[job_id] += 1
+                if self.retries[job_id] >= self.max_retries:
+                    print(f"   ⚠️  Giving up on posting {job_id} after {self.retries[job_id]} incomplete scrapes.")
+                    del self.retries[job_id]
+                    self.seen.add(job_id)
+            if self.stopping:
+                break
+        return queued
+
+    def run_cycle(self):
+        """Polls every due search, then generates the queued jobs. Returns the number of new jobs queued."""
+        self._reload_config()
+        due = self.schedule.due(self.searches)
+        if not due:
+            return 0
+
+        # Keys rotated away from on an earlier day (or a 429 burst) are usable again
+        self.pipeline.writer.reset_keys(staged=STAGED_GENERATION)
+        backlog = self.pipeline.queue.load_backlog()
+        if backlog:
+            print(f"📥 {backlog} jobs loaded from the backlog.")
+        deferred = self.pipeline.requeue_deferred()
+        if deferred:
+            print(f"📥 {deferred} deferred jobs now pass the pre-screen.")
+
+        queued = 0
+        for search in due:
+            if self.stopping:
+                break
+            print(f"\n🔎 [{datetime.now():%H:%M}] Polling '{search['name']}'...")
+            self.schedule.mark(search)
+            try:
+                new = self.poll(search)
+                queued += new
+                print(f"   🆕 {new} new jobs queued from '{search['name']}'.")
+            except LoginRequiredError as e:
+                print(f"❌ {e}")
+                self.stop()
+            except Exception as e:
+                print(f"⚠️  Search '{search['name']}' failed: {e}")
+            finally:
+                # The queued postings reach the backlog before they are marked as seen
+                self.pipeline.save_backlog()
+                self.seen.save()
+
+        if self.pipeline.queue and not self.stopping:
+            print(f"\n📋 {len(self.pipeline.queue)} jobs queued for AI generation.")
+            if not self.pipeline.drain_queue(should_stop=lambda: self.stopping) and not self.stopping:
+                print("⏸️  Generation paused (quota or API health); retrying next cycle.")
+        return queued
+
+    def run(self, once=False):
+        print(f"🤖 Daemon started ({len(self.seen)} postings already seen). Press Ctrl+C to stop.")
+        try:
+            replayed = self.pipeline.replay_parked()
+            if replayed:
+                print(f"📤 {replayed} parked AI results exported again.")
+            while not self.stopping:
+                self.run_cycle()
+                if once:
+                    break
+                wait = self.schedule.seconds_until_next(self.searches)
+                wait = 60 if wait is None else max(wait, 1)
+                print(f"💤 Next poll in {wait / 60:.1f} min.")
+                deadline = time.monotonic() + wait
+                while not self.stopping and time.monotonic() < deadline:
+                    time.sleep(1)
+        finally:
+            saved = self.pipeline.save_backlog()
+            if saved:
+                print(f"💾 {saved} pending jobs saved to {self.pipeline.queue.backlog_path}.")
+            self.pipeline.print_stage_report()
+            self.session.close()
+            self.pipeline.shutdown()
+            print("👋 Daemon stopped.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Poll saved LinkedIn searches and process new postings.")
+    parser.add_argument("--config", help=f"Saved searches JSON (default {DEFAULT_CONFIG_PATH} or DAEMON_CONFIG)")
+    parser.add_argument("--once", action="store_true", help="Run a single cycle and exit")
+    args = parser.parse_args()
+
+    daemon = SearchDaemon(config_path=args.config)
+    signal.signal(signal.SIGINT, daemon.stop)
+    signal.signal(signal.SIGTERM, daemon.stop)
+    daemon.run(once=args.once)
+
+
+if __name__ == "__main__":
+    main()
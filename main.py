@@ -2,17 +2,38 @@
 main.py
 Main Module: Orchestrates the scraping and AI workflow.
 Integrates SHA-256 hashing to prevent duplicate job processing.
+Jobs are screened locally first, then generated in priority order so the best
+matches are done before the API quota runs out.
 """
 
 from concurrent.futures import ThreadPoolExecutor
-from ai.writer import AIWriter
+from datetime import datetime
+from ai.writer import AIWriter, QuotaExhaustedError
+from ai.retry_policy import CircuitOpenError
 from core.file_manager import JobFileManager
+from core.pdf_service import PDFRenderService
 from scrapers.linkedin import LinkedInScraper
 from core.utils import generate_job_hash
+from core.near_dup import NearDuplicateIndex, simhash
+from core.jd_cleaner import JDNormalizer
+from core.metadata_extractor import MetadataExtractor
+from core.prescreen import PreScreener
+from core.job_queue import PriorityJobQueue, estimate_posted_at
 import pandas as pd
 import os
+import threading
 
 MASTER_CSV = "applications_master_log.csv"
+# Optional pre-LLM filter, e.g. JOB_FILTER_WORK_MODEL="Remote,Hybrid"
+WORK_MODEL_FILTER = [m.strip().lower() for m in os.getenv("JOB_FILTER_WORK_MODEL", "").split(",") if m.strip()]
+# Optional cheap model used to settle borderline pre-screen scores, e.g. gemini-2.0-flash-lite
+PRESCREEN_MODEL = os.getenv("PRESCREEN_MODEL", "")
+# Two-tier generation: cheap analysis model first, rewrite model only above REWRITE_MIN_SCORE
+STAGED_GENERATION = os.getenv("AI_STAGED", "false").lower() in ("1", "true", "yes")
+# Jobs packed into one AI request (resume sent once); 1 keeps the single-job prompt
+BATCH_SIZE = 1 if STAGED_GENERATION else max(1, int(os.getenv("AI_BATCH_SIZE", "1")))
+# Failed generations before a job leaves the backlog for ai_failed.jsonl
+JOB_ATTEMPTS = max(1, int(os.getenv("AI_JOB_ATTEMPTS", "3")))
 
 
 def is_already_processed(job_hash):
@@ -36,78 +57,437 @@ def is_already_processed(job_hash):
         return False
 
 
-def main():
-    # 1. Component Initialization
-    writer = AIWriter()
-    manager = JobFileManager()
-    scraper = LinkedInScraper()
+def load_processed_hashes(folder_index=None):
+    """
+    Every job_hash in the Master CSV, read once (long-running processes keep it in memory),
+    plus the jobs in the folder index: their CSV rows may have been lost with the write
+    buffer in a crash, but the folders were exported.
+    """
+    hashes = set(folder_index.entries) if folder_index is not None else set()
+    if not os.path.exists(MASTER_CSV):
+        return hashes
+    try:
+        return hashes | set(pd.read_csv(MASTER_CSV, usecols=['job_hash'])['job_hash'].dropna())
+    except Exception as e:
+        print(f"⚠️  Error reading Master Log: {e}")
+        return hashes
 
-    # The executor isolates AI tasks in a separate thread to solve asyncio loop conflicts
-    executor = ThreadPoolExecutor(max_workers=1)
 
-    print("🚀 Automatic Application Generator started.")
+class JobPipeline:
+    """
+    Screening (no tokens) and generation stages shared by every entry point.
 
-    # 2. LinkedIn Search URL Input
-    search_url = input("Paste your LinkedIn filtered search URL: ").strip()
+    screen() turns scraped job_data into a queue item (or None when the job is
+    filtered out; screen_outcome() also tells whether that is final); generate()
+    runs the AI and exports the files for one item.
+    """
 
-    if not search_url:
-        print("❌ Invalid URL.")
-        return
+    def __init__(self, writer=None, manager=None, pdf_service=None):
+        self.writer = writer or AIWriter()
+        self.pdf_service = pdf_service or PDFRenderService()
+        self.manager = manager or JobFileManager(pdf_service=self.pdf_service)
+        self.near_dup = NearDuplicateIndex()
+        self.jd_normalizer = JDNormalizer()
+        self.extractor = MetadataExtractor()
+        self.prescreener = PreScreener(resume_path=self.writer.resume_path)
+        self.queue = PriorityJobQueue()
+        # Jobs whose generation failed in this drain; saved with the backlog for the next run
+        self._failed = []
+        self.tokens_saved = 0
+        # Optional in-memory dedup index (the daemon); None re-reads the Master CSV per check
+        self.known_hashes = None
+        # The export thread records finished jobs while the main thread screens new ones
+        self._dedup_lock = threading.Lock()
+        if not self.near_dup.entries:
+            self.near_dup.backfill(self.manager.base_path)
 
-    try:
-        # 3. Scraping Loop Start
-        # The scraper yields job_data dynamically
-        for i, job_data in enumerate(scraper.scrape_search_results(search_url), 1):
-            # 1. Capture basic info
-            title = job_data.get('title', 'unknown')
-            company = job_data.get('company', 'unknown')
-            description = job_data.get('description', '')
-
-            # 2. Skip if description is empty or failed (English match)
-            if not description or description == "unknown":
-                print(f"  ⏭️  [SKIP] '{title}': Description not found.")
-                continue
+        # The executor isolates AI tasks in a separate thread to solve asyncio loop conflicts
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+    def is_processed(self, job_hash):
+        # Exports still on the background writer are not in the CSV (or known_hashes) yet
+        if self.manager.is_pending(job_hash):
+            return True
+        if self.known_hashes is not None:
+            return job_hash in self.known_hashes
+        return job_hash in self.manager.folder_index.entries or is_already_processed(job_hash)
+
+    def screen(self, job_data):
+        """Runs every local check on a scraped job. Returns a queue item or None."""
+        return self.screen_outcome(job_data)[0]
+
+    def screen_outcome(self, job_data):
+        """
+        Like screen(), also telling whether the verdict is final: (item, final).
+        final is False when the scrape itself was incomplete (e.g. the description did not
+        load), so the posting is worth scraping again.
+        """
+        # 1. Capture basic info
+        title = job_data.get('title', 'unknown')
+        company = job_data.get('company', 'unknown')
+        description = job_data.get('description', '')
+
+        # 2. Skip if description is empty or failed (English match)
+        if not description or description == "unknown":
+            print(f"  ⏭️  [SKIP] '{title}': Description not found.")
+            return None, False
+
+        # 3. Generate unique hash and check if already handled
+        job_hash = generate_job_hash(company, title, description)
+        if self.is_processed(job_hash):
+            print(f". ✅ [ALREADY PROCESSED] {title} @ {company} ({job_hash[:8]})")
+            return None, True
+
+        # 4. Check for reposts / near-identical descriptions
+        fingerprint = simhash(description)
+        with self._dedup_lock:
+            similar = self.near_dup.find_similar(description, fingerprint)
+            if similar:
+                print(f". 🔁 [REPOST] {title} @ {company} ~ {similar['job_hash'][:8]} "
+                      f"({similar['distance']} bits apart)")
+                # Linked in both modes; 'flag' still generates the repost (its own folder replaces the link)
+                self.near_dup.link_repost(similar, job_data, job_hash, fingerprint)
+                if self.near_dup.action == "skip":
+                    return None, True
+
+        # 5. Local metadata extraction (instant, no tokens) and optional filtering
+        known_metadata = self.extractor.confident_values(self.extractor.extract(description))
+        work_model = known_metadata.get("work_model", "")
+        if WORK_MODEL_FILTER and work_model and work_model.lower() not in WORK_MODEL_FILTER:
+            print(f"  ⏭️  [SKIP] '{title}': Work model '{work_model}' filtered out.")
+            return None, True
+
+        # 6. Strip LinkedIn chrome/boilerplate before it is billed as input tokens
+        clean_description, jd_report = self.jd_normalizer.normalize(description)
+
+        # 7. Local fit pre-screen (cheap model only for borderline scores)
+        screen = self.prescreener.score(clean_description, company)
+        self.prescreener.learn(job_hash, clean_description, company)
+        if PRESCREEN_MODEL and self.prescreener.is_borderline(screen["score"]):
+            model_score = self.writer.quick_score(clean_description, title, company, PRESCREEN_MODEL)
+            if model_score is not None:
+                screen["model_score"] = model_score
+        passed, reason = self.prescreener.decide(screen)
+        self.prescreener.record(job_data, job_hash, screen, passed, reason)
+        if not passed:
+            print(f"  ⏭️  [{self.prescreener.action.upper()}] '{title}' @ {company}: {reason}")
+            return None, True
+
+        scraped_at = datetime.fromisoformat(job_data["scraped_at"]) if job_data.get("scraped_at") else None
+        item = {
+            "job_hash": job_hash,
+            "job_data": job_data,
+            "clean_description": clean_description,
+            "jd_report": jd_report,
+            "known_metadata": known_metadata,
+            "fingerprint": fingerprint,
+            "features": {
+                "similarity": screen.get("model_score", screen["score"]),
+                "posted_at": estimate_posted_at(description, scraped_at),
+                "has_salary": "salary" in known_metadata
+            }
+        }
+        return item, True
+
+    def requeue_deferred(self):
+        """Screens again the jobs deferred under another threshold or resume; those that now pass are queued."""
+        queued = 0
+        for entry in self.prescreener.take_reconsidered():
+            item = self.screen(entry["job_data"])
+            if item and self.queue.push(item):
+                queued += 1
+        return queued
+
+    def _announce(self, item):
+        job_data = item["job_data"]
+        jd_report = item["jd_report"]
+
+        # Process new job with visual separation
+        print("\n" + "─"*50)
+        print(f"🚀 [JOB] {job_data.get('title', 'unknown').upper()}")
+        print(f"🏢 COMPANY: {job_data.get('company', 'unknown')}")
+        print(f"🆔 HASH:    {item['job_hash'][:8]}")
+        print(f"🎯 FIT:     {item['features']['similarity']}/10 (priority {item['priority']})")
+        print("─"*50)
+
+        self.tokens_saved += jd_report["tokens_saved"]
+        print(f"   ✂️  JD trimmed: ~{jd_report['tokens_before']} → ~{jd_report['tokens_after']} tokens")
+        if item["known_metadata"]:
+            print(f"   🔎 Extracted locally: {', '.join(item['known_metadata'])}")
+
+    def _export(self, item, results):
+        job_data = item["job_data"]
+        company = job_data.get('company', 'unknown')
+
+        print(f"   📄 Exporting Files & PDFs ({company})...")
+        def report(future):
+            if future.exception():
+                print(f"   ❌ EXPORT ERROR ({company}): {future.exception()} (AI result kept in .inflight)")
+
+        def remember(folder):
+            # Only a complete export counts as processed; a failed one is replayed on the next start
+            with self._dedup_lock:
+                if self.known_hashes is not None:
+                    self.known_hashes.add(item["job_hash"])
+                self.near_dup.add(item["job_hash"], job_data.get('description', ''), company,
+                                  job_data.get('title', 'unknown'), folder, fingerprint=item["fingerprint"])
 
-            # 3. Generate unique hash
-            job_hash = generate_job_hash(company, title, description)
+        # Written by the background export thread; the folder path is known upfront
+        folder, future = self.manager.submit(job_data, results, item["job_hash"], on_success=remember)
+        future.add_done_callback(report)
 
-            # 2. Check if already handled
-            if is_already_processed(job_hash):
-                print(f". ✅ [ALREADY PROCESSED] {title} @ {company} ({job_hash[:8]})")
+        if results.get("status") == "Low Fit":
+            print(f"   📝 ANALYSIS ONLY: {company} saved as 'Low Fit' (no rewrite)")
+        else:
+            print(f"   ✨ SUCCESS: Application generated for {company}")
+        return folder
+
+    def replay_parked(self):
+        """Exports again the AI results parked by failed exports of a previous run. Returns how many."""
+        replayed = 0
+        for job_hash, job_data, ai_res in self.manager.parked_results():
+            if self.is_processed(job_hash):
+                self.manager.clear_partial(job_hash)
                 continue
+            item = {"job_hash": job_hash, "job_data": job_data,
+                    "fingerprint": simhash(job_data.get('description', ''))}
+            self._export(item, ai_res)
+            replayed += 1
+        return replayed
 
-            # 3. Process new job with visual separation
-            print("\n" + "─"*50)
-            print(f"🚀 [JOB {i}] {title.upper()}")
-            print(f"🏢 COMPANY: {company}")
-            print(f"🆔 HASH:    {job_hash[:8]}")
-            print("─"*50)
+    def generate(self, item):
+        """AI generation + export for one queued job. Raises QuotaExhaustedError when the pool is empty."""
+        job_data = item["job_data"]
+        self._announce(item)
 
-            try:
-                print("   🤖 AI Analysis in progress...")
-                future = executor.submit(writer.process_application, description, title, company)
-                results = future.result()
+        def on_section(section, value):
+            # Streaming mode: finished sections are saved while the rest is generated
+            self.manager.save_partial(item["job_hash"], section, value)
+            print(f"   📥 {section} received")
+
+        print("   🤖 AI Analysis in progress...")
+        process = self.writer.process_staged if STAGED_GENERATION else self.writer.process_application
+        future = self.executor.submit(process, item["clean_description"],
+                                      job_data.get('title', 'unknown'), job_data.get('company', 'unknown'),
+                                      item["known_metadata"], on_section if self.writer.stream else None)
+        return self._export(item, future.result())
 
-                print("   📄 Exporting Files & PDFs...")
-                manager.save_all(job_data, results, job_hash)
+    def generate_batch(self, items):
+        """Same as generate() for several jobs sharing one AI request (see AI_BATCH_SIZE)."""
+        for item in items:
+            self._announce(item)
 
-                print(f"   ✨ SUCCESS: Application generated for {company}")
+        print(f"\n   🤖 AI Analysis in progress ({len(items)} jobs in one request)...")
+        jobs = [{
+            "job_description": item["clean_description"],
+            "job_title": item["job_data"].get('title', 'unknown'),
+            "company": item["job_data"].get('company', 'unknown'),
+            "known_metadata": item["known_metadata"]
+        } for item in items]
+        results = self.executor.submit(self.writer.process_batch, jobs).result()
 
+        folders = []
+        stop_error = None
+        for item, result in zip(items, results):
+            if isinstance(result, (QuotaExhaustedError, CircuitOpenError)):
+                stop_error = result  # Re-queued by drain_queue after the others are exported
+                continue
+            if isinstance(result, Exception):
+                self._retry_later(item, result)  # Reported by process_batch
+                continue
+            try:
+                folders.append(self._export(item, result))
             except Exception as e:
                 print(f"   ❌ ERROR: {e}")
+                self._retry_later(item, e)
+        if stop_error:
+            raise stop_error
+        return folders
+
+    def _next_batch(self):
+        """Pops the next jobs to generate, as many as fit in one request for the current model."""
+        items = []
+        while self.queue and len(items) < BATCH_SIZE:
+            item = self.queue.pop()
+            if self.is_processed(item["job_hash"]):
+                continue  # Backlog item generated by another run in the meantime
+            items.append(item)
+        if len(items) > 1:
+            size = self.writer.plan_batch_size([i["clean_description"] for i in items])
+            for item in items[size:]:
+                self.queue.push(item)
+            items = items[:size]
+        return items
+
+    def _retry_later(self, item, error):
+        """Keeps a job whose generation failed for the next run; after JOB_ATTEMPTS failures it is parked."""
+        item["attempts"] = item.get("attempts", 0) + 1
+        if item["attempts"] < JOB_ATTEMPTS:
+            print(f"   🔁 '{item['job_data'].get('title', 'unknown')}' kept for the next run "
+                  f"(attempt {item['attempts']}/{JOB_ATTEMPTS}).")
+            self._failed.append(item)
+        else:
+            self.queue.park(item, error)
+            print(f"   🅿️  '{item['job_data'].get('title', 'unknown')}' failed {item['attempts']} times; "
+                  f"parked in {self.queue.failed_path}.")
+
+    def save_backlog(self):
+        """Saves the queued jobs and those kept after a failed generation. Returns how many."""
+        for item in self._failed:
+            self.queue.push(item)
+        self._failed = []
+        # An empty queue leaves the file alone: it may not have been loaded yet
+        return self.queue.save_backlog() if self.queue else 0
+
+    def drain_queue(self, should_stop=None):
+        """
+        Generates queued jobs highest priority first (in batches when AI_BATCH_SIZE > 1).
+        When the key pool is exhausted (or forecast to be), the remaining jobs are saved as the backlog;
+        so are the jobs whose generation failed (see JOB_ATTEMPTS), instead of being dropped.
+        should_stop is checked between jobs (the daemon's shutdown flag).
+        Returns False if the run stopped early.
+        """
+        while self.queue:
+            if should_stop and should_stop():
+                saved = self.save_backlog()
+                print(f"\n💾 Stopping: {saved} jobs saved to {self.queue.backlog_path}.")
+                return False
+
+            # Stop before the pool hard-fails with 429s when today's budget cannot cover another job
+            forecast = self.writer.forecast(staged=STAGED_GENERATION)
+            if forecast["jobs_left"] == 0:
+                saved = self.save_backlog()
+                print(f"\n💾 Daily quota nearly used up ({forecast['requests_left']} requests left, "
+                      f"~{forecast['calls_per_job']} per job): {saved} jobs saved to {self.queue.backlog_path}.")
+                return False
+
+            items = self._next_batch()
+            if not items:
                 continue
+            try:
+                if len(items) == 1:
+                    self.generate(items[0])
+                else:
+                    self.generate_batch(items)
+            except (QuotaExhaustedError, CircuitOpenError) as e:
+                for item in items:
+                    if not self.is_processed(item["job_hash"]):
+                        self.queue.push(item)
+                saved = self.save_backlog()
+                reason = "Quota exhausted" if isinstance(e, QuotaExhaustedError) else "API unhealthy"
+                print(f"\n💾 {reason}: {saved} jobs saved to {self.queue.backlog_path} for the next run.")
+                return False
+            except Exception as e:
+                print(f"   ❌ ERROR: {e}")
+                for item in items:
+                    if not self.is_processed(item["job_hash"]):
+                        self._retry_later(item, e)
+        if self._failed:
+            saved = self.save_backlog()
+            print(f"\n💾 {saved} failed jobs saved to {self.queue.backlog_path} for the next run.")
+        else:
+            self.queue.clear_backlog()
+        return True
+
+    def print_forecast(self):
+        forecast = self.writer.forecast(staged=STAGED_GENERATION)
+        if forecast["jobs_left"] is None:
+            return
+        per_job = f", ~{forecast['tokens_per_job']} tokens/job" if forecast["tokens_per_job"] else ""
+        print(f"📈 Quota forecast: {forecast['requests_left']} {forecast['model']} requests left today ≈ "
+              f"{forecast['jobs_left']} jobs ({forecast['calls_per_job']} calls/job{per_job})")
+
+    def print_stage_report(self):
+        """Per-stage latency and token usage of the AI calls made in this run, plus retry decisions."""
+        run = self.writer.usage.run
+        if run["requests"]:
+            print(f"🧮 AI usage: {run['requests']} calls, {run['prompt_tokens']} in / "
+                  f"{run['output_tokens']} out tokens, {run['seconds']:.1f}s (saved to {self.writer.usage.path})")
+        self.print_forecast()
+        metrics = self.writer.retry_policy.metrics
+        if any(k != "success" for k in metrics):
+            print("🔁 Retries: " + ", ".join(f"{k}={v}" for k, v in sorted(metrics.items())))
+        if not self.writer.stage_stats:
+            return
+        print("🤖 AI stages:")
+        for stage, stats in self.writer.stage_stats.items():
+            avg = stats["seconds"] / stats["calls"]
+            print(f"   {stage:<9} {stats['model']:<24} {stats['calls']:>3} calls  "
+                  f"{stats['seconds']:>7.1f}s (avg {avg:.1f}s)  "
+                  f"in {stats['prompt_tokens']:>8} / out {stats['output_tokens']:>7} tokens"
+                  f"  (cached {stats.get('cached_tokens', 0)})")
+        cache = self.writer.context_cache
+        if cache and any(cache.stats.values()):
+            print("🗄️  Context cache: " + ", ".join(f"{k}={v}" for k, v in cache.stats.items()))
+
+    def shutdown(self):
+        # Cleanly shutdown the thread executor, the export writer (flushing the CSV) and the PDF workers
+        self.prescreener.save_corpus()
+        self.executor.shutdown(wait=True)
+        self.manager.close()
+        self.pdf_service.shutdown(wait=True)
+
+
+def main():
+    # 1. Component Initialization
+    pipeline = JobPipeline()
+    scraper = LinkedInScraper()
+
+    print("🚀 Automatic Application Generator started.")
+
+    # 2. LinkedIn Search URL Input
+    search_url = input("Paste your LinkedIn filtered search URL: ").strip()
+
+    if not search_url:
+        print("❌ Invalid URL.")
+        return
+
+    try:
+        # 3. Exports that failed last time (AI output kept), then leftover jobs competing with the new ones
+        replayed = pipeline.replay_parked()
+        if replayed:
+            print(f"📤 {replayed} parked AI results exported again.")
+        backlog = pipeline.queue.load_backlog()
+        if backlog:
+            print(f"📥 {backlog} jobs loaded from the previous run's backlog.")
+        deferred = pipeline.requeue_deferred()
+        if deferred:
+            print(f"📥 {deferred} deferred jobs now pass the pre-screen.")
+
+        # 4. Scraping Loop: screen each card locally and queue the viable ones
+        # The scraper yields job_data dynamically
+        for job_data in scraper.scrape_search_results(search_url):
+            job_data.setdefault("scraped_at", datetime.now().isoformat())
+            item = pipeline.screen(job_data)
+            if item:
+                pipeline.queue.push(item)
+
+        # 5. Generation in priority order
+        print(f"\n📋 {len(pipeline.queue)} jobs queued for AI generation (best matches first).")
+        pipeline.print_forecast()
+        completed = pipeline.drain_queue()
+        pipeline.manager.drain()
 
         print("\n" + "="*50)
-        print("🏁 Operation completed successfully!")
+        print("🏁 Operation completed successfully!" if completed else "⏸️  Operation paused (quota or API health).")
+        stats = pipeline.pdf_service.cache_stats()
+        print(f"📄 PDF cache: {stats['hits']} hits / {stats['misses']} renders / {stats['failed']} failed")
+        print(f"✂️  JD normalisation saved ~{pipeline.tokens_saved} input tokens")
+        pipeline.print_stage_report()
         print("="*50)
 
     except KeyboardInterrupt:
+        saved = pipeline.save_backlog()
+        if saved:
+            print(f"\n💾 {saved} pending jobs saved to {pipeline.queue.backlog_path}.")
         print("\n\n👋 Interrupted by user.")
     except Exception as e:
         print(f"\n❌ Critical system failure: {e}")
+        saved = pipeline.save_backlog()
+        if saved:
+            print(f"💾 {saved} pending jobs saved to {pipeline.queue.backlog_path}.")
     finally:
-        # Cleanly shutdown the thread executor
-        executor.shutdown(wait=True)
+        pipeline.shutdown()
 
 
 if __name__ == "__main__":
@@ -58,51 +58,78 @@ class LinkedInScraper:
 
             input(">>> Filters adjusted? Press ENTER to start extraction...")
 
-            # --- Step 1: Handle Lazy Loading ---
-            print("\n⏳ Loading all jobs from the sidebar...")
-            try:
-                list_container = page.locator(self.selectors["left_container"])
-                if list_container.count() > 0:
-                    for _ in range(5):
-                        list_container.evaluate("node => node.scrollTop += 1000")
-                        time.sleep(1)
-            except Exception as e:
-                print(f"⚠️  Scroll Warning: {e}")
+            yield from self.extract_jobs(page)
+
+            print("\n✅ Page scan complete.")
+            browser.close()
 
-            # --- Step 2: Identify Job Cards ---
-            page.wait_for_selector(self.selectors["job_card"], timeout=10000)
-            cards = page.locator(self.selectors["job_card"]).all()
+    def extract_jobs(self, page, skip_ids=None, detail_wait=2):
+        """
+        Yields job data for every card in the results list already open in `page`.
 
-            print(f"🎯 Found {len(cards)} jobs matching your filters.")
+        Args:
+            skip_ids (set): LinkedIn job ids to pass over without opening their detail pane.
+            detail_wait (float): Seconds allowed for the detail pane to update after a click.
+        """
+        # --- Step 1: Handle Lazy Loading ---
+        print("\n⏳ Loading all jobs from the sidebar...")
+        try:
+            list_container = page.locator(self.selectors["left_container"])
+            if list_container.count() > 0:
+                for _ in range(5):
+                    list_container.evaluate("node => node.scrollTop += 1000")
+                    time.sleep(1)
+        except Exception as e:
+            print(f"⚠️  Scroll Warning: {e}")
 
-            # --- Step 3: Extraction Loop ---
-            for i, card in enumerate(cards):
-                try:
-                    print(f"   📄 Reading job {i+1}/{len(cards)}...")
+        # --- Step 2: Identify Job Cards ---
+        page.wait_for_selector(self.selectors["job_card"], timeout=10000)
+        cards = page.locator(self.selectors["job_card"]).all()
 
-                    card.scroll_into_view_if_needed()
-                    card.click()
-                    time.sleep(2)  # Wait for the detail pane to update
+        print(f"🎯 Found {len(cards)} jobs matching your filters.")
 
-                    data = {
-                        "title": self._get_text(page, self.selectors["title"]),
-                        "company": self._get_text(page, self.selectors["company"]),
-                        "description": self._get_text(page, self.selectors["description"]),
-                        "url": page.url
-                    }
+        # --- Step 3: Extraction Loop ---
+        for i, card in enumerate(cards):
+            try:
+                job_id = self._card_job_id(card)
+                if skip_ids and job_id in skip_ids:
+                    continue
+                print(f"   📄 Reading job {i+1}/{len(cards)}...")
 
-                    # Fallback for dynamic description boxes
-                    if not data["description"] or data["description"] == "unknown":
-                        data["description"] = self._get_text(page, ".jobs-box__group")
+                card.scroll_into_view_if_needed()
+                card.click()
+                time.sleep(detail_wait)  # Wait for the detail pane to update
 
-                    yield data
+                data = {
+                    "title": self._get_text(page, self.selectors["title"]),
+                    "company": self._get_text(page, self.selectors["company"]),
+                    "description": self._get_text(page, self.selectors["description"]),
+                    "url": page.url,
+                    "job_id": job_id
+                }
 
-                except Exception as e:
-                    print(f"   ⚠️  Error extracting job {i+1}: {e}")
-                    continue
+                # Fallback for dynamic description boxes
+                if not data["description"] or data["description"] == "unknown":
+                    data["description"] = self._get_text(page, ".jobs-box__group")
 
-            print("\n✅ Page scan complete.")
-            browser.close()
+                yield data
+
+            except Exception as e:
+                print(f"   ⚠️  Error extracting job {i+1}: {e}")
+                continue
+
+    @staticmethod
+    def _card_job_id(card):
+        """LinkedIn's numeric job id from a result card, or None if the markup does not expose it."""
+        try:
+            job_id = card.get_attribute("data-occludable-job-id")
+            if not job_id:
+                inner = card.locator("[data-job-id]")
+                if inner.count() > 0:
+                    job_id = inner.first.get_attribute("data-job-id")
+            return job_id or None
+        except Exception:
+            return None
 
     def _get_text(self, page, selector):
         """
@@ -122,4 +149,54 @@ class LinkedInScraper:
             return "Not found"
         except Exception as e:
             print(f"   ⚠️  Warning: Failed to read selector {selector}: {e}")
-            return "Not found"
\ No newline at end of file
+            return "Not found"
+
+
+class LoginRequiredError(Exception):
+    """The stored session is missing or expired; log in once with main.py (visible browser)."""
+
+
+class HeadlessLinkedInSession(LinkedInScraper):
+    """
+    Long-lived headless browser reusing the ./playwright_data login session.
+
+    The browser is started once and kept open between polls; each search reuses
+    the same page, so a cycle only pays for navigation and new job cards.
+    """
+
+    def __init__(self, user_data_dir="./playwright_data", detail_wait=1.5):
+        super().__init__()
+        self.user_data_dir = user_data_dir
+        self.detail_wait = detail_wait
+        self._playwright = None
+        self.browser = None
+        self.page = None
+
+    def start(self):
+        if self.browser:
+            return
+        self._playwright = sync_playwright().start()
+        self.browser = self._playwright.chromium.launch_persistent_context(self.user_data_dir, headless=True)
+        self.page = self.browser.pages[0] if self.browser.pages else self.browser.new_page()
+
+    def scrape(self, search_url, skip_ids=None):
+        """Yields job data for one saved search. Raises LoginRequiredError if LinkedIn asks to log in."""
+        try:
+            self.start()
+            self.page.goto(search_url)
+        except Exception:
+            self.close()  # A crashed browser is relaunched on the next search
+            raise
+        if any(marker in self.page.url for marker in ("/login", "/authwall", "/checkpoint")):
+            raise LoginRequiredError("LinkedIn session expired: run main.py once and log in.")
+        yield from self.extract_jobs(self.page, skip_ids=skip_ids, detail_wait=self.detail_wait)
+
+    def close(self):
+        try:
+            if self.browser:
+                self.browser.close()
+            if self._playwright:
+                self._playwright.stop()
+        except Exception as e:
+            print(f"⚠️  Browser shutdown warning: {e}")
+        self._playwright = self.browser = self.page = None
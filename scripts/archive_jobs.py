@@ -0,0 +1,100 @@
+"""
+scripts/archive_jobs.py
+Packs old job folders into monthly zip bundles (zzz_output/.archive/YYYY-MM.zip)
+to keep zzz_output small. A folder is archived when it is older than N days or
+its CRM status in the Master CSV is terminal. Archived jobs stay listed in the
+folder index; sync_utils, rerender_pdfs --job and find_job --extract unpack them on demand.
+
+Usage: python -m scripts.archive_jobs [--older-than 180] [--status Rejected,Closed] [--dry-run]
+"""
+
+import os
+import argparse
+from datetime import datetime, timedelta
+import pandas as pd
+from dotenv import load_dotenv
+from core.folder_index import FolderIndex
+
+load_dotenv()
+
+MASTER_CSV = "applications_master_log.csv"
+
+
+def load_statuses():
+    """Maps job_hash -> CRM status from the Master CSV (narrow read)."""
+    if not os.path.exists(MASTER_CSV):
+        return {}
+    try:
+        df = pd.read_csv(MASTER_CSV, usecols=["job_hash", "status"])
+    except ValueError:
+        print(f"⚠️  Warning: 'job_hash'/'status' columns not found in {MASTER_CSV}.")
+        return {}
+    return dict(zip(df["job_hash"], df["status"].fillna("")))
+
+
+def select_jobs(index, older_than_days, statuses, terminal_statuses):
+    """Local (not yet archived) jobs that are older than the cutoff or in a terminal status."""
+    cutoff = (datetime.now() - timedelta(days=older_than_days)).strftime("%Y%m%d") if older_than_days else None
+    terminal = {s.lower() for s in terminal_statuses}
+    selected = []
+    for entry in index.all():
+        if not index.is_local(entry["job_hash"]):
+            continue
+        status = str(statuses.get(entry["job_hash"]) or entry.get("status") or "").lower()
+        if (cutoff and entry.get("date") and entry["date"] < cutoff) or status in terminal:
+            selected.append(entry)
+    return sorted(selected, key=lambda e: e["folder"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive old job folders into monthly zip bundles.")
+    parser.add_argument("--base-path", default="zzz_output")
+    parser.add_argument("--older-than", type=int, default=int(os.getenv("ARCHIVE_AFTER_DAYS", "180")),
+                        help="Archive folders older than this many days (0 = only by status)")
+    parser.add_argument("--status", default=os.getenv("ARCHIVE_STATUSES", "Rejected,Closed,Withdrawn"),
+                        help="Comma-separated terminal CRM statuses archived regardless of age")
+    parser.add_argument("--dry-run", action="store_true", help="Only list what would be archived")
+    args = parser.parse_args()
+
+    index = FolderIndex(args.base_path)
+    terminal = [s.strip() for s in args.status.split(",") if s.strip()]
+    jobs = select_jobs(index, args.older_than, load_statuses(), terminal)
+    if not jobs:
+        print("✅ Nothing to archive.")
+        return
+
+    print(f"📦 {'Would archive' if args.dry_run else 'Archiving'} {len(jobs)} job folders...")
+    if args.dry_run:
+        for entry in jobs:
+            print(f"   {entry['folder']}  [{entry.get('status') or '-'}]")
+        return
+
+    sizes = {}
+    for entry in jobs:
+        sizes[entry["job_hash"]] = sum(os.path.getsize(os.path.join(entry["path"], f))
+                                       for f in os.listdir(entry["path"]))
+        # Current digests go into the bundle's internal index
+        index.update(entry["job_hash"], entry["path"], save=False)
+
+    # Each bundle is rewritten once for the whole run
+    results = index.archive.archive_many([(e["job_hash"], index.entries[e["job_hash"]]) for e in jobs])
+    archived, failed, freed = 0, 0, 0
+    for entry in jobs:
+        bundle = results[entry["job_hash"]]
+        if isinstance(bundle, Exception):
+            failed += 1
+            print(f"   ⚠️ {entry['folder']}: {bundle}")
+            continue
+        index.mark_archived(entry["job_hash"], bundle, save=False)
+        archived += 1
+        freed += sizes[entry["job_hash"]]
+
+    index.save()
+    bundles = index.archive.bundles()
+    packed = sum(os.path.getsize(index.archive.bundle_path(b)) for b in bundles)
+    print(f"   ✅ Archived: {archived} | ❌ Failed: {failed} | "
+          f"{freed / 1e6:.1f} MB of folders -> {len(bundles)} bundles ({packed / 1e6:.1f} MB total)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+scripts/benchmark_pdf.py
+Compares the PDF backends (render time, memory and output size) on the real
+markdown corpus found in zzz_output. Falls back to assets/resume.txt when no
+job folders exist yet. Each backend runs in a fresh process, so its peak RSS is
+its own; helper_rss_mb is the largest process it started (Chromium).
+
+Usage: python -m scripts.benchmark_pdf [--backends xhtml2pdf,chromium] [--limit 20] [--runs 1]
+"""
+
+import os
+import math
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dotenv import load_dotenv
+from core.pdf_backends import PDFBackendFactory
+from core.pdf_generator import build_html
+from core.folder_index import FolderIndex
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+load_dotenv()
+
+CORPUS_FILES = ("2_tailored_resume.md", "3_cover_letter.md")
+
+
+def load_corpus(base_path="zzz_output", limit=None):
+    """Collects the markdown documents produced by previous runs."""
+    paths = []
+    index = FolderIndex(base_path)
+    for entry in index.all():
+        if not index.is_local(entry["job_hash"]):
+            continue  # Archived
+        paths.extend(os.path.join(entry["path"], filename)
+                     for filename in CORPUS_FILES if filename in (entry.get("documents") or {}))
+    paths.sort()
+    if not paths and os.path.exists("assets/resume.txt"):
+        paths = ["assets/resume.txt"]
+    if limit:
+        paths = paths[:limit]
+
+    corpus = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            corpus.append((path, f.read()))
+    return corpus
+
+
+def _rss_mb(who):
+    if resource is None:
+        return None
+    # ru_maxrss is KB on Linux (bytes on macOS; good enough for a relative comparison)
+    return round(resource.getrusage(who).ru_maxrss / 1024, 1)
+
+
+def benchmark_backend(name, corpus, runs=1):
+    """Renders the whole corpus with one backend and returns its measurements."""
+    if runs < 1:
+        raise ValueError(f"runs must be at least 1 (got {runs}).")
+    if not corpus:
+        raise ValueError("The corpus is empty.")
+    backend = PDFBackendFactory.get_backend(name)
+    html_docs = [build_html(md) for _, md in corpus]
+    timings = []
+    sizes = []
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tracemalloc.start()
+        try:
+            # Cold start: first document includes engine/browser startup
+            start = time.perf_counter()
+            backend.render(html_docs[0], os.path.join(tmp_dir, "warmup.pdf"))
+            cold_start = time.perf_counter() - start
+
+            for run in range(runs):
+                for i, html in enumerate(html_docs):
+                    dest = os.path.join(tmp_dir, f"{run}_{i}.pdf")
+                    start = time.perf_counter()
+                    backend.render(html, dest)
+                    timings.append(time.perf_counter() - start)
+                    if run == 0:
+                        sizes.append(os.path.getsize(dest))
+        finally:
+            _, py_peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            backend.close()
+
+    timings.sort()
+    return {
+        "backend": name,
+        "documents": len(html_docs),
+        "cold_start_s": round(cold_start, 3),
+        "mean_s": round(sum(timings) / len(timings), 3),
+        "p95_s": round(timings[max(0, math.ceil(len(timings) * 0.95) - 1)], 3),
+        "total_s": round(sum(timings), 3),
+        "py_peak_mb": round(py_peak / (1024 * 1024), 1),
+        "avg_size_kb": round(sum(sizes) / len(sizes) / 1024, 1),
+    }
+
+
+def _benchmark_isolated(name, corpus, runs):
+    """Runs inside a fresh process; peaks are read once the backend (and its browser) has exited."""
+    result = benchmark_backend(name, corpus, runs)
+    result["max_rss_mb"] = _rss_mb(resource.RUSAGE_SELF) if resource else None
+    # Largest terminated descendant (the Chromium processes; ~0 for xhtml2pdf)
+    result["helper_rss_mb"] = _rss_mb(resource.RUSAGE_CHILDREN) if resource else None
+    return result
+
+
+def run_isolated(name, corpus, runs=1):
+    """Benchmarks one backend in its own spawned process so memory peaks do not carry over."""
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(_benchmark_isolated, name, corpus, runs).result()
+
+
+def print_table(results):
+    columns = ["backend", "documents", "cold_start_s", "mean_s", "p95_s", "total_s",
+               "py_peak_mb", "max_rss_mb", "helper_rss_mb", "avg_size_kb"]
+    widths = {c: max(len(c), *(len(str(r[c])) for r in results)) for c in columns}
+    print("  ".join(c.ljust(widths[c]) for c in columns))
+    print("  ".join("-" * widths[c] for c in columns))
+    for r in results:
+        print("  ".join(str(r[c]).ljust(widths[c]) for c in columns))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDF rendering backends.")
+    parser.add_argument("--backends", default=",".join(PDFBackendFactory.BACKENDS))
+    parser.add_argument("--limit", type=int, default=None, help="Max documents from the corpus")
+    parser.add_argument("--runs", type=int, default=1, help="Passes over the corpus per backend")
+    parser.add_argument("--json", dest="json_path", default=None, help="Also save results to this file")
+    args = parser.parse_args()
+    if args.runs < 1:
+        parser.error("--runs must be at least 1")
+
+    corpus = load_corpus(limit=args.limit)
+    if not corpus:
+        print("❌ No markdown documents found to benchmark.")
+        return
+
+    print(f"📚 Corpus: {len(corpus)} documents, {args.runs} run(s) per backend\n")
+    results = []
+    for name in args.backends.split(","):
+        print(f"⏱️  Benchmarking {name}...")
+        try:
+            results.append(run_isolated(name, corpus, runs=args.runs))
+        except Exception as e:
+            print(f"   ⚠️ {name} failed: {e}")
+
+    if results:
+        print()
+        print_table(results)
+        if args.json_path:
+            with open(args.json_path, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=4)
+            print(f"\n💾 Results saved to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
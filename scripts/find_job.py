@@ -0,0 +1,50 @@
+"""
+scripts/find_job.py
+Looks up job folders through the folder index (zzz_output/.folder_index.json).
+
+Usage: python -m scripts.find_job <hash_prefix | "company title words">
+       python -m scripts.find_job --rebuild     # re-index every folder (after manual moves)
+       python -m scripts.find_job --prune       # forget folders deleted by hand
+       python -m scripts.find_job --extract 3fa9c2d1   # unpack an archived job folder
+"""
+
+import argparse
+from core.folder_index import FolderIndex
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find job folders by hash prefix, company or title.")
+    parser.add_argument("query", nargs="*", help="Hash prefix (4+ chars) or company/title words")
+    parser.add_argument("--base-path", default="zzz_output")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild the index from every metadata.json")
+    parser.add_argument("--prune", action="store_true", help="Drop entries whose folder no longer exists")
+    parser.add_argument("--extract", action="store_true", help="Extract matching archived jobs to base_path")
+    args = parser.parse_args()
+
+    index = FolderIndex(args.base_path)
+    if args.rebuild:
+        index.rebuild()
+    if args.prune:
+        print(f"🧹 {index.prune()} missing folders removed from the index.")
+    if not args.query:
+        if not (args.rebuild or args.prune):
+            parser.print_help()
+        return
+
+    matches = index.resolve(" ".join(args.query))
+    if not matches:
+        print("❌ No job folder matches.")
+        return
+    for match in matches:
+        if args.extract and match["job_hash"]:
+            index.ensure_local(match["job_hash"])
+        synced = match.get("synced_at") or "never"
+        if match["job_hash"] and not index.is_local(match["job_hash"]):
+            synced += f", archived in {match.get('archive')}"
+        print(f"{(match['job_hash'] or '?')[:8]}  {match.get('company')} - {match.get('title')}  "
+              f"[{match.get('status') or '-'}] synced: {synced}")
+        print(f"          {match['path']}")
+
+
+if __name__ == "__main__":
+    main()
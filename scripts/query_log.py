@@ -0,0 +1,180 @@
+"""
+scripts/query_log.py
+Fast queries over the application history.
+A Parquet snapshot of the narrow CRM columns (.query_cache/applications.parquet)
+is refreshed incrementally from applications_master_log.csv before each query,
+so filters, sorts and aggregates never load the markdown/JD blob columns.
+
+Usage: python -m scripts.query_log [--status Generated] [--work-model Remote,Hybrid]
+                                   [--min-score 8] [--not-applied] [--country canada]
+                                   [--company acme] [--since 2026-01-01] [--until 2026-02-01]
+                                   [--sort -tailored_score,date_generated] [--limit 50]
+                                   [--group-by work_model] [--columns company,title]
+                                   [--export results.csv] [--rebuild]
+
+Example: all remote roles with tailored score >= 8 not yet applied to
+    python -m scripts.query_log --work-model Remote --min-score 8 --not-applied --sort -tailored_score
+"""
+
+import os
+import json
+import time
+import argparse
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from core.history_snapshot import SNAPSHOT_COLUMNS, NUMERIC_COLUMNS, read_new_rows
+
+MASTER_CSV = "applications_master_log.csv"
+SNAPSHOT_PATH = os.path.join(".query_cache", "applications.parquet")
+DEFAULT_COLUMNS = ["date_generated", "company", "title", "work_model", "country",
+                   "tailored_score", "status", "job_hash"]
+
+SCHEMA = pa.schema([(c, pa.float64() if c in NUMERIC_COLUMNS else pa.string()) for c in SNAPSHOT_COLUMNS])
+
+
+def refresh_snapshot(csv_path=MASTER_CSV, snapshot_path=SNAPSHOT_PATH, rebuild=False):
+    """
+    Brings the snapshot up to date with the CSV and returns it as an Arrow table.
+    The CSV read position is stored in the Parquet schema metadata.
+    """
+    table, state = None, None
+    if os.path.exists(snapshot_path) and not rebuild:
+        try:
+            table = pq.read_table(snapshot_path)
+            state = json.loads(table.schema.metadata[b"csv_state"])
+        except Exception as e:
+            print(f"⚠️  Snapshot unreadable ({e}); rebuilding.")
+            table, state = None, None
+
+    rows, new_state, rebuilt = read_new_rows(csv_path, state)
+    if not rebuilt and not rows and new_state == state:
+        return table
+
+    new_rows = pa.Table.from_pylist(rows, schema=SCHEMA)
+    if rebuilt or table is None:
+        table = new_rows
+    else:
+        table = pa.concat_tables([table.cast(SCHEMA), new_rows])
+    table = table.replace_schema_metadata({"csv_state": json.dumps(new_state)})
+
+    os.makedirs(os.path.dirname(snapshot_path) or ".", exist_ok=True)
+    tmp_path = f"{snapshot_path}.tmp"
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, snapshot_path)
+    action = "rebuilt" if rebuilt else f"+{len(rows)} rows"
+    print(f"🗂️  Snapshot {action} ({table.num_rows} applications).")
+    return table
+
+
+def _csv_list(value):
+    return [v.strip().lower() for v in value.split(",") if v.strip()] if value else []
+
+
+def apply_filters(df, args):
+    """Boolean filters from the CLI arguments (text matches are case-insensitive)."""
+    mask = pd.Series(True, index=df.index)
+    lower = {c: df[c].fillna("").str.lower() for c in ("status", "work_model", "country", "company")}
+    if args.status:
+        mask &= lower["status"].isin(_csv_list(args.status))
+    if args.work_model:
+        mask &= lower["work_model"].isin(_csv_list(args.work_model))
+    if args.country:
+        mask &= lower["country"].str.contains(args.country.lower(), regex=False)
+    if args.company:
+        mask &= lower["company"].str.contains(args.company.lower(), regex=False)
+    if args.min_score is not None:
+        mask &= df["tailored_score"] >= args.min_score
+    if args.min_original is not None:
+        mask &= df["original_score"] >= args.min_original
+    if args.not_applied:
+        mask &= df["applied_date"].isna()
+    dates = pd.to_datetime(df["date_generated"], errors="coerce")
+    if args.since:
+        mask &= dates >= pd.Timestamp(args.since)
+    if args.until:
+        mask &= dates < pd.Timestamp(args.until) + pd.Timedelta(days=1)
+    return df[mask]
+
+
+def apply_sort(df, sort):
+    """'-tailored_score,date_generated' sorts by score descending, then date ascending."""
+    if not sort:
+        return df
+    keys = [k.strip() for k in sort.split(",") if k.strip()]
+    columns = [k.lstrip("-") for k in keys]
+    unknown = [c for c in columns if c not in df.columns]
+    if unknown:
+        raise ValueError(f"Unknown sort column(s): {', '.join(unknown)}")
+    return df.sort_values(columns, ascending=[not k.startswith("-") for k in keys], na_position="last")
+
+
+def aggregate(df, group_by):
+    """Count and score statistics per group (e.g. status, work_model, country, company)."""
+    groups = [g.strip() for g in group_by.split(",") if g.strip()]
+    summary = df.groupby(groups, dropna=False).agg(
+        jobs=("job_hash", "count"),
+        avg_tailored=("tailored_score", "mean"),
+        max_tailored=("tailored_score", "max"),
+        avg_original=("original_score", "mean"),
+        applied=("applied_date", "count")
+    ).round(2)
+    return summary.sort_values("jobs", ascending=False).reset_index()
+
+
+def export(df, path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".json":
+        df.to_json(path, orient="records", indent=2, force_ascii=False)
+    elif ext == ".parquet":
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False, encoding="utf-8")
+    print(f"💾 {len(df)} rows exported to {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the application history (narrow columnar snapshot).")
+    parser.add_argument("--csv", default=MASTER_CSV)
+    parser.add_argument("--snapshot", default=SNAPSHOT_PATH)
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild the snapshot from scratch")
+    parser.add_argument("--status", help="Comma-separated CRM statuses (e.g. Generated,Applied)")
+    parser.add_argument("--work-model", help="Comma-separated work models (e.g. Remote,Hybrid)")
+    parser.add_argument("--country", help="Case-insensitive substring of the country")
+    parser.add_argument("--company", help="Case-insensitive substring of the company name")
+    parser.add_argument("--min-score", type=float, help="Minimum tailored score")
+    parser.add_argument("--min-original", type=float, help="Minimum original score")
+    parser.add_argument("--not-applied", action="store_true", help="Only rows without an applied_date")
+    parser.add_argument("--since", help="Generated on/after YYYY-MM-DD")
+    parser.add_argument("--until", help="Generated on/before YYYY-MM-DD")
+    parser.add_argument("--sort", default="-date_generated", help="Columns, '-' prefix for descending")
+    parser.add_argument("--limit", type=int, default=50, help="Rows printed (0 = all)")
+    parser.add_argument("--group-by", help="Aggregate per column(s) instead of listing rows")
+    parser.add_argument("--columns", help=f"Columns printed (default {','.join(DEFAULT_COLUMNS)})")
+    parser.add_argument("--export", help="Write the full result to .csv, .json or .parquet")
+    args = parser.parse_args()
+
+    table = refresh_snapshot(args.csv, args.snapshot, rebuild=args.rebuild)
+    if table is None or table.num_rows == 0:
+        print(f"❌ No applications found in {args.csv}.")
+        return
+
+    start = time.perf_counter()
+    df = apply_filters(table.to_pandas(), args)
+    if args.group_by:
+        result = aggregate(df, args.group_by)
+    else:
+        result = apply_sort(df, args.sort)
+        columns = [c.strip() for c in args.columns.split(",")] if args.columns else DEFAULT_COLUMNS
+        result = result[[c for c in columns if c in result.columns]]
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    shown = result if not args.limit else result.head(args.limit)
+    print(shown.to_string(index=False) if len(shown) else "(no matching applications)")
+    print(f"\n⚡ {len(result)} of {table.num_rows} rows in {elapsed_ms:.1f} ms")
+    if args.export:
+        export(result, args.export)
+
+
+if __name__ == "__main__":
+    main()
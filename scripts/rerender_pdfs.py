@@ -0,0 +1,240 @@
+"""
+scripts/rerender_pdfs.py
+Bulk re-render of every job PDF after a template (CSS) or USER_FULL_NAME change.
+Documents already rendered with the current template version are skipped by the
+render cache, so re-running the command only pays for what actually changed.
+PDFs keep the names already in each folder (save_all's Resume_<title> or
+sync_utils' Resume_<Company>_<title>); older copies of the same document, e.g.
+under a previous USER_FULL_NAME, are removed once the new one is written.
+
+Usage: python -m scripts.rerender_pdfs [--since 2026-01-01] [--until 2026-02-01]
+                                       [--company circleci] [--status Generated] [--job 3fa9c2d1]
+                                       [--workers 4] [--force]
+"""
+
+import os
+import re
+import json
+import time
+import argparse
+from datetime import datetime
+import pandas as pd
+from dotenv import load_dotenv
+from core.pdf_generator import TEMPLATE_VERSION
+from core.pdf_service import PDFRenderService
+from core.folder_index import FolderIndex
+
+load_dotenv()
+
+MASTER_CSV = "applications_master_log.csv"
+SOURCE_FILES = {
+    "Resume": "2_tailored_resume.md",
+    "Cover_Letter": "3_cover_letter.md"
+}
+# PDF title prefixes of each document type; the first one is save_all's
+TITLE_PREFIXES = {
+    "Resume": ("Resume_",),
+    "Cover_Letter": ("CoverLetter_", "Cover_Letter_")
+}
+# '<user name>_<title>.pdf' (see PDFGenerator.render)
+_PDF_NAME_RE = re.compile(r"^.+?_((?:Resume|CoverLetter|Cover_Letter)_.+)\.pdf$")
+
+
+def load_statuses():
+    """Maps job_hash -> CRM status from the Master CSV (narrow read)."""
+    if not os.path.exists(MASTER_CSV):
+        return {}
+    try:
+        df = pd.read_csv(MASTER_CSV, usecols=["job_hash", "status"])
+    except ValueError:
+        print(f"⚠️  Warning: 'job_hash'/'status' columns not found in {MASTER_CSV}.")
+        return {}
+    return dict(zip(df["job_hash"], df["status"]))
+
+
+def _folder_date(folder_name):
+    """Folder names start with YYYYMMDD."""
+    try:
+        return datetime.strptime(folder_name[:8], "%Y%m%d").date()
+    except ValueError:
+        return None
+
+
+def find_job_folders(base_path="zzz_output", since=None, until=None, company=None, status=None, job=None):
+    """
+    Enumerates job folders that match the filters (from the folder index, no directory walk).
+
+    Args:
+        job (str): Optional hash prefix or company/title words (see FolderIndex.resolve).
+
+    Returns:
+        list: Dicts with 'path', 'company', 'title' and 'job_hash'.
+    """
+    statuses = load_statuses() if status else {}
+    index = FolderIndex(base_path)
+    index.prune()
+    candidates = index.resolve(job) if job else index.all()
+    selected = []
+    archived = 0
+
+    for entry in sorted(candidates, key=lambda e: e["folder"]):
+        folder_date = _folder_date(entry["folder"])
+        if since and (folder_date is None or folder_date < since):
+            continue
+        if until and (folder_date is None or folder_date > until):
+            continue
+        if company and company.lower() not in str(entry.get("company")).lower():
+            continue
+        if status and str(statuses.get(entry["job_hash"], "")).lower() != status.lower():
+            continue
+        if entry["job_hash"] and not index.is_local(entry["job_hash"]):
+            # Bulk runs leave archived jobs packed; naming a job with --job extracts it
+            if not job:
+                archived += 1
+                continue
+            index.ensure_local(entry["job_hash"])
+
+        selected.append({
+            "path": entry["path"],
+            "company": entry.get("company"),
+            "title": entry.get("title"),
+            "job_hash": entry["job_hash"]
+        })
+
+    if archived:
+        print(f"📦 {archived} archived jobs skipped (select them with --job to extract and re-render).")
+    return selected
+
+
+def _read_sources(folder_path):
+    contents = {}
+    for doc_type, filename in SOURCE_FILES.items():
+        md_path = os.path.join(folder_path, filename)
+        if os.path.exists(md_path):
+            with open(md_path, "r", encoding="utf-8") as f:
+                contents[doc_type] = f.read()
+    return contents
+
+
+def _doc_type(pdf_title):
+    for doc_type, prefixes in TITLE_PREFIXES.items():
+        if pdf_title.startswith(prefixes):
+            return doc_type
+    return None
+
+
+def existing_pdfs(folder_path):
+    """Maps each document type to the (filename, PDF title) pairs already in a folder."""
+    found = {}
+    for filename in sorted(os.listdir(folder_path)):
+        match = _PDF_NAME_RE.match(filename)
+        if match and _doc_type(match.group(1)):
+            found.setdefault(_doc_type(match.group(1)), []).append((filename, match.group(1)))
+    return found
+
+
+def pdf_targets(folder_path, job_title, contents):
+    """
+    PDF title of each document: the name already in the folder, so a re-render replaces
+    the file instead of adding a second set. Defaults to save_all's Resume_<title>.
+    """
+    existing = existing_pdfs(folder_path)
+    documents = {}
+    for doc_type, content in contents.items():
+        default = TITLE_PREFIXES[doc_type][0] + re.sub(r'[\\/*?:"<>|]', "", job_title).replace(" ", "_")
+        titles = [title for _, title in existing.get(doc_type, [])]
+        documents[default if default in titles or not titles else titles[0]] = content
+    return documents
+
+
+def remove_superseded(outcome):
+    """Deletes the other PDFs of the same document type once the new one was written. Returns the count."""
+    doc_type = _doc_type(outcome["title"])
+    removed = 0
+    for filename, _ in existing_pdfs(outcome["output_path"]).get(doc_type, []):
+        path = os.path.join(outcome["output_path"], filename)
+        if os.path.abspath(path) != os.path.abspath(outcome["pdf_path"]):
+            os.remove(path)
+            removed += 1
+    return removed
+
+
+def rerender(folders, workers=None, force=False):
+    """Renders every folder's documents in parallel and returns the summary dict."""
+    jobs = []
+    for folder in folders:
+        contents = _read_sources(folder["path"])
+        if contents:
+            jobs.append((pdf_targets(folder["path"], folder["title"] or "", contents), folder["path"]))
+
+    start = time.perf_counter()
+    with PDFRenderService(max_workers=workers) as pdf_service:
+        outcomes = pdf_service.render_many(jobs, force=force)
+        stats = pdf_service.cache_stats()
+        workers = pdf_service.max_workers
+    elapsed = time.perf_counter() - start
+    superseded = sum(remove_superseded(o) for o in outcomes if not o["error"])
+
+    render_times = [o["seconds"] for o in outcomes if o["status"] == "rendered"]
+    return {
+        "finished_at": datetime.now().isoformat(),
+        "template_version": TEMPLATE_VERSION,
+        "user_name": os.getenv("USER_FULL_NAME", "Candidato"),
+        "workers": workers,
+        "folders": len(jobs),
+        "documents": len(outcomes),
+        "stats": stats,
+        "superseded_removed": superseded,
+        "wall_time_s": round(elapsed, 3),
+        "avg_render_s": round(sum(render_times) / len(render_times), 3) if render_times else None,
+        "failures": [
+            {"folder": o["output_path"], "title": o["title"], "error": o["error"]}
+            for o in outcomes if o["error"]
+        ],
+        "documents_detail": [
+            {"folder": o["output_path"], "title": o["title"], "status": o["status"], "seconds": o["seconds"]}
+            for o in outcomes
+        ]
+    }
+
+
+def _parse_date(value):
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-render job PDFs in bulk.")
+    parser.add_argument("--base-path", default="zzz_output")
+    parser.add_argument("--since", type=_parse_date, help="Folders dated on/after YYYY-MM-DD")
+    parser.add_argument("--until", type=_parse_date, help="Folders dated on/before YYYY-MM-DD")
+    parser.add_argument("--company", help="Case-insensitive substring of the company name")
+    parser.add_argument("--status", help="CRM status from the Master CSV (e.g. Generated)")
+    parser.add_argument("--job", help="Hash prefix or company/title words of specific job(s)")
+    parser.add_argument("--workers", type=int, default=None, help="Render processes (default: PDF_RENDER_WORKERS)")
+    parser.add_argument("--force", action="store_true", help="Ignore the render cache")
+    args = parser.parse_args()
+
+    folders = find_job_folders(args.base_path, args.since, args.until, args.company, args.status, args.job)
+    if not folders:
+        print("❌ No job folders matched the filters.")
+        return
+
+    print(f"📄 Re-rendering {len(folders)} folders (template {TEMPLATE_VERSION})...")
+    summary = rerender(folders, workers=args.workers, force=args.force)
+
+    summary_path = os.path.join(args.base_path, f"rerender_summary_{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=4, ensure_ascii=False)
+
+    stats = summary["stats"]
+    print(f"   ✅ Rendered: {stats['rendered']} | ⏩ Up to date: {stats['hits']} | ❌ Failed: {stats['failed']}")
+    if summary["superseded_removed"]:
+        print(f"   🧹 {summary['superseded_removed']} outdated PDFs removed")
+    print(f"   ⏱️  {summary['wall_time_s']}s total")
+    for failure in summary["failures"]:
+        print(f"   ⚠️ {failure['title']}: {failure['error']}")
+    print(f"📝 Summary saved to {summary_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,10 @@
 """
 scripts/sync_utils.py
 Utility to sync Markdown edits back to JSON/CSV and regenerate PDFs.
+The job can be given as a folder path, a job_hash prefix or company/title words
+(resolved through the folder index).
+
+Usage: python -m scripts.sync_utils <folder_path | hash_prefix | "company title words">
 """
 
 import os
@@ -9,7 +13,8 @@ import json
 import re
 import pandas as pd
 from dotenv import load_dotenv
-from core.pdf_generator import PDFGenerator
+from core.pdf_service import PDFRenderService
+from core.folder_index import FolderIndex
 
 load_dotenv()
 
@@ -21,7 +26,44 @@ def clean_name(text):
     return re.sub(r'_+', '_', text).strip('_')
 
 
-def sync_all_from_folder(folder_path):
+def pdf_documents(company, job_title, contents_by_type):
+    """
+    Maps PDF titles to markdown content.
+    Final filename structure: Resume_Company_JobTitle
+    """
+    f_company = clean_name(company)
+    f_job = clean_name(job_title)
+
+    # Clean up naming redundancy (e.g., Apple_Apple_Engineer -> Apple_Engineer)
+    if f_job.lower().startswith(f_company.lower()):
+        f_job = f_job[len(f_company):].strip("_")
+
+    return {
+        f"{doc_type}_{f_company}_{f_job}": content
+        for doc_type, content in contents_by_type.items()
+    }
+
+
+def resolve_folder(query, index=None):
+    """
+    Returns the single job folder matching a path, hash prefix or company/title words.
+    Prints the candidates and returns None when the query is ambiguous or unknown.
+    """
+    index = index or FolderIndex()
+    matches = index.resolve(query)
+    if len(matches) == 1:
+        # Archived jobs are extracted back so their markdown can be edited and synced
+        return index.ensure_local(matches[0]["job_hash"]) if matches[0]["job_hash"] else matches[0]["path"]
+    if not matches:
+        print(f"❌ Error: No job folder matches '{query}'.")
+    else:
+        print(f"⚠️  '{query}' matches {len(matches)} jobs; be more specific:")
+        for match in matches[:20]:
+            print(f"   {match['job_hash'][:8]}  {match['company']} - {match['title']}  ({match['folder']})")
+    return None
+
+
+def sync_all_from_folder(folder_path, index=None):
     """
     Synchronizes manual .md edits back to the Master CSV and JSON metadata.
     Uses 'job_hash' to ensure we update the correct record.
@@ -84,27 +126,30 @@ def sync_all_from_folder(folder_path):
                 print(f"   📊 Master Log synced for hash: {job_hash[:8]}")
 
     # 4. Regenerate PDFs
-    pdf_gen = PDFGenerator()
-    f_company = clean_name(company)
-    f_job = clean_name(job_title)
-
-    # Clean up naming redundancy (e.g., Apple_Apple_Engineer -> Apple_Engineer)
-    if f_job.lower().startswith(f_company.lower()):
-        f_job = f_job[len(f_company):].strip("_")
-
     print(f"📄 Regenerating PDFs in: {folder_path}...")
-    for doc_type, content in updated_contents.items():
-        # Final filename structure: Resume_Company_JobTitle
-        final_filename = f"{doc_type}_{f_company}_{f_job}"
-        try:
-            pdf_gen.convert_resume(content, final_filename, folder_path)
-            print(f"   ✅ Created: {final_filename}.pdf")
-        except Exception as e:
-            print(f"   ⚠️ PDF Gen Error: {e}")
+    documents = pdf_documents(company, job_title, updated_contents)
+    with PDFRenderService() as pdf_service:
+        for outcome in pdf_service.render_many([(documents, folder_path)]):
+            if outcome["error"]:
+                print(f"   ⚠️ PDF Gen Error: {outcome['error']}")
+            elif outcome["status"] == "rendered":
+                print(f"   ✅ Created: {outcome['title']}.pdf")
+            else:
+                print(f"   ⏩ Unchanged ({outcome['status']}): {outcome['title']}.pdf")
+
+    # 5. New document digests and sync time in the folder index
+    if job_hash:
+        parent = os.path.dirname(os.path.normpath(folder_path)) or "."
+        if index is None or os.path.abspath(index.base_path) != os.path.abspath(parent):
+            index = FolderIndex(parent)
+        index.update(job_hash, folder_path, company, job_title, synced=True)
 
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print("Usage: python sync_utils.py <folder_path>")
+        print("Usage: python -m scripts.sync_utils <folder_path | hash_prefix | \"company title words\">")
     else:
-        sync_all_from_folder(sys.argv[1])
+        folder_index = FolderIndex()
+        folder = resolve_folder(" ".join(sys.argv[1:]), folder_index)
+        if folder:
+            sync_all_from_folder(folder, folder_index)
@@ -0,0 +1,39 @@
+"""
+tests/test_api_server.py
+Unit tests for the HTTP service's job function (the AI writer is faked).
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+from api_server import build_processor
+from core.file_manager import JobFileManager
+from core.master_log import MasterLogWriter
+
+JOB = {"job_hash": "ab" * 32, "company": "Acme", "title": "Data Engineer", "description": "Build pipelines.", "url": ""}
+AI_RES = {"analysis": {"gaps": []}, "files": {"tailored_resume_md": "", "cover_letter_md": ""}}
+
+
+class TestProcessor(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.manager = JobFileManager(base_path=os.path.join(self.tmp.name, "out"), pdf_service=mock.Mock())
+        self.manager.master_log = MasterLogWriter(os.path.join(self.tmp.name, "log.csv"), flush_seconds=0)
+        self.addCleanup(self.manager.close)
+
+    def test_failed_export_parks_the_ai_result(self):
+        """The HTTP service keeps a paid-for result for replay, like the CLI and daemon."""
+        with mock.patch("api_server.AIWriter") as writer:
+            writer.return_value.process_application.return_value = AI_RES
+            writer.return_value.process_staged.return_value = AI_RES
+            process = build_processor(usage=mock.Mock(), manager=self.manager)
+        with mock.patch.object(self.manager, "_publish", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                process(dict(JOB))
+        self.assertEqual([parked[0] for parked in self.manager.parked_results()], [JOB["job_hash"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
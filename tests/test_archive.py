@@ -0,0 +1,127 @@
+"""
+tests/test_archive.py
+Unit tests for the monthly archive bundles and their folder index integration.
+"""
+
+import os
+import json
+import shutil
+import zipfile
+import tempfile
+import unittest
+from unittest import mock
+from core.archive import bundle_name
+from core.folder_index import FolderIndex
+
+HASH = "3fa9c2d1" + "0" * 56
+
+
+def make_folder(base_path, job_hash=HASH, company="Acme", title="Data Engineer", date="20260105"):
+    folder = os.path.join(base_path, f"{date}-{company}-{title.replace(' ', '_')}-{job_hash[:8]}")
+    os.makedirs(folder)
+    with open(os.path.join(folder, "metadata.json"), "w", encoding="utf-8") as f:
+        json.dump({"application_meta": {"job_hash": job_hash, "status": "Rejected"},
+                   "job_info": {"company": company, "title": title}}, f)
+    for filename in ("2_tailored_resume.md", "Resume_Acme.pdf"):
+        with open(os.path.join(folder, filename), "w", encoding="utf-8") as f:
+            f.write(f"{filename} of {company}\n" * 50)
+    return folder
+
+
+class TestArchive(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base = self.tmp.name
+        self.folder = make_folder(self.base)
+        self.index = FolderIndex(self.base)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def archive(self):
+        bundle = self.index.archive.archive(HASH, self.index.entries[HASH])
+        self.index.mark_archived(HASH, bundle)
+        return bundle
+
+    def test_bundle_name(self):
+        self.assertEqual(bundle_name({"date": "20260105"}), "2026-01.zip")
+
+    def test_archive_and_lazy_extract(self):
+        bundle = self.archive()
+        self.assertEqual(bundle, "2026-01.zip")
+        self.assertFalse(os.path.exists(self.folder))
+        with zipfile.ZipFile(self.index.archive.bundle_path(bundle)) as z:
+            self.assertIn(f"_index/{HASH}.json", z.namelist())
+
+        # Still resolvable, and survives an index rebuild (read from the bundle's index)
+        self.assertEqual(self.index.resolve("acme")[0]["archive"], bundle)
+        self.assertEqual(self.index.prune(), 0)
+        os.remove(self.index.index_path)
+        index = FolderIndex(self.base)
+        self.assertEqual(index.entries[HASH]["archive"], bundle)
+        self.assertFalse(index.is_local(HASH))
+
+        path = index.ensure_local(HASH)
+        self.assertEqual(path, self.folder)
+        with open(os.path.join(path, "2_tailored_resume.md"), encoding="utf-8") as f:
+            self.assertTrue(f.read().startswith("2_tailored_resume.md of Acme"))
+        self.assertEqual(index.archive.read(index.entries[HASH], "metadata.json")[:1], b"{")
+
+    def test_rearchive(self):
+        bundle = self.archive()
+        self.index.ensure_local(HASH)
+        size = os.path.getsize(self.index.archive.bundle_path(bundle))
+
+        # Untouched extraction: folder dropped, bundle not rewritten
+        self.archive()
+        self.assertFalse(os.path.exists(self.folder))
+        self.assertEqual(os.path.getsize(self.index.archive.bundle_path(bundle)), size)
+
+        # Edited after extraction: the bundled copy is replaced, never duplicated
+        self.index.ensure_local(HASH)
+        with open(os.path.join(self.folder, "2_tailored_resume.md"), "w", encoding="utf-8") as f:
+            f.write("# Edited")
+        self.archive()
+        with zipfile.ZipFile(self.index.archive.bundle_path(bundle)) as z:
+            names = z.namelist()
+            self.assertEqual(len(names), len(set(names)))
+        shutil.rmtree(self.index.ensure_local(HASH))
+        self.index.ensure_local(HASH)
+        with open(os.path.join(self.folder, "2_tailored_resume.md"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), "# Edited")
+
+
+    def test_batch_writes_each_bundle_once(self):
+        """Several jobs of one month land in a single rewrite of the bundle, verified before folders go."""
+        other_hash = "4b00c2d1" + "1" * 56
+        other = make_folder(self.base, job_hash=other_hash, company="Globex", date="20260120")
+        index = FolderIndex(self.base)
+        index.rebuild()
+        with mock.patch("core.archive.os.replace", wraps=os.replace) as replace:
+            results = index.archive.archive_many([(h, index.entries[h]) for h in (HASH, other_hash)])
+        self.assertEqual(results, {HASH: "2026-01.zip", other_hash: "2026-01.zip"})
+        self.assertEqual(replace.call_count, 1)
+        self.assertFalse(os.path.exists(self.folder) or os.path.exists(other))
+        with zipfile.ZipFile(index.archive.bundle_path("2026-01.zip")) as z:
+            self.assertIn(f"_index/{other_hash}.json", z.namelist())
+
+    def test_failed_write_keeps_bundle_and_folder(self):
+        """A crash while appending leaves the previous bundle untouched and the folder in place."""
+        bundle = self.archive()
+        path = self.index.archive.bundle_path(bundle)
+        with open(path, "rb") as f:
+            before = f.read()
+        folder = make_folder(self.base, job_hash="4b00c2d1" + "1" * 56, company="Globex", date="20260120")
+        self.index.rebuild()
+        entry = self.index.entries["4b00c2d1" + "1" * 56]
+        with mock.patch("zipfile.ZipFile.writestr", side_effect=OSError("disk full")):
+            with self.assertRaises(IOError):
+                self.index.archive.archive("4b00c2d1" + "1" * 56, entry)
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), before)
+        self.assertTrue(os.path.isdir(folder))
+        self.assertFalse(os.path.exists(f"{path}.tmp"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+"""
+tests/test_daemon.py
+Unit tests for the daemon's polling loop (the browser session and pipeline are faked).
+"""
+
+import os
+import json
+import tempfile
+import unittest
+from unittest import mock
+from daemon import SearchDaemon
+from main import JobPipeline
+from core.job_queue import PriorityJobQueue
+
+
+class FakeSession:
+    def __init__(self, postings):
+        self.postings = postings
+
+    def scrape(self, url, skip_ids=()):
+        for job_data in self.postings:
+            if job_data["job_id"] not in skip_ids:
+                yield dict(job_data)
+
+
+class FakePipeline:
+    """Queues every posting with a description; an empty one is an incomplete scrape."""
+
+    def __init__(self):
+        self.queue = mock.Mock()
+        self.queue.push.return_value = True
+        self.queue.load_backlog.return_value = 0
+        self.writer = mock.Mock()
+        self.manager = mock.Mock()
+        self.manager.folder_index.entries = {}
+
+    def screen_outcome(self, job_data):
+        if not job_data["description"]:
+            return None, False
+        if job_data["description"] == "reject":
+            return None, True
+        return {"job_hash": job_data["job_id"]}, True
+
+    def requeue_deferred(self):
+        return 0
+
+
+class TestPoll(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.env = mock.patch.dict(os.environ, {"DAEMON_SEEN_PATH": os.path.join(self.tmp.name, "seen.json"),
+                                                "DAEMON_SCREEN_RETRIES": "2"})
+        self.env.start()
+
+    def tearDown(self):
+        self.env.stop()
+        self.tmp.cleanup()
+
+    def daemon(self, postings):
+        return SearchDaemon(config_path="unused.json", pipeline=FakePipeline(), session=FakeSession(postings))
+
+    def test_incomplete_scrape_is_retried(self):
+        """A posting whose description did not load is opened again; queued and rejected ones are not."""
+        postings = [{"job_id": "1", "description": "JD"}, {"job_id": "2", "description": ""},
+                    {"job_id": "3", "description": "reject"}]
+        daemon = self.daemon(postings)
+        self.assertEqual(daemon.poll({"url": "u"}), 1)
+        self.assertIn("1", daemon.seen)
+        self.assertIn("3", daemon.seen)
+        self.assertNotIn("2", daemon.seen)
+
+        postings[1]["description"] = "JD loaded now"
+        self.assertEqual(daemon.poll({"url": "u"}), 1)
+        self.assertIn("2", daemon.seen)
+
+    def test_gives_up_after_the_retry_limit(self):
+        daemon = self.daemon([{"job_id": "1", "description": ""}])
+        daemon.poll({"url": "u"})
+        self.assertNotIn("1", daemon.seen)
+        daemon.poll({"url": "u"})
+        self.assertIn("1", daemon.seen)
+
+
+class TestBacklog(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_queued_postings_are_saved_before_they_are_seen(self):
+        """A crash after seen.save() cannot lose a queued posting."""
+        with mock.patch.dict(os.environ, {"DAEMON_SEEN_PATH": os.path.join(self.tmp.name, "seen.json")}):
+            daemon = SearchDaemon(config_path="unused.json", pipeline=FakePipeline(),
+                                  session=FakeSession([{"job_id": "1", "description": "JD"}]))
+        order = mock.Mock()
+        daemon.pipeline.save_backlog = order.save_backlog
+        daemon.seen.save = order.seen_save
+        daemon.searches = [{"name": "s", "url": "u", "interval_minutes": 30}]
+        daemon._reload_config = lambda: None
+        daemon.pipeline.queue.__len__ = lambda _: 0
+        daemon.run_cycle()
+        self.assertEqual([c[0] for c in order.mock_calls], ["save_backlog", "seen_save"])
+
+    def pipeline(self):
+        """A JobPipeline with only the parts drain_queue() uses (generation is patched per test)."""
+        pipeline = JobPipeline.__new__(JobPipeline)
+        pipeline.queue = PriorityJobQueue(weights={}, backlog_path=os.path.join(self.tmp.name, "backlog.jsonl"),
+                                          failed_path=os.path.join(self.tmp.name, "failed.jsonl"))
+        pipeline._failed = []
+        pipeline.known_hashes = set()
+        pipeline.manager = mock.Mock()
+        pipeline.manager.is_pending.return_value = False
+        pipeline.writer = mock.Mock()
+        pipeline.writer.forecast.return_value = {"jobs_left": None}
+        return pipeline
+
+    def test_failed_generation_is_kept_then_parked(self):
+        pipeline = self.pipeline()
+        item = {"job_hash": "h1", "job_data": {"title": "DE"}, "features": {}}
+        pipeline.queue.push(item)
+        with mock.patch("main.JOB_ATTEMPTS", 2), \
+                mock.patch.object(pipeline, "generate", side_effect=RuntimeError("bad reply")):
+            self.assertTrue(pipeline.drain_queue())
+            self.assertEqual(pipeline.queue.load_backlog(), 0)  # Still queued in memory
+            self.assertTrue(os.path.exists(pipeline.queue.backlog_path))
+            self.assertTrue(pipeline.drain_queue())
+
+        self.assertFalse(os.path.exists(pipeline.queue.backlog_path))
+        with open(pipeline.queue.failed_path, encoding="utf-8") as f:
+            parked = [json.loads(line) for line in f]
+        self.assertEqual([(p["job_hash"], p["attempts"], p["error"]) for p in parked], [("h1", 2, "bad reply")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+tests/test_file_manager.py
+Unit tests for the write-behind export: parked results and the success hook.
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+from core.file_manager import JobFileManager
+from core.master_log import MasterLogWriter
+
+JOB = {"company": "Acme", "title": "Data Engineer", "description": "Build pipelines.", "url": ""}
+AI_RES = {"analysis": {"gaps": []}, "files": {"tailored_resume_md": "", "cover_letter_md": ""}}
+HASH = "ab" * 32
+
+
+class TestParkedExports(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)  # After the managers' close() (cleanups run last-in first-out)
+        self.base = os.path.join(self.tmp.name, "out")
+
+    def manager(self):
+        manager = JobFileManager(base_path=self.base, pdf_service=mock.Mock())
+        manager.master_log = MasterLogWriter(os.path.join(self.tmp.name, "log.csv"), flush_seconds=0)
+        self.addCleanup(manager.close)
+        return manager
+
+    def test_failed_export_is_parked_and_replayed(self):
+        """The AI result of a failed export comes back on the next start; success is reported only then."""
+        manager = self.manager()
+        saved = []
+        with mock.patch.object(manager, "_publish", side_effect=OSError("disk full")):
+            _, future = manager.submit(JOB, AI_RES, HASH, on_success=saved.append)
+            with self.assertRaises(OSError):
+                future.result()
+        self.assertEqual(saved, [])
+
+        restarted = self.manager()
+        self.assertEqual(restarted.parked_results(), [(HASH, JOB, AI_RES)])
+        folder, future = restarted.submit(JOB, AI_RES, HASH, on_success=saved.append)
+        self.assertEqual(future.result(), folder)
+        self.assertEqual(saved, [folder])
+        self.assertEqual(restarted.parked_results(), [])
+
+    def test_success_hook_runs_while_pending(self):
+        """Dedup bookkeeping never sees a gap between 'pending' and 'recorded'."""
+        manager = self.manager()
+        pending = []
+        _, future = manager.submit(JOB, AI_RES, HASH, on_success=lambda _: pending.append(manager.is_pending(HASH)))
+        future.result()
+        self.assertEqual(pending, [True])
+
+
+class TestPublish(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.base = os.path.join(self.tmp.name, "out")
+
+    def folder(self, name, content):
+        os.makedirs(os.path.join(self.base, name))
+        with open(os.path.join(self.base, name, "1_job_description.md"), "w", encoding="utf-8") as f:
+            f.write(content)
+
+    def read(self, name):
+        with open(os.path.join(self.base, name, "1_job_description.md"), encoding="utf-8") as f:
+            return f.read()
+
+    def test_backup_of_an_interrupted_publish_is_restored(self):
+        """A crash between the two renames of _publish leaves only the backup; it is moved back."""
+        self.folder(".old-20240101-Acme-DE-abababab", "previous export")
+        self.folder(".staging-20240101-Acme-DE-abababab", "half written")
+        self.folder(".old-20240102-Acme-DE-cdcdcdcd", "stale backup")
+        self.folder("20240102-Acme-DE-cdcdcdcd", "new export")
+        with mock.patch("builtins.print"):
+            JobFileManager(base_path=self.base, pdf_service=mock.Mock()).master_log.close()
+
+        folders = sorted(n for n in os.listdir(self.base) if not n.startswith(".folder_index"))
+        self.assertEqual(folders, ["20240101-Acme-DE-abababab", "20240102-Acme-DE-cdcdcdcd"])
+        self.assertEqual(self.read("20240101-Acme-DE-abababab"), "previous export")
+        self.assertEqual(self.read("20240102-Acme-DE-cdcdcdcd"), "new export")
+
+    def test_republish_replaces_the_folder(self):
+        self.folder(".staging-20240101-Acme-DE-abababab", "new export")
+        self.folder("20240101-Acme-DE-abababab", "previous export")
+        JobFileManager._publish(os.path.join(self.base, ".staging-20240101-Acme-DE-abababab"),
+                                os.path.join(self.base, "20240101-Acme-DE-abababab"))
+        self.assertEqual(os.listdir(self.base), ["20240101-Acme-DE-abababab"])
+        self.assertEqual(self.read("20240101-Acme-DE-abababab"), "new export")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+"""
+tests/test_folder_index.py
+Unit tests for the job folder index.
+"""
+
+import os
+import json
+import tempfile
+import unittest
+from unittest import mock
+from core.folder_index import FolderIndex, digest_documents
+
+
+def make_folder(base_path, job_hash, company, title, date="20260105"):
+    folder = os.path.join(base_path, f"{date}-{company.replace(' ', '_')}-{title.replace(' ', '_')}-{job_hash[:8]}")
+    os.makedirs(folder)
+    with open(os.path.join(folder, "metadata.json"), "w", encoding="utf-8") as f:
+        json.dump({"application_meta": {"job_hash": job_hash, "status": "Generated"},
+                   "job_info": {"company": company, "title": title}}, f)
+    with open(os.path.join(folder, "2_tailored_resume.md"), "w", encoding="utf-8") as f:
+        f.write(f"# Resume for {company}")
+    return folder
+
+
+class TestFolderIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base = self.tmp.name
+        self.acme = make_folder(self.base, "3fa9c2d1" + "0" * 56, "Acme Corp", "Data Engineer")
+        self.globex = make_folder(self.base, "3fb00000" + "1" * 56, "Globex", "Senior Data Analyst", "20260210")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_rebuild_when_missing(self):
+        index = FolderIndex(self.base)
+        self.assertEqual(len(index.entries), 2)
+        self.assertTrue(os.path.exists(index.index_path))
+        entry = index.resolve("3fa9")[0]
+        self.assertEqual(entry["path"], self.acme)
+        self.assertEqual(entry["date"], "20260105")
+        self.assertIn("2_tailored_resume.md", entry["documents"])
+
+        # A second instance loads the file instead of walking the folders
+        self.assertEqual(FolderIndex(self.base).entries, index.entries)
+
+    def test_resolve(self):
+        index = FolderIndex(self.base)
+        self.assertEqual(len(index.resolve("3f")), 0)  # Too short for a hash, no such word
+        self.assertEqual(len(index.by_prefix("3f")), 2)
+        self.assertEqual([e["company"] for e in index.resolve("data")], ["Acme Corp", "Globex"])
+        self.assertEqual([e["company"] for e in index.resolve("acme engineer")], ["Acme Corp"])
+        self.assertEqual(index.resolve(self.globex)[0]["company"], "Globex")
+        self.assertEqual(index.resolve("Initech"), [])
+
+    def test_update_and_sync(self):
+        index = FolderIndex(self.base)
+        job_hash = "3fa9c2d1" + "0" * 56
+        before = index.entries[job_hash]["documents"]["2_tailored_resume.md"]
+        with open(os.path.join(self.acme, "2_tailored_resume.md"), "w", encoding="utf-8") as f:
+            f.write("# Edited")
+        entry = index.update(job_hash, self.acme, synced=True)
+        self.assertNotEqual(entry["documents"]["2_tailored_resume.md"], before)
+        self.assertEqual(entry["company"], "Acme Corp")
+        self.assertIsNotNone(entry["synced_at"])
+
+        # Renaming the company moves the word lookups with it
+        index.update(job_hash, self.acme, company="Initech")
+        self.assertEqual(index.resolve("acme"), [])
+        self.assertEqual(len(index.resolve("initech")), 1)
+
+    def test_prune(self):
+        index = FolderIndex(self.base)
+        os.remove(os.path.join(self.globex, "metadata.json"))
+        os.remove(os.path.join(self.globex, "2_tailored_resume.md"))
+        os.rmdir(self.globex)
+        self.assertEqual(index.prune(), 1)
+        self.assertEqual(len(FolderIndex(self.base).entries), 1)
+
+    def test_concurrent_writers_merge(self):
+        """Two processes saving their own changes keep each other's fields (archive, sync time)."""
+        job_hash = "3fa9c2d1" + "0" * 56
+        archiver, syncer = FolderIndex(self.base), FolderIndex(self.base)
+        archiver.mark_archived(job_hash, "2026-01.zip")
+        syncer.update(job_hash, self.acme, status="Applied", synced=True)
+
+        merged = FolderIndex(self.base).entries[job_hash]
+        self.assertEqual(merged["archive"], "2026-01.zip")
+        self.assertEqual(merged["status"], "Applied")
+        self.assertIsNotNone(merged["synced_at"])
+        self.assertEqual(syncer.entries[job_hash]["archive"], "2026-01.zip")
+
+    def test_save_appends_and_compacts(self):
+        """A save appends to the journal instead of rewriting the snapshot, which is refreshed once it grows."""
+        index = FolderIndex(self.base)
+        stale = FolderIndex(self.base)
+        job_hash = "3fb00000" + "1" * 56
+        with open(index.index_path, "rb") as f:
+            snapshot = f.read()
+        index.update(job_hash, self.globex, status="Applied")
+        with open(index.index_path, "rb") as f:
+            self.assertEqual(f.read(), snapshot)
+
+        with mock.patch("core.folder_index.COMPACT_LINES", 3):
+            for status in ("Interview", "Offer", "Rejected"):
+                index.update(job_hash, self.globex, status=status)
+        with open(index.index_path, encoding="utf-8") as f:
+            self.assertEqual(json.load(f)[job_hash]["status"], "Rejected")
+        with open(index.journal_path, encoding="utf-8") as f:
+            self.assertEqual(len(f.readlines()), 1)  # Only the new generation header
+
+        # An instance loaded before the compaction picks up the new snapshot on its next save
+        stale.update("3fa9c2d1" + "0" * 56, self.acme, synced=True)
+        self.assertEqual(stale.entries[job_hash]["status"], "Rejected")
+        self.assertEqual(FolderIndex(self.base).entries[job_hash]["status"], "Rejected")
+
+    def test_digest_documents(self):
+        self.assertEqual(set(digest_documents(self.acme)), {"2_tailored_resume.md"})
+        self.assertEqual(digest_documents(os.path.join(self.base, "missing")), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+"""
+tests/test_history_snapshot.py
+Unit tests for the incremental Master CSV reader behind the query snapshot.
+"""
+
+import os
+import csv
+import tempfile
+import unittest
+from core.history_snapshot import read_new_rows, SNAPSHOT_COLUMNS
+
+FIELDS = ["job_hash", "date_generated", "company", "title", "work_model", "tailored_score",
+          "resume_content_md", "status", "applied_date"]
+
+
+def row(job_hash, score="8", blob="# Resume\n\nLine, with \"quotes\""):
+    return {"job_hash": job_hash, "date_generated": "2026-01-05T10:00:00", "company": "Acme",
+            "title": "Data Engineer", "work_model": "Remote", "tailored_score": score,
+            "resume_content_md": blob, "status": "Generated", "applied_date": ""}
+
+
+class TestReadNewRows(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "log.csv")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, rows, mode="a"):
+        exists = os.path.exists(self.path) and mode == "a"
+        with open(self.path, mode, newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            if not exists:
+                writer.writeheader()
+            writer.writerows(rows)
+
+    def test_narrow_columns_and_types(self):
+        self.write([row("a"), row("b", score="")])
+        rows, state, rebuilt = read_new_rows(self.path)
+        self.assertTrue(rebuilt)
+        self.assertEqual(list(rows[0]), SNAPSHOT_COLUMNS)
+        self.assertEqual(rows[0]["tailored_score"], 8.0)
+        self.assertIsNone(rows[1]["tailored_score"])
+        self.assertIsNone(rows[0]["applied_date"])
+        self.assertEqual(state["offset"], os.path.getsize(self.path))
+
+    def test_incremental_append(self):
+        self.write([row("a")])
+        _, state, _ = read_new_rows(self.path)
+        self.write([row("b"), row("c")])
+        rows, state, rebuilt = read_new_rows(self.path, state)
+        self.assertFalse(rebuilt)
+        self.assertEqual([r["job_hash"] for r in rows], ["b", "c"])
+
+        rows, same_state, rebuilt = read_new_rows(self.path, state)
+        self.assertEqual((rows, rebuilt, same_state), ([], False, state))
+
+    def test_rewrite_triggers_rebuild(self):
+        """A file rewritten in place (e.g. status edited by sync_utils) is read again from the start."""
+        self.write([row("a"), row("b")])
+        _, state, _ = read_new_rows(self.path)
+        edited = row("a")
+        edited["status"] = "Applied"
+        self.write([edited, row("b")], mode="w")
+        rows, _, rebuilt = read_new_rows(self.path, state)
+        self.assertTrue(rebuilt)
+        self.assertEqual([r["status"] for r in rows], ["Applied", "Generated"])
+
+    def test_half_written_row_waits(self):
+        self.write([row("a")])
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("b,2026-01-06")
+        rows, state, _ = read_new_rows(self.path)
+        self.assertEqual([r["job_hash"] for r in rows], ["a"])
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(",Acme,Analyst,Hybrid,7,,Generated,\r\n")
+        rows, _, rebuilt = read_new_rows(self.path, state)
+        self.assertFalse(rebuilt)
+        self.assertEqual([(r["job_hash"], r["tailored_score"]) for r in rows], [("b", 7.0)])
+
+    def test_half_written_multiline_cell_waits(self):
+        """A record cut right after a newline inside a quoted blob is not parsed until it is complete."""
+        self.write([row("a")])
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write('b,2026-01-06,Acme,Analyst,Hybrid,7,"# Resume\n\nHalf, ""written""\n')
+        rows, state, _ = read_new_rows(self.path)
+        self.assertEqual([r["job_hash"] for r in rows], ["a"])
+
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write('- more lines\n",Generated,\r\n')
+        self.write([row("c")])
+        rows, _, rebuilt = read_new_rows(self.path, state)
+        self.assertFalse(rebuilt)
+        self.assertEqual([(r["job_hash"], r["status"]) for r in rows], [("b", "Generated"), ("c", "Generated")])
+
+    def test_missing_file(self):
+        self.assertEqual(read_new_rows(os.path.join(self.tmp.name, "nope.csv"))[0], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
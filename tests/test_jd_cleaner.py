@@ -0,0 +1,66 @@
+"""
+tests/test_jd_cleaner.py
+Unit tests for the job description normalisation stage.
+"""
+
+import unittest
+from core.jd_cleaner import JDNormalizer
+from scrapers.linkedin_manual import LinkedInScraper as SampleJob
+
+
+class TestJDNormalizer(unittest.TestCase):
+    def setUp(self):
+        """Real LinkedIn pane text with UI chrome."""
+        self.raw = SampleJob().get_job_data(None)["description"]
+
+    def test_removes_linkedin_chrome(self):
+        """Buttons, upsells and the hiring-team card are removed."""
+        clean, _ = JDNormalizer(strip_legal=False).normalize(self.raw)
+        for chrome in ["Show match details", "Reactivate Premium", "Kacey Aumack",
+                       "Tailor my resume", "Reposted 4 days ago", "\nApply\n"]:
+            self.assertNotIn(chrome, clean)
+
+    def test_keeps_job_content(self):
+        """Requirements, location and pay range survive."""
+        clean, _ = JDNormalizer(strip_legal=False).normalize(self.raw)
+        for content in ["Toronto, ON (Remote)", "Snowflake strongly preferred", "$133,000—$166,000 CAD"]:
+            self.assertIn(content, clean)
+
+    def test_legal_boilerplate_is_optional(self):
+        """EEO paragraphs are only removed when strip_legal is enabled."""
+        kept, _ = JDNormalizer(strip_legal=False).normalize(self.raw)
+        stripped, _ = JDNormalizer(strip_legal=True).normalize(self.raw)
+        self.assertIn("Equal Opportunity", kept)
+        self.assertNotIn("Equal Opportunity", stripped)
+
+    def test_reports_tokens_saved(self):
+        """The report reflects the size reduction."""
+        clean, report = JDNormalizer(strip_legal=True).normalize(self.raw)
+        self.assertGreater(report["tokens_saved"], 0)
+        self.assertEqual(report["tokens_before"] - report["tokens_after"], report["tokens_saved"])
+
+    def test_dedup_only_in_header_and_footer(self):
+        """Repeated title lines in the header go; repeated bullets and labels in the body stay."""
+        raw = "\n".join([
+            "Data Engineer", "Acme · Toronto, ON", "Apply", "Data Engineer", "Acme · Toronto, ON",
+            "About the job",
+            "Responsibilities", "- Own the pipelines", "- Write tests",
+            "Nice to have", "- Write tests", "Responsibilities",
+            "Benefits", "- Dental", "- Remote", "- Stock", "- Gym", "- Learning budget",
+            "Data Engineer", "Acme · Toronto, ON",
+        ])
+        clean, _ = JDNormalizer(strip_legal=False).normalize(raw)
+        self.assertEqual(clean.count("Data Engineer"), 1)
+        self.assertEqual(clean.count("Acme · Toronto, ON"), 1)
+        self.assertEqual(clean.count("- Write tests"), 2)
+        self.assertEqual(clean.count("Responsibilities"), 2)
+
+    def test_blank_input(self):
+        """Empty descriptions do not crash."""
+        clean, report = JDNormalizer().normalize(None)
+        self.assertEqual(clean, "")
+        self.assertEqual(report["tokens_saved"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+"""
+tests/test_job_queue.py
+Unit tests for the priority-ordered AI work queue.
+"""
+
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from core.job_queue import PriorityJobQueue, parse_weights, estimate_posted_at
+
+
+def make_item(job_hash, similarity, posted_at=None, has_salary=False):
+    return {"job_hash": job_hash, "features": {"similarity": similarity, "posted_at": posted_at,
+                                               "has_salary": has_salary}}
+
+
+class TestPriorityJobQueue(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.queue = PriorityJobQueue(weights=parse_weights(""),
+                                      backlog_path=os.path.join(self.tmp.name, "backlog.jsonl"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_best_match_first(self):
+        """Higher similarity is generated first; ties keep arrival order."""
+        self.queue.push(make_item("low", 3))
+        self.queue.push(make_item("high", 9))
+        self.queue.push(make_item("mid-a", 6))
+        self.queue.push(make_item("mid-b", 6))
+        self.assertEqual([self.queue.pop()["job_hash"] for _ in range(4)], ["high", "mid-a", "mid-b", "low"])
+
+    def test_custom_weights(self):
+        """With salary weighted heavily, a listed salary beats similarity."""
+        queue = PriorityJobQueue(weights=parse_weights("similarity=0.1,recency=0,salary=0.9"))
+        queue.push(make_item("similar", 9))
+        queue.push(make_item("paid", 5, has_salary=True))
+        self.assertEqual(queue.pop()["job_hash"], "paid")
+
+    def test_recency(self):
+        """A fresh posting outranks an old one at equal similarity."""
+        self.queue.push(make_item("old", 7, posted_at="2020-01-01T00:00:00"))
+        self.queue.push(make_item("new", 7, posted_at=datetime.now().isoformat()))
+        self.assertEqual(self.queue.pop()["job_hash"], "new")
+
+    def test_duplicates_are_ignored(self):
+        self.assertTrue(self.queue.push(make_item("same", 5)))
+        self.assertFalse(self.queue.push(make_item("same", 5)))
+        self.assertEqual(len(self.queue), 1)
+
+    def test_backlog_roundtrip(self):
+        """Leftover jobs survive to the next run in priority order."""
+        self.queue.push(make_item("a", 4))
+        self.queue.push(make_item("b", 8))
+        self.assertEqual(self.queue.save_backlog(), 2)
+
+        next_run = PriorityJobQueue(weights=parse_weights(""), backlog_path=self.queue.backlog_path)
+        self.assertEqual(next_run.load_backlog(), 2)
+        self.assertEqual(next_run.pop()["job_hash"], "b")
+        # Kept until the run saves its own backlog or drains the queue (a crash must not lose it)
+        self.assertTrue(os.path.exists(self.queue.backlog_path))
+        next_run.clear_backlog()
+        self.assertFalse(os.path.exists(self.queue.backlog_path))
+
+    def test_posted_at_parsing(self):
+        scraped = datetime(2026, 3, 10, 12, 0)
+        self.assertEqual(estimate_posted_at("Toronto · Reposted 4 days ago · Over 100", scraped), "2026-03-06T12:00:00")
+        self.assertIsNone(estimate_posted_at("No date here", scraped))
+
+
+if __name__ == "__main__":
+    unittest.main()
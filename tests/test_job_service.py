@@ -0,0 +1,213 @@
+"""
+tests/test_job_service.py
+Unit tests for the job submission service and its HTTP handler.
+"""
+
+import os
+import json
+import http.client
+import time
+import tempfile
+import threading
+import unittest
+import urllib.request
+import urllib.error
+from core.job_service import JobService, create_server, DONE, FAILED, QUEUED, ALREADY_PROCESSED
+from core.utils import generate_job_hash
+
+JOB = {"company": "Acme", "title": "Data Engineer", "description": "Build pipelines in Python.", "url": "https://x"}
+
+
+class Paused(Exception):
+    pass
+
+
+def wait_for(service, job_id, statuses, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        record = service.get(job_id)
+        if record["status"] in statuses:
+            return record
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} stuck in {service.get(job_id)['status']}")
+
+
+class TestJobService(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.backlog = os.path.join(self.tmp.name, "api_backlog.jsonl")
+
+    def make_service(self, process, workers=2, **kwargs):
+        service = JobService(lambda: process, workers=workers, backlog_path=self.backlog, **kwargs)
+        service.start()
+        self.addCleanup(service.shutdown)
+        return service
+
+    def test_submit_process_and_dedup(self):
+        calls = []
+
+        def process(job):
+            calls.append(job)
+            return {"folder": f"zzz_output/{job['job_hash'][:8]}"}
+
+        service = self.make_service(process)
+        record, created = service.submit(JOB)
+        self.assertTrue(created)
+        self.assertEqual(record["job_hash"], generate_job_hash(JOB["company"], JOB["title"], JOB["description"]))
+        done = wait_for(service, record["id"], (DONE,))
+        self.assertEqual(done["result"]["folder"], f"zzz_output/{record['job_hash'][:8]}")
+
+        again, created = service.submit(dict(JOB))
+        self.assertFalse(created)
+        self.assertEqual(again["id"], record["id"])
+        self.assertEqual(len(calls), 1)
+
+    def test_known_hash_and_validation(self):
+        known = {generate_job_hash(JOB["company"], JOB["title"], JOB["description"])}
+        service = self.make_service(lambda job: {}, known_hashes=known)
+        record, created = service.submit(JOB)
+        self.assertEqual((record["status"], created), (ALREADY_PROCESSED, False))
+        with self.assertRaises(ValueError):
+            service.submit({"company": "Acme", "title": " "})
+
+    def test_failure_then_resubmit(self):
+        attempts = []
+
+        def process(job):
+            attempts.append(job)
+            if len(attempts) == 1:
+                raise RuntimeError("boom")
+            return {}
+
+        service = self.make_service(process)
+        record, _ = service.submit(JOB)
+        self.assertEqual(wait_for(service, record["id"], (FAILED,))["error"], "boom")
+        record, created = service.submit(JOB)
+        self.assertTrue(created)
+        wait_for(service, record["id"], (DONE,))
+
+    def test_retryable_errors_requeue(self):
+        attempts = []
+
+        def process(job):
+            attempts.append(job)
+            if len(attempts) == 1:
+                raise Paused("quota")
+            return {}
+
+        service = self.make_service(process, retryable=(Paused,), retry_pause=0)
+        record, _ = service.submit(JOB)
+        self.assertEqual(wait_for(service, record["id"], (DONE,))["attempts"], 2)
+
+    def test_paused_job_does_not_block_the_worker(self):
+        """A job waiting out its retry pause lets the only worker take the next one."""
+        def process(job):
+            if job["title"] == "Data Engineer":
+                raise Paused("quota")
+            return {}
+
+        service = self.make_service(process, workers=1, retryable=(Paused,), retry_pause=60)
+        paused, _ = service.submit(JOB)
+        wait_for(service, paused["id"], (QUEUED,))
+        other, _ = service.submit(dict(JOB, title="Analytics Engineer"))
+        wait_for(service, other["id"], (DONE,), timeout=2)
+        self.assertIsNotNone(service.get(paused["id"])["retry_at"])
+
+    def test_unfinished_jobs_survive_a_restart(self):
+        """Accepted jobs still queued at shutdown are processed by the next service."""
+        release = threading.Event()
+        first = JobService(lambda: (lambda job: release.wait(5) and {}), workers=1, backlog_path=self.backlog)
+        first.start()
+        running, _ = first.submit(JOB)
+        queued, _ = first.submit(dict(JOB, title="Analytics Engineer"))
+        wait_for(first, running["id"], ("running",))
+        first.shutdown(wait=False)  # Stop before the worker can take the queued job
+        release.set()
+        first.shutdown()
+        self.assertEqual(first.get(running["id"])["status"], DONE)
+
+        done = []
+        second = self.make_service(lambda job: done.append(job["title"]) or {})
+        self.assertEqual(wait_for(second, queued["id"], (DONE,))["job_hash"], queued["job_hash"])
+        self.assertEqual(done, ["Analytics Engineer"])
+        self.assertFalse(os.path.exists(self.backlog))
+
+    def test_concurrent_workers(self):
+        gate = threading.Barrier(2, timeout=5)
+
+        def process(job):
+            gate.wait()  # Both jobs must be running at the same time
+            return {}
+
+        service = self.make_service(process)
+        first, _ = service.submit(JOB)
+        second, _ = service.submit(dict(JOB, title="Analytics Engineer"))
+        wait_for(service, first["id"], (DONE,))
+        wait_for(service, second["id"], (DONE,))
+
+
+class TestHTTPAPI(unittest.TestCase):
+    def setUp(self):
+        release = threading.Event()
+        self.release = release
+        self.tmp = tempfile.TemporaryDirectory()
+        self.service = JobService(lambda: (lambda job: release.wait(5) and {"folder": "f"}), workers=1,
+                                  backlog_path=os.path.join(self.tmp.name, "api_backlog.jsonl"))
+        self.service.start()
+        self.server = create_server(self.service, host="127.0.0.1", port=0, token="secret")
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.release.set()
+        self.server.shutdown()
+        self.server.server_close()
+        self.service.shutdown()
+        self.tmp.cleanup()
+
+    def request(self, method, path, body=None, token="secret"):
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        req = urllib.request.Request(self.base + path, data=data, method=method)
+        if token:
+            req.add_header("Authorization", f"Bearer {token}")
+        try:
+            with urllib.request.urlopen(req) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read())
+
+    def test_post_and_poll(self):
+        status, body = self.request("POST", "/jobs", JOB)
+        self.assertEqual(status, 202)
+        self.assertIn(body["status"], (QUEUED, "running"))
+
+        status, again = self.request("POST", "/jobs", JOB)
+        self.assertEqual((status, again["id"], again["duplicate"]), (200, body["id"], True))
+
+        self.release.set()
+        wait_for(self.service, body["id"], (DONE,))
+        status, record = self.request("GET", f"/jobs/{body['id']}")
+        self.assertEqual((status, record["result"]), (200, {"folder": "f"}))
+        self.assertEqual(self.request("GET", "/health")[1]["jobs"], {DONE: 1})
+
+    def test_errors(self):
+        self.assertEqual(self.request("POST", "/jobs", {"title": "x"})[0], 400)
+        self.assertEqual(self.request("GET", "/jobs/unknown")[0], 404)
+        self.assertEqual(self.request("GET", "/jobs", token=None)[0], 401)
+
+    def test_invalid_content_length(self):
+        """A malformed header gets a JSON 400, not a dropped connection."""
+        conn = http.client.HTTPConnection("127.0.0.1", self.server.server_address[1], timeout=5)
+        self.addCleanup(conn.close)
+        conn.putrequest("POST", "/jobs")
+        conn.putheader("Authorization", "Bearer secret")
+        conn.putheader("Content-Length", "abc")
+        conn.endheaders()
+        response = conn.getresponse()
+        self.assertEqual(response.status, 400)
+        self.assertEqual(json.loads(response.read()), {"error": "Invalid Content-Length header."})
+
+
+if __name__ == "__main__":
+    unittest.main()
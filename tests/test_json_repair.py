@@ -0,0 +1,114 @@
+"""
+tests/test_json_repair.py
+Unit tests for local JSON repair and the output schema validation.
+"""
+
+import json
+import unittest
+from ai.json_repair import repair_json, drop_paths
+from ai.schema import validate_result, followup_template, merge_sections
+
+
+def sample_reply():
+    return {
+        "metadata": {"salary": "$133,000—$166,000 CAD"},
+        "scores": {"original": 6, "tailored": 9},
+        "analysis": {"fit_report": "Good fit", "gaps": ["Snowflake", "dbt"], "mitigation_strategy": "Courses"},
+        "files": {"tailored_resume_md": "# Resume", "cover_letter_md": "Dear team,"}
+    }
+
+
+class TestRepairJSON(unittest.TestCase):
+    def setUp(self):
+        self.text = json.dumps(sample_reply(), indent=4, ensure_ascii=False)
+
+    def test_clean_reply(self):
+        self.assertEqual(repair_json(self.text), (sample_reply(), [], []))
+
+    def test_fences_and_trailing_text(self):
+        """Code fences and chatter around the object are dropped."""
+        value, fixes, _ = repair_json("```json\n" + self.text + "\n```")
+        self.assertEqual(value, sample_reply())
+        self.assertEqual(fixes, ["stray fences"])
+
+        value, fixes, _ = repair_json("Here it is:\n" + self.text + "\nLet me know!")
+        self.assertEqual(value, sample_reply())
+        self.assertEqual(fixes, ["leading text", "trailing text"])
+
+    def test_unterminated_string(self):
+        """A reply cut inside the cover letter keeps everything before it and reports the cut field."""
+        cut = self.text.index("Dear team") + 4
+        value, fixes, cut_paths = repair_json(self.text[:cut])
+        self.assertEqual(value["files"]["cover_letter_md"], "Dear")
+        self.assertEqual(value["scores"], {"original": 6, "tailored": 9})
+        self.assertEqual(fixes, ["unterminated string"])
+        self.assertEqual(cut_paths, [("files", "cover_letter_md")])
+
+        # The half-written letter must not pass validation: only it is requested again
+        drop_paths(value, cut_paths)
+        self.assertEqual(validate_result(value), {"files": ["cover_letter_md"]})
+
+    def test_truncated_array(self):
+        """Open arrays/objects are closed, dropping a half-written element."""
+        cut = self.text.index('"dbt"') + 2
+        value, _, cut_paths = repair_json(self.text[:cut])
+        self.assertEqual(value["analysis"]["gaps"][0], "Snowflake")
+        self.assertEqual(cut_paths, [("analysis", "gaps", 1)])
+        self.assertEqual(validate_result(drop_paths(value, cut_paths)), {
+            "analysis": ["gaps", "mitigation_strategy"], "files": ["tailored_resume_md", "cover_letter_md"]})
+
+        cut = self.text.index('"mitigation_strategy"') + 10
+        value, fixes, cut_paths = repair_json(self.text[:cut])
+        self.assertEqual(value["analysis"], {"fit_report": "Good fit", "gaps": ["Snowflake", "dbt"]})
+        self.assertEqual(fixes, ["truncated structure (last element dropped)"])
+        self.assertEqual(cut_paths, [])
+
+    def test_cut_number_is_reported(self):
+        text = '{"scores": {"original": 6, "tailored": 1'
+        value, _, cut_paths = repair_json(text)
+        self.assertEqual(cut_paths, [("scores", "tailored")])
+        self.assertEqual(drop_paths(value, cut_paths), {"scores": {"original": 6}})
+
+    def test_unrecoverable(self):
+        with self.assertRaises(ValueError):
+            repair_json("I cannot help with that.")
+
+
+class TestValidateResult(unittest.TestCase):
+    def test_valid_reply(self):
+        self.assertEqual(validate_result(sample_reply()), {})
+
+    def test_coercion(self):
+        """Clear intents are fixed in place instead of triggering a follow-up."""
+        reply = sample_reply()
+        reply["scores"]["tailored"] = "8.5/10"
+        reply["analysis"]["gaps"] = "Snowflake | dbt"
+        reply["metadata"] = None
+        self.assertEqual(validate_result(reply), {})
+        self.assertEqual(reply["scores"]["tailored"], 8.5)
+        self.assertEqual(reply["analysis"]["gaps"], ["Snowflake", "dbt"])
+        self.assertEqual(reply["metadata"], {})
+
+    def test_followup_only_for_missing_parts(self):
+        """Truncated replies produce a follow-up template with just the missing fields."""
+        reply = sample_reply()
+        reply["files"]["cover_letter_md"] = " "
+        del reply["analysis"]["mitigation_strategy"]
+        problems = validate_result(reply)
+        self.assertEqual(problems, {"analysis": ["mitigation_strategy"], "files": ["cover_letter_md"]})
+        self.assertEqual(json.loads(followup_template(problems)),
+                         {"analysis": {"mitigation_strategy": ""}, "files": {"cover_letter_md": ""}})
+
+        merge_sections(reply, {"analysis": {"mitigation_strategy": "Courses", "gaps": []},
+                               "files": {"cover_letter_md": "Dear team,"}}, problems)
+        self.assertEqual(validate_result(reply), {})
+        self.assertEqual(reply["analysis"]["gaps"], ["Snowflake", "dbt"])
+
+    def test_partial_requirements(self):
+        """Staged calls only check their own fields."""
+        analysis = {"scores": {"original": 4}, "analysis": sample_reply()["analysis"]}
+        self.assertEqual(validate_result(analysis, {"scores": ["original"], "analysis": ["gaps"]}), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
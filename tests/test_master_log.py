@@ -0,0 +1,82 @@
+"""
+tests/test_master_log.py
+Unit tests for the batched Master CSV writer.
+"""
+
+import os
+import csv
+import time
+import tempfile
+import unittest
+from unittest import mock
+from core.master_log import MasterLogWriter
+
+
+def row(job_hash):
+    return {"job_hash": job_hash, "company": "Acme", "title": "Data Engineer", "notes": "line 1\nline 2"}
+
+
+class TestMasterLogWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "log.csv")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read(self):
+        with open(self.path, newline="", encoding="utf-8") as f:
+            return list(csv.DictReader(f))
+
+    def test_batches_by_row_count(self):
+        log = MasterLogWriter(self.path, flush_rows=3, flush_seconds=0)
+        log.append(row("a"))
+        log.append(row("b"))
+        self.assertFalse(os.path.exists(self.path))
+        self.assertEqual(log.pending_hashes(), {"a", "b"})
+
+        log.append(row("c"))
+        self.assertEqual([r["job_hash"] for r in self.read()], ["a", "b", "c"])
+        self.assertEqual((log.flushes, log.pending_hashes()), (1, set()))
+
+        # Later flushes append without a second header
+        log.append(row("d"))
+        log.close()
+        rows = self.read()
+        self.assertEqual([r["job_hash"] for r in rows], ["a", "b", "c", "d"])
+        self.assertEqual(rows[0]["notes"], "line 1\nline 2")
+
+    def test_timer_flush(self):
+        log = MasterLogWriter(self.path, flush_rows=100, flush_seconds=0.05)
+        log.append(row("a"))
+        deadline = time.time() + 5
+        while not os.path.exists(self.path) and time.time() < deadline:
+            time.sleep(0.01)
+        log.close()
+        self.assertEqual([r["job_hash"] for r in self.read()], ["a"])
+
+    def test_timer_survives_a_failed_flush(self):
+        """A disk error keeps the rows buffered and the timer alive for the next attempt."""
+        self.path = os.path.join(self.tmp.name, "missing", "log.csv")
+        log = MasterLogWriter(self.path, flush_rows=100, flush_seconds=0.05)
+        with mock.patch("builtins.print"):
+            log.append(row("a"))
+            time.sleep(0.2)
+            self.assertEqual(log.pending_hashes(), {"a"})
+            os.makedirs(os.path.dirname(self.path))
+            deadline = time.time() + 5
+            while log.pending_hashes() and time.time() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(log.pending_hashes(), set())
+            log.close()
+        self.assertEqual([r["job_hash"] for r in self.read()], ["a"])
+
+    def test_close_flushes(self):
+        log = MasterLogWriter(self.path, flush_rows=100, flush_seconds=60)
+        log.append(row("a"))
+        self.assertEqual(log.close(), 1)
+        self.assertEqual(len(self.read()), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+"""
+tests/test_metadata_extractor.py
+Unit tests for the local regex/heuristic metadata extractor.
+"""
+
+import unittest
+from core.metadata_extractor import MetadataExtractor
+from scrapers.linkedin_manual import LinkedInScraper as SampleJob
+
+
+class TestMetadataExtractor(unittest.TestCase):
+    def setUp(self):
+        self.extractor = MetadataExtractor(min_confidence=0.8)
+        self.sample = SampleJob().get_job_data(None)["description"]
+
+    def test_linkedin_sample(self):
+        """Salary, country and work model are found with high confidence."""
+        found = self.extractor.extract(self.sample)
+        self.assertEqual(found["salary"]["value"], "$133,000—$166,000 CAD")
+        self.assertEqual(found["country"]["value"], "Canada")
+        self.assertEqual(found["work_model"]["value"], "Remote")
+        known = self.extractor.confident_values(found)
+        self.assertEqual(set(known), {"salary", "country", "work_model"})
+
+    def test_experience_ranges_are_not_salaries(self):
+        """'3-5 years' must not be read as a pay range."""
+        found = self.extractor.extract("We need 3-5 years of Python and 2 to 4 years of SQL.")
+        self.assertNotIn("salary", found)
+
+    def test_funding_and_revenue_are_not_salaries(self):
+        """Company figures in the 'About us' blurb must not reach the AI as the job's pay."""
+        for text in ("Acme is a fintech with $20-30 million in annual revenue.",
+                     "We raised $20 - $30M last year.",
+                     "Series B: USD 40-50 backed by top investors."):
+            self.assertNotIn("salary", self.extractor.extract(text), text)
+        found = self.extractor.extract("We raised $20-30 million in 2023. Salary: $120,000 - $140,000 per year.")
+        self.assertEqual(found["salary"]["value"], "$120,000 - $140,000 per year")
+
+    def test_hourly_rate_and_apply_email(self):
+        """Hourly ranges and apply-by-email instructions."""
+        found = self.extractor.extract("Pay: $45 - $60 per hour.\nTo apply, send your CV to jobs@acme.io.")
+        self.assertEqual(found["salary"]["value"], "$45 - $60 per hour")
+        self.assertEqual(found["apply_instructions"]["value"], "Send application to jobs@acme.io")
+
+    def test_benefits_need_specific_wording(self):
+        """'Bonus Points' or 'Equity Partners' are not benefits."""
+        self.assertNotIn("benefits", self.extractor.extract(self.sample))
+        found = self.extractor.extract("We offer medical and dental coverage, a 401(k) match and stock options.")
+        self.assertEqual(found["benefits"]["value"], "401(k), Health, Dental, Equity")
+
+    def test_low_confidence_fields_go_to_the_ai(self):
+        """Weak signals are reported but not trusted."""
+        found = self.extractor.extract("Our team works remote-first across time zones.")
+        self.assertIn("work_model", found)
+        self.assertEqual(self.extractor.confident_values(found), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
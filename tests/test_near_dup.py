@@ -0,0 +1,87 @@
+"""
+tests/test_near_dup.py
+Unit tests for the SimHash near-duplicate index.
+"""
+
+import os
+import time
+import tempfile
+import unittest
+from unittest import mock
+from core.near_dup import NearDuplicateIndex, simhash, hamming_distance
+from scrapers.linkedin_manual import LinkedInScraper as SampleJob
+
+
+class TestNearDuplicateIndex(unittest.TestCase):
+    def setUp(self):
+        """Real LinkedIn sample plus a temporary index file."""
+        self.job = SampleJob().get_job_data(None)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.index_path = os.path.join(self.tmp.name, "index.json")
+        self.index = NearDuplicateIndex(index_path=self.index_path, max_distance=3, action="skip")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_repost_noise_is_ignored(self):
+        """Repost date and applicant count lines do not change the fingerprint."""
+        repost = self.job["description"].replace("Reposted 4 days ago", "Reposted 2 weeks ago") \
+                                        .replace("Over 100 people clicked apply", "Over 300 people clicked apply")
+        self.assertEqual(simhash(self.job["description"]), simhash(repost))
+
+    def test_small_edit_is_near_duplicate(self):
+        """One edited sentence stays within the threshold."""
+        edited = self.job["description"].replace(
+            "Excellent written and verbal communication", "Outstanding written communication")
+        self.index.add("a" * 64, self.job["description"], "CircleCI", "Senior Data Engineer", "folder_a")
+        match = self.index.find_similar(edited)
+        self.assertIsNotNone(match)
+        self.assertEqual(match["folder"], "folder_a")
+
+    def test_different_job_is_not_matched(self):
+        """An unrelated description is far away."""
+        self.index.add("a" * 64, self.job["description"], "CircleCI", "Senior Data Engineer", "folder_a")
+        other = "We are hiring a pastry chef to bake croissants and manage the morning shift in Lyon."
+        self.assertIsNone(self.index.find_similar(other))
+        self.assertGreater(hamming_distance(simhash(other), simhash(self.job["description"])), 3)
+
+    def test_index_persists(self):
+        """Entries survive a reload from disk."""
+        self.index.add("b" * 64, self.job["description"], "CircleCI", "Senior Data Engineer", "folder_b")
+        reloaded = NearDuplicateIndex(index_path=self.index_path, max_distance=3)
+        self.assertEqual(reloaded.find_similar(self.job["description"])["job_hash"], "b" * 64)
+
+    def test_add_appends_to_the_journal(self):
+        """Indexing a job appends one line instead of rewriting the snapshot; writers merge."""
+        self.index.add("b" * 64, self.job["description"], "CircleCI", "Senior Data Engineer", "folder_b")
+        other = NearDuplicateIndex(index_path=self.index_path, max_distance=3)
+        other.add("c" * 64, "We are hiring a pastry chef in Lyon.", "Boulangerie", "Chef", "folder_c")
+        self.assertFalse(os.path.exists(self.index_path))
+        with open(self.index.journal_path, encoding="utf-8") as f:
+            self.assertEqual(len(f.readlines()), 2)
+
+        self.index.save()  # Compaction keeps the other writer's entry
+        self.assertFalse(os.path.exists(self.index.journal_path))
+        reloaded = NearDuplicateIndex(index_path=self.index_path, max_distance=3)
+        self.assertEqual(set(reloaded.entries), {"b" * 64, "c" * 64})
+
+    def test_journal_is_compacted(self):
+        with mock.patch("core.near_dup.COMPACT_LINES", 2):
+            for i in range(3):
+                self.index.add(f"{i:064x}", f"job {i} description text", "Acme", "DE", None)
+        self.assertFalse(os.path.exists(self.index.journal_path))
+        self.assertEqual(len(NearDuplicateIndex(index_path=self.index_path).entries), 3)
+
+    def test_lookup_is_fast(self):
+        """Banded lookups stay sub-millisecond on a large index."""
+        for i in range(20000):
+            self.index._insert(f"{i:064x}", {"fingerprint": hash(("job", i)) & ((1 << 64) - 1), "folder": None})
+        fingerprint = simhash(self.job["description"])
+        start = time.perf_counter()
+        for _ in range(100):
+            self.index.find_similar(None, fingerprint)
+        self.assertLess((time.perf_counter() - start) / 100, 0.001)
+
+
+if __name__ == "__main__":
+    unittest.main()
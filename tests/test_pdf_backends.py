@@ -0,0 +1,79 @@
+"""
+tests/test_pdf_backends.py
+Unit tests for the PDF backends and the backend benchmark.
+"""
+
+import os
+import tempfile
+import unittest
+from playwright.sync_api import sync_playwright
+from core.pdf_backends import PDFBackendFactory, XHTML2PDFBackend, ChromiumPDFBackend
+from core.pdf_generator import build_html
+from scripts.benchmark_pdf import benchmark_backend, run_isolated
+
+HTML = build_html("# Ana Silva\n\n### Experience\n- Built data pipelines")
+CORPUS = [("resume.md", "# Ana Silva\n\n- Python"), ("cover.md", "Dear team,\n\nI am writing...")]
+
+
+def _chromium_installed():
+    with sync_playwright() as p:
+        return os.path.exists(p.chromium.executable_path)
+
+
+class TestXHTML2PDFBackend(unittest.TestCase):
+    def test_renders_a_pdf(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            dest = os.path.join(tmp, "out.pdf")
+            backend = PDFBackendFactory.get_backend("xhtml2pdf")
+            self.assertIsInstance(backend, XHTML2PDFBackend)
+            backend.render(HTML, dest)
+            backend.close()
+            with open(dest, "rb") as f:
+                self.assertEqual(f.read(5), b"%PDF-")
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            PDFBackendFactory.get_backend("wkhtmltopdf")
+
+
+class TestChromiumPDFBackend(unittest.TestCase):
+    def test_browser_starts_lazily_and_close_is_idempotent(self):
+        backend = PDFBackendFactory.get_backend(" Chromium ")
+        self.assertIsInstance(backend, ChromiumPDFBackend)
+        self.assertIsNone(backend._browser)
+        backend.close()
+        backend.close()
+        self.assertIsNone(backend._playwright)
+
+    @unittest.skipUnless(_chromium_installed(), "Chromium not installed (playwright install chromium)")
+    def test_reuses_one_page_across_renders(self):
+        backend = ChromiumPDFBackend()
+        with tempfile.TemporaryDirectory() as tmp:
+            try:
+                backend.render(HTML, os.path.join(tmp, "a.pdf"))
+                page = backend._page
+                backend.render(HTML, os.path.join(tmp, "b.pdf"))
+                self.assertIs(backend._page, page)
+            finally:
+                backend.close()
+            for name in ("a.pdf", "b.pdf"):
+                with open(os.path.join(tmp, name), "rb") as f:
+                    self.assertEqual(f.read(5), b"%PDF-")
+        self.assertIsNone(backend._browser)
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_runs_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            benchmark_backend("xhtml2pdf", CORPUS, runs=0)
+
+    def test_isolated_run_reports_its_own_memory(self):
+        result = run_isolated("xhtml2pdf", CORPUS, runs=2)
+        self.assertEqual(result["documents"], 2)
+        self.assertGreater(result["max_rss_mb"], 0)
+        self.assertIn("helper_rss_mb", result)
+        self.assertGreater(result["avg_size_kb"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+"""
+tests/test_pdf_service.py
+Unit tests for the process-pool PDF render service.
+"""
+
+import os
+import signal
+import time
+import tempfile
+import unittest
+from unittest import mock
+from concurrent.futures.process import BrokenProcessPool
+from core.pdf_service import PDFRenderService
+from core.file_manager import JobFileManager
+from core.master_log import MasterLogWriter
+
+RESUME_MD = "# Ana Silva\n\n### Experience\n- Built data pipelines"
+
+
+class TestPDFRenderService(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.out_dir = self.tmp.name
+        # Workers are forked after this, so they render into a private cache
+        self.env = mock.patch.dict(os.environ, {"PDF_CACHE_DIR": os.path.join(self.tmp.name, "cache"),
+                                                "PDF_BACKEND": "xhtml2pdf", "USER_FULL_NAME": "Ana"})
+        self.env.start()
+        self.service = PDFRenderService(max_workers=1)
+
+    def tearDown(self):
+        self.service.shutdown(wait=True)
+        self.env.stop()
+        self.tmp.cleanup()
+
+    def test_submit_job_returns_one_future_per_document(self):
+        futures = self.service.submit_job({"Resume_Eng": RESUME_MD, "CoverLetter_Eng": "Dear team"}, self.out_dir)
+        self.assertEqual(set(futures), {"Resume_Eng", "CoverLetter_Eng"})
+        for title, future in futures.items():
+            outcome = self.service.collect(title, self.out_dir, future)
+            self.assertIsNone(outcome["error"])
+            self.assertEqual(outcome["status"], "rendered")
+            self.assertTrue(os.path.exists(outcome["pdf_path"]))
+        self.assertEqual(self.service.stats["rendered"], 2)
+
+    def test_second_render_is_a_cache_hit(self):
+        self.service.render_many([({"Resume_Eng": RESUME_MD}, self.out_dir)])
+        outcome, = self.service.render_many([({"Resume_Eng": RESUME_MD}, self.out_dir)])
+        self.assertIn(outcome["status"], ("linked", "skipped"))
+        self.assertEqual(self.service.cache_stats()["hits"], 1)
+
+    def test_broken_pool_is_restarted(self):
+        """Documents submitted after a worker died go to a fresh pool instead of failing."""
+        self.service.render_many([({"Resume_Eng": RESUME_MD}, self.out_dir)])
+        executor = self.service._executor
+        for process in list(executor._processes.values()):
+            os.kill(process.pid, signal.SIGKILL)
+        deadline = time.monotonic() + 10
+        while not executor._broken and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        outcome, = self.service.render_many([({"Resume_Other": RESUME_MD + "!"}, self.out_dir)])
+        self.assertIsNone(outcome["error"])
+        self.assertEqual(outcome["status"], "rendered")
+        self.assertIsNot(self.service._executor, executor)
+
+
+class TestSaveAllPDFGuard(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_failed_submission_keeps_the_export(self):
+        """A pool that cannot accept work only costs the PDFs; files, metadata and CSV row are written."""
+        pdf_service = mock.Mock()
+        pdf_service.submit.side_effect = BrokenProcessPool("worker died")
+        manager = JobFileManager(base_path=os.path.join(self.tmp.name, "out"), pdf_service=pdf_service)
+        manager.master_log = MasterLogWriter(os.path.join(self.tmp.name, "log.csv"), flush_seconds=0)
+
+        job = {"company": "Acme", "title": "Data Engineer", "description": "JD", "url": ""}
+        ai_res = {"files": {"tailored_resume_md": RESUME_MD, "cover_letter_md": "Dear team"}}
+        path = manager.save_all(job, ai_res, "ab" * 32)
+
+        self.assertEqual(pdf_service.submit.call_count, 2)
+        self.assertTrue(os.path.exists(os.path.join(path, "metadata.json")))
+        self.assertTrue(os.path.exists(os.path.join(path, "2_tailored_resume.md")))
+        self.assertEqual(manager.master_log.pending_hashes(), {"ab" * 32})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+"""
+tests/test_pipeline.py
+Unit tests for JobPipeline screening (the AI writer, file manager and pre-screen are faked).
+"""
+
+import os
+import json
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from main import JobPipeline
+from core.near_dup import NearDuplicateIndex
+from core.jd_cleaner import JDNormalizer
+from core.metadata_extractor import MetadataExtractor
+from scrapers.linkedin_manual import LinkedInScraper as SampleJob
+
+
+class TestRepostScreening(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.job = SampleJob().get_job_data(None)
+        self.original = os.path.join(self.tmp.name, "20240101-CircleCI-DE-aaaaaaaa")
+        os.makedirs(self.original)
+
+    def pipeline(self, action):
+        """A JobPipeline with only the parts screen_outcome() uses; the pre-screen rejects every job."""
+        pipeline = JobPipeline.__new__(JobPipeline)
+        pipeline.manager = mock.Mock()
+        pipeline.manager.is_pending.return_value = False
+        pipeline.known_hashes = set()
+        pipeline._dedup_lock = threading.Lock()
+        pipeline.near_dup = NearDuplicateIndex(index_path=os.path.join(self.tmp.name, "near_dup.json"), action=action)
+        pipeline.near_dup.add("a" * 64, self.job["description"], "CircleCI", "DE", self.original)
+        pipeline.extractor = MetadataExtractor()
+        pipeline.jd_normalizer = JDNormalizer()
+        pipeline.prescreener = mock.Mock(action="skip")
+        pipeline.prescreener.score.return_value = {"score": 1}
+        pipeline.prescreener.decide.return_value = (False, "below threshold")
+        return pipeline
+
+    def linked(self):
+        with open(os.path.join(self.original, "linked_postings.json"), encoding="utf-8") as f:
+            return [link["url"] for link in json.load(f)]
+
+    def repost(self):
+        return {**self.job, "url": "https://example.com/repost",
+                "description": self.job["description"].replace("Reposted 4 days ago", "Reposted 1 day ago") + " "}
+
+    def test_flagged_repost_is_linked_and_still_screened(self):
+        pipeline = self.pipeline("flag")
+        self.assertEqual(pipeline.screen_outcome(self.repost()), (None, True))
+        pipeline.prescreener.score.assert_called_once()  # Went on to the pre-screen
+        self.assertEqual(self.linked(), ["https://example.com/repost"])
+
+    def test_skipped_repost_is_linked(self):
+        pipeline = self.pipeline("skip")
+        self.assertEqual(pipeline.screen_outcome(self.repost()), (None, True))
+        pipeline.prescreener.score.assert_not_called()
+        self.assertEqual(self.linked(), ["https://example.com/repost"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+"""
+tests/test_prescreen.py
+Unit tests for the local fit pre-screen.
+"""
+
+import os
+import json
+import tempfile
+import unittest
+from core.prescreen import PreScreener, tokenize, parse_model_score
+
+RESUME = "Senior data engineer. Python, SQL, Airflow, dbt and Snowflake pipelines on AWS. Kafka streaming."
+GOOD_JD = "We need a data engineer to build Airflow and dbt pipelines in Python and SQL on Snowflake and AWS."
+BAD_JD = "Registered nurse for the night shift. Patient care, medication administration and triage."
+
+
+class TestPreScreener(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.resume_path = self.path("resume.txt")
+        with open(self.resume_path, "w", encoding="utf-8") as f:
+            f.write(RESUME)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def screener(self, **kwargs):
+        kwargs.setdefault("min_score", 3.5)
+        kwargs.setdefault("action", "defer")
+        return PreScreener(resume_path=self.resume_path, log_path=self.path("log.csv"),
+                           deferred_path=self.path("deferred.jsonl"), corpus_path=self.path("corpus.json"), **kwargs)
+
+    def test_tokenize_keeps_tech_terms(self):
+        self.assertEqual(tokenize("C++ and Node.js pipelines"), ["c++", "node.js", "pipeline"])
+
+    def test_score_is_pure(self):
+        """Scoring the same JD again (or after other JDs) gives the same result."""
+        screener = self.screener()
+        first = screener.score(GOOD_JD, "Acme")
+        screener.score(BAD_JD)
+        screener.learn("h1", GOOD_JD, "Acme")
+        self.assertEqual(screener.score(GOOD_JD, "Acme"), first)
+        self.assertEqual(screener.doc_count, 1)
+
+    def test_ranks_fit(self):
+        screener = self.screener()
+        good, bad = screener.score(GOOD_JD), screener.score(BAD_JD)
+        self.assertGreater(good["score"], bad["score"])
+        self.assertTrue(screener.decide(good)[0])
+        passed, reason = screener.decide(bad)
+        self.assertFalse(passed)
+        self.assertIn("missing", reason)
+
+    def test_corpus_is_used_by_later_runs(self):
+        screener = self.screener()
+        screener.learn("h1", BAD_JD)
+        screener.learn("h1", BAD_JD)  # Counted once
+        screener.learn("h2", GOOD_JD)
+        self.assertEqual(screener.save_corpus(), 2)
+
+        later = self.screener()
+        self.assertEqual(later.doc_count, 3)
+        self.assertEqual(later.doc_freq["airflow"], 2)  # Resume + GOOD_JD
+
+        # A second run adds to the file instead of replacing it
+        later.learn("h3", GOOD_JD)
+        later.save_corpus()
+        with open(self.path("corpus.json"), encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["doc_count"], 3)
+
+    def test_deferred_jobs_are_reconsidered_when_the_threshold_changes(self):
+        screener = self.screener(min_score=10.5)
+        result = screener.score(GOOD_JD)
+        passed, reason = screener.decide(result)
+        self.assertFalse(passed)
+        screener.record({"company": "Acme", "title": "DE", "description": GOOD_JD}, "h1", result, passed, reason)
+
+        # Same settings: nothing to reconsider, the job stays deferred
+        self.assertEqual(self.screener(min_score=10.5).take_reconsidered(), [])
+
+        lowered = self.screener(min_score=3.5)
+        entries = lowered.take_reconsidered()
+        self.assertEqual([e["job_hash"] for e in entries], ["h1"])
+        self.assertTrue(lowered.decide(lowered.score(entries[0]["job_data"]["description"]))[0])
+        self.assertEqual(lowered.take_reconsidered(), [])
+
+    def test_parse_model_score(self):
+        self.assertEqual(parse_model_score("Score: 7.5/10"), 7.5)
+        self.assertIsNone(parse_model_score("no idea"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+"""
+tests/test_prompt_cache.py
+Unit tests for the resume source and the prompt-prefix context caches.
+"""
+
+import os
+import time
+import tempfile
+import unittest
+from ai.prompt_cache import ResumeSource, GeminiContextCache, LocalContextCache, get_context_cache
+from assets.prompts import GENERATION_PREFIX, JOB_SUFFIX
+
+
+class FakeCaches:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.created = []
+        self.deleted = []
+
+    def create(self, model, config):
+        if self.fail:
+            raise RuntimeError("400 INVALID_ARGUMENT: caching not supported")
+        name = f"cachedContents/{len(self.created)}"
+        self.created.append((model, config))
+        return type("Cache", (), {"name": name})()
+
+    def delete(self, name):
+        self.deleted.append(name)
+
+
+class FakeClient:
+    def __init__(self, fail=False):
+        self.caches = FakeCaches(fail)
+
+
+class TestResumeSource(unittest.TestCase):
+    def test_reload_on_change(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "resume.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("Python developer")
+            source = ResumeSource(path)
+            text, digest = source.load()
+            self.assertEqual(text, "Python developer")
+            self.assertEqual(source.load(), (text, digest))
+
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("Senior Python developer")
+            os.utime(path, ns=(time.time_ns() + 10 ** 9,) * 2)
+            text2, digest2 = source.load()
+            self.assertEqual(text2, "Senior Python developer")
+            self.assertNotEqual(digest, digest2)
+
+    def test_missing_file(self):
+        with self.assertRaises(FileNotFoundError):
+            ResumeSource("does/not/exist.txt").load()
+
+
+class TestPromptSplit(unittest.TestCase):
+    def test_prefix_plus_suffix(self):
+        """The cacheable prefix holds the resume; only the suffix depends on the job."""
+        prefix = GENERATION_PREFIX.format(resume_text="MY RESUME")
+        suffix = JOB_SUFFIX.format(job_title="Data Engineer", company="Acme",
+                                   extraction_fields="- salary", job_description="Build pipelines")
+        self.assertIn("MY RESUME", prefix)
+        self.assertNotIn("Acme", prefix)
+        self.assertIn("Build pipelines", suffix)
+
+
+class TestContextCaches(unittest.TestCase):
+    def setUp(self):
+        self.now = [1000.0]
+        self.cache = GeminiContextCache(ttl_seconds=600, min_tokens=10, clock=lambda: self.now[0])
+        self.prefix = "rules and resume " * 50
+
+    def test_create_then_reuse(self):
+        client = FakeClient()
+        name = self.cache.get(client, "KEY1", "gemini-2.0-flash", self.prefix)
+        self.assertEqual(self.cache.get(client, "KEY1", "gemini-2.0-flash", self.prefix), name)
+        self.assertEqual(len(client.caches.created), 1)
+        self.assertEqual(client.caches.created[0][1]["ttl"], "600s")
+        self.assertEqual(self.cache.stats["hits"], 1)
+
+        # Caches are per key: another project needs its own
+        self.cache.get(client, "KEY2", "gemini-2.0-flash", self.prefix)
+        self.assertEqual(len(client.caches.created), 2)
+
+    def test_changed_prefix_and_expiry(self):
+        client = FakeClient()
+        first = self.cache.get(client, "KEY1", "m", self.prefix)
+        second = self.cache.get(client, "KEY1", "m", self.prefix + "new resume line")
+        self.assertNotEqual(first, second)
+        self.assertEqual(client.caches.deleted, [first])
+
+        self.now[0] += 590  # Within the renewal margin
+        self.assertNotEqual(self.cache.get(client, "KEY1", "m", self.prefix + "new resume line"), second)
+
+    def test_inline_fallbacks(self):
+        self.assertIsNone(self.cache.get(FakeClient(), "KEY1", "m", "short"))
+        client = FakeClient(fail=True)
+        self.assertIsNone(self.cache.get(client, "KEY1", "m", self.prefix))
+        self.assertIsNone(self.cache.get(client, "KEY1", "m", self.prefix))
+        self.assertEqual(self.cache.stats["inline"], 3)
+
+    def test_invalidate(self):
+        client = FakeClient()
+        self.cache.get(client, "KEY1", "m", self.prefix)
+        self.cache.invalidate("KEY1", "m")
+        self.cache.get(client, "KEY1", "m", self.prefix)
+        self.assertEqual(len(client.caches.created), 2)
+
+    def test_local_cache(self):
+        cache = LocalContextCache()
+        name = cache.get(None, "KEY1", "m", self.prefix)
+        self.assertEqual(cache.get(None, "KEY1", "m", self.prefix), name)
+        self.assertEqual(cache.resolve(name), self.prefix)
+        self.assertEqual(cache.stats, {"hits": 1, "created": 1, "inline": 0})
+
+    def test_selection(self):
+        self.assertIsNone(get_context_cache("off"))
+        self.assertIsInstance(get_context_cache("gemini"), GeminiContextCache)
+        with self.assertRaises(ValueError):
+            get_context_cache("redis")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+"""
+tests/test_render_cache.py
+Unit tests for the content-addressed PDF render cache.
+"""
+
+import os
+import tempfile
+import unittest
+from core.render_cache import RenderCache
+
+
+class TestRenderCache(unittest.TestCase):
+    def setUp(self):
+        """Temporary cache and output folders."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = RenderCache(cache_dir=os.path.join(self.tmp.name, "cache"))
+        self.out_dir = os.path.join(self.tmp.name, "job")
+        os.makedirs(self.out_dir)
+        self.pdf_path = os.path.join(self.out_dir, "Resume.pdf")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _fake_render(self, key, content=b"%PDF-1.4 fake"):
+        with open(self.pdf_path, "wb") as f:
+            f.write(content)
+        self.cache.store(key, self.pdf_path)
+
+    def test_key_depends_on_all_inputs(self):
+        """Markdown, template version and user name all change the key."""
+        base = RenderCache.make_key("# CV", "v1", "Ana")
+        self.assertEqual(base, RenderCache.make_key("# CV", "v1", "Ana"))
+        self.assertNotEqual(base, RenderCache.make_key("# CV!", "v1", "Ana"))
+        self.assertNotEqual(base, RenderCache.make_key("# CV", "v2", "Ana"))
+        self.assertNotEqual(base, RenderCache.make_key("# CV", "v1", "Bia"))
+
+    def test_miss_then_skip(self):
+        """A stored render is skipped when the output already matches."""
+        key = RenderCache.make_key("# CV", "v1", "Ana")
+        self.assertIsNone(self.cache.lookup(key, self.pdf_path))
+        self._fake_render(key)
+        self.assertEqual(self.cache.lookup(key, self.pdf_path), "skipped")
+        self.assertEqual(self.cache.stats["misses"], 1)
+        self.assertEqual(self.cache.stats["hits"], 1)
+
+    def test_link_into_new_folder(self):
+        """An identical document for another folder is linked instead of rendered."""
+        key = RenderCache.make_key("# Letter", "v1", "Ana")
+        self._fake_render(key)
+        other_pdf = os.path.join(self.tmp.name, "Other.pdf")
+        self.assertEqual(self.cache.lookup(key, other_pdf), "linked")
+        with open(other_pdf, "rb") as f:
+            self.assertEqual(f.read(), b"%PDF-1.4 fake")
+
+    def test_stale_output_is_replaced(self):
+        """An output that differs from the cached blob gets replaced."""
+        key = RenderCache.make_key("# CV", "v1", "Ana")
+        self._fake_render(key)
+        os.remove(self.pdf_path)
+        with open(self.pdf_path, "wb") as f:
+            f.write(b"edited by hand")
+        self.assertEqual(self.cache.lookup(key, self.pdf_path), "linked")
+
+
+if __name__ == "__main__":
+    unittest.main()
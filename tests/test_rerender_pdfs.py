@@ -0,0 +1,56 @@
+"""
+tests/test_rerender_pdfs.py
+Unit tests for the bulk re-render: PDFs keep the names already in each folder.
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+from scripts.rerender_pdfs import pdf_targets, rerender
+
+
+class TestRerenderNames(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.folder = os.path.join(self.tmp.name, "20260101-Acme-Data_Engineer-abcdef12")
+        os.makedirs(self.folder)
+        self.env = mock.patch.dict(os.environ, {"PDF_CACHE_DIR": os.path.join(self.tmp.name, "cache"),
+                                                "PDF_BACKEND": "xhtml2pdf", "USER_FULL_NAME": "Ana"})
+        self.env.start()
+
+    def tearDown(self):
+        self.env.stop()
+        self.tmp.cleanup()
+
+    def touch(self, *names):
+        for name in names:
+            with open(os.path.join(self.folder, name), "w", encoding="utf-8") as f:
+                f.write("x")
+
+    def test_defaults_to_save_all_names(self):
+        targets = pdf_targets(self.folder, "Data Engineer", {"Resume": "a", "Cover_Letter": "b"})
+        self.assertEqual(set(targets), {"Resume_Data_Engineer", "CoverLetter_Data_Engineer"})
+
+    def test_keeps_sync_utils_names(self):
+        self.touch("Ana_Resume_Acme_Data_Engineer.pdf", "Ana_Cover_Letter_Acme_Data_Engineer.pdf")
+        targets = pdf_targets(self.folder, "Data Engineer", {"Resume": "a", "Cover_Letter": "b"})
+        self.assertEqual(set(targets), {"Resume_Acme_Data_Engineer", "Cover_Letter_Acme_Data_Engineer"})
+
+    def test_rerender_replaces_instead_of_duplicating(self):
+        """Files under an older user name or the other convention are removed after the render."""
+        with open(os.path.join(self.folder, "2_tailored_resume.md"), "w", encoding="utf-8") as f:
+            f.write("# Ana Silva\n\n- Python")
+        self.touch("Ana_Resume_Data_Engineer.pdf", "Ana_Resume_Acme_Data_Engineer.pdf",
+                   "Old_Name_Resume_Data_Engineer.pdf", "notes.pdf")
+
+        summary = rerender([{"path": self.folder, "company": "Acme", "title": "Data Engineer"}], workers=1)
+
+        self.assertEqual(summary["stats"]["rendered"], 1)
+        self.assertEqual(summary["superseded_removed"], 2)
+        pdfs = sorted(f for f in os.listdir(self.folder) if f.endswith(".pdf"))
+        self.assertEqual(pdfs, ["Ana_Resume_Data_Engineer.pdf", "notes.pdf"])
+
+
+if __name__ == "__main__":
+    unittest.main()
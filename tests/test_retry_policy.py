@@ -0,0 +1,109 @@
+"""
+tests/test_retry_policy.py
+Unit tests for error classification, backoff and the circuit breaker.
+"""
+
+import unittest
+from ai.retry_policy import (RetryPolicy, CircuitBreaker, CircuitOpenError,
+                             RATE_LIMIT, TRANSIENT, TIMEOUT, PERMANENT)
+
+
+class FakeAPIError(Exception):
+    """Mimics google.genai.errors.APIError (an HTTP code plus the JSON message)."""
+
+    def __init__(self, code, message):
+        super().__init__(f"{code} {message}")
+        self.code = code
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestClassification(unittest.TestCase):
+    def test_kinds(self):
+        cases = [
+            (FakeAPIError(429, "RESOURCE_EXHAUSTED"), RATE_LIMIT),
+            (FakeAPIError(503, "UNAVAILABLE. The model is overloaded."), TRANSIENT),
+            (FakeAPIError(504, "DEADLINE_EXCEEDED"), TIMEOUT),
+            (FakeAPIError(400, "INVALID_ARGUMENT"), PERMANENT),
+            (TimeoutError("read timed out"), TIMEOUT),
+            (ConnectionResetError("connection reset by peer"), TRANSIENT),
+            (Exception("You exceeded your current quota"), RATE_LIMIT),
+            (ValueError("Expecting value: line 1 column 1"), PERMANENT),
+        ]
+        for error, kind in cases:
+            self.assertEqual(RetryPolicy.classify(error), kind, str(error))
+
+    def test_retry_hint(self):
+        error = FakeAPIError(429, "{'@type': 'type.googleapis.com/google.rpc.RetryInfo', 'retryDelay': '17s'}")
+        self.assertEqual(RetryPolicy.retry_after(error), 17.0)
+        self.assertIsNone(RetryPolicy.retry_after(FakeAPIError(503, "UNAVAILABLE")))
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def setUp(self):
+        self.slept = []
+        self.policy = RetryPolicy(max_attempts=3, base_delay=1, max_delay=8, max_wait=60,
+                                  breaker=CircuitBreaker(threshold=10, reset_timeout=30),
+                                  sleep=self.slept.append)
+
+    def test_backoff_is_bounded_and_honours_hint(self):
+        for attempt in range(6):
+            self.assertLessEqual(self.policy.backoff(attempt), 8)
+        self.assertGreaterEqual(self.policy.backoff(0, hint=20), 20)
+
+    def test_transient_errors_retry_until_attempts_run_out(self):
+        error = FakeAPIError(503, "UNAVAILABLE")
+        for attempt in range(3):
+            kind, delay = self.policy.decide(error, attempt)
+            self.assertEqual(kind, TRANSIENT)
+            self.assertIsNotNone(delay)
+        self.assertIsNone(self.policy.decide(error, 3)[1])
+        self.assertEqual(self.policy.metrics["retry.transient"], 3)
+        self.assertEqual(self.policy.metrics["fail.transient"], 1)
+
+    def test_quota_that_outlasts_max_wait_is_not_retried(self):
+        self.assertIsNone(self.policy.decide(FakeAPIError(429, "'retryDelay': '3600s'"), 0)[1])
+        self.assertIsNone(self.policy.decide(FakeAPIError(429, "quotaId: GenerateRequestsPerDayPerProject"), 0)[1])
+        self.assertGreaterEqual(self.policy.decide(FakeAPIError(429, "'retryDelay': '12s'"), 0)[1], 12)
+
+    def test_permanent_errors_fail_fast(self):
+        self.assertEqual(self.policy.decide(FakeAPIError(400, "INVALID_ARGUMENT"), 0), (PERMANENT, None))
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_trips_and_recovers(self):
+        clock = FakeClock()
+        policy = RetryPolicy(breaker=CircuitBreaker(threshold=2, reset_timeout=30, clock=clock))
+        error = FakeAPIError(500, "INTERNAL")
+        policy.decide(error, 0)
+        policy.decide(error, 1)
+        self.assertEqual(policy.metrics["breaker.trip"], 1)
+        with self.assertRaises(CircuitOpenError):
+            policy.before_call()
+
+        clock.now = 31
+        policy.before_call()  # half-open: one trial call goes through
+        policy.decide(error, 0)
+        with self.assertRaises(CircuitOpenError):
+            policy.before_call()
+
+        clock.now = 62
+        policy.before_call()
+        policy.record_success()
+        self.assertEqual(policy.breaker.state, "closed")
+
+    def test_rate_limits_do_not_trip(self):
+        breaker = CircuitBreaker(threshold=1, reset_timeout=30)
+        policy = RetryPolicy(breaker=breaker)
+        policy.decide(FakeAPIError(429, "RESOURCE_EXHAUSTED"), 0)
+        self.assertEqual(breaker.state, "closed")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+"""
+tests/test_saved_searches.py
+Unit tests for the daemon's saved searches config, schedule and seen-jobs store.
+"""
+
+import os
+import json
+import tempfile
+import unittest
+from core.saved_searches import load_searches, SearchSchedule, SeenJobs, KEEP_SEEN_DAYS
+
+
+class TestLoadSearches(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "saved_searches.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, config):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(config, f)
+
+    def test_defaults_and_disabled(self):
+        self.write({"interval_minutes": 20, "searches": [
+            {"name": "Data", "url": "https://www.linkedin.com/jobs/search/?keywords=data"},
+            {"url": "https://www.linkedin.com/jobs/search/?keywords=ml", "interval_minutes": 5},
+            {"name": "Paused", "url": "https://x", "enabled": False}
+        ]})
+        searches = load_searches(self.path)
+        self.assertEqual([s["name"] for s in searches], ["Data", "search-2"])
+        self.assertEqual([s["interval_minutes"] for s in searches], [20.0, 5.0])
+
+    def test_missing_url(self):
+        self.write({"searches": [{"name": "Broken"}]})
+        with self.assertRaises(ValueError):
+            load_searches(self.path, default_interval=30)
+
+
+class TestSearchSchedule(unittest.TestCase):
+    def test_due_and_next(self):
+        now = [0.0]
+        schedule = SearchSchedule(clock=lambda: now[0])
+        searches = [{"name": "a", "interval_minutes": 10}, {"name": "b", "interval_minutes": 30}]
+        self.assertEqual(len(schedule.due(searches)), 2)
+        for search in searches:
+            schedule.mark(search)
+        self.assertEqual(schedule.due(searches), [])
+        self.assertEqual(schedule.seconds_until_next(searches), 600)
+
+        now[0] = 600
+        self.assertEqual([s["name"] for s in schedule.due(searches)], ["a"])
+        self.assertIsNone(schedule.seconds_until_next([]))
+
+
+class TestSeenJobs(unittest.TestCase):
+    def test_persist_and_prune(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "seen.json")
+            now = [KEEP_SEEN_DAYS * 86400 * 2]
+            seen = SeenJobs(path, clock=lambda: now[0])
+            seen.add("111")
+            seen.add(None)  # Cards without an id are never remembered
+            seen.ids["old"] = 0
+            seen.save()
+
+            reloaded = SeenJobs(path)
+            self.assertIn("111", reloaded)
+            self.assertNotIn("old", reloaded)
+            self.assertEqual(len(reloaded), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
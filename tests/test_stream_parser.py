@@ -0,0 +1,68 @@
+"""
+tests/test_stream_parser.py
+Unit tests for the incremental parser used in streaming mode.
+"""
+
+import json
+import unittest
+from ai.stream_parser import IncrementalJSONParser, StreamFormatError
+
+
+class TestIncrementalJSONParser(unittest.TestCase):
+    def setUp(self):
+        """A reply shaped like the generation prompt's output, with tricky characters in strings."""
+        self.reply = {
+            "metadata": {"salary": "$133,000—$166,000 CAD", "apply_instructions": "Use the \"Apply\" {button}"},
+            "scores": {"original": 6, "tailored": 9},
+            "analysis": {"fit_report": "Good, }] fit", "gaps": ["Snowflake"], "mitigation_strategy": ""},
+            "files": {"tailored_resume_md": "# Resume\n- a\\b", "cover_letter_md": "Dear team,"}
+        }
+        self.text = "```json\n" + json.dumps(self.reply, indent=4, ensure_ascii=False) + "\n```"
+
+    def _feed(self, parser, size):
+        completed = []
+        for i in range(0, len(self.text), size):
+            completed += [key for key, _ in parser.feed(self.text[i:i + size])]
+        return completed
+
+    def test_sections_complete_in_order(self):
+        """Each section is emitted once, whatever the chunk size."""
+        for size in (1, 7, 64, len(self.text)):
+            parser = IncrementalJSONParser()
+            self.assertEqual(self._feed(parser, size), ["metadata", "scores", "analysis", "files"])
+            self.assertEqual(parser.close(), self.reply)
+
+    def test_metadata_available_before_files(self):
+        """metadata and scores are ready while the documents are still streaming."""
+        parser = IncrementalJSONParser()
+        cut = self.text.index('"files"') + 20
+        completed = [key for key, _ in parser.feed(self.text[:cut])]
+        self.assertEqual(completed, ["metadata", "scores", "analysis"])
+        self.assertEqual(parser.sections["scores"]["tailored"], 9)
+
+    def test_truncated_stream(self):
+        """A reply that stops mid-object fails on close()."""
+        parser = IncrementalJSONParser()
+        parser.feed(self.text[:len(self.text) // 2])
+        with self.assertRaises(StreamFormatError):
+            parser.close()
+
+    def test_text_after_the_object_is_ignored(self):
+        """Prose after a complete object does not throw away the reply."""
+        parser = IncrementalJSONParser()
+        completed = [key for key, _ in parser.feed(json.dumps(self.reply) + "\n\nLet me know")]
+        completed += [key for key, _ in parser.feed(" if you need changes!")]
+        self.assertEqual(completed, ["metadata", "scores", "analysis", "files"])
+        self.assertEqual(parser.close(), self.reply)
+        self.assertEqual(parser.trailing_text, "Let me know if you need changes!")
+
+    def test_broken_stream_detected_early(self):
+        """Prose instead of JSON and mismatched brackets fail on the chunk that breaks."""
+        with self.assertRaises(StreamFormatError):
+            IncrementalJSONParser().feed("Sure! Here is")
+        with self.assertRaises(StreamFormatError):
+            IncrementalJSONParser().feed('{"metadata": {"salary": "x"], ')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,163 @@
+"""
+tests/test_usage_tracker.py
+Unit tests for per-key/model usage accounting, throttling and the quota forecast.
+"""
+
+import os
+import json
+import shutil
+import tempfile
+import threading
+import unittest
+from core.usage_tracker import UsageTracker, parse_limits, parse_model_limits, key_id
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_790_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestUsageTracker(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "ai_usage.json")
+        self.clock = FakeClock()
+        self.limits = {"rpm": 2, "tpm": 10_000, "rpd": 6}
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def tracker(self):
+        return UsageTracker(self.path, limits=self.limits, clock=self.clock)
+
+    def test_parse_limits(self):
+        self.assertEqual(parse_limits("rpd=0, rpm=5"), {"rpm": 5, "tpm": 0, "rpd": 0})
+        self.assertEqual(parse_model_limits("lite:rpd=1500; pro : rpm=2", base=self.limits),
+                         {"lite": {"rpm": 2, "tpm": 10_000, "rpd": 1500}, "pro": {"rpm": 2, "tpm": 10_000, "rpd": 6}})
+
+    def test_no_limits_unless_configured(self):
+        tracker = UsageTracker(self.path, limits=parse_limits(""), model_limits={}, clock=self.clock)
+        for _ in range(300):
+            tracker.record("A", "m", 1, 1, 0)
+        self.assertFalse(tracker.is_exhausted("A", "m"))
+        self.assertEqual(tracker.throttle_delay("A", "m"), 0)
+
+    def test_totals_are_persisted_without_the_key(self):
+        tracker = self.tracker()
+        tracker.begin_job()
+        tracker.record("SECRET-KEY", "gemini-2.0-flash", 1000, 500, 2.5)
+        tracker.record("SECRET-KEY", "gemini-2.0-flash-lite", 200, 10, 0.5)
+        self.assertEqual(tracker.end_job(), {"requests": 2, "prompt_tokens": 1200, "output_tokens": 510,
+                                             "seconds": 3.0})
+
+        with open(self.path, encoding="utf-8") as f:
+            raw = f.read()
+        self.assertNotIn("SECRET-KEY", raw)
+        day = json.loads(raw)["days"][tracker.today()][key_id("SECRET-KEY")]
+        self.assertEqual(day["requests"], 2)
+        self.assertEqual(day["models"]["gemini-2.0-flash-lite"]["output_tokens"], 10)
+
+        # A new process keeps counting against the same daily budget, per model
+        self.assertEqual(self.tracker().requests_left("SECRET-KEY", "gemini-2.0-flash"), 5)
+        self.assertEqual(self.tracker().requests_left("SECRET-KEY", "gemini-2.0-flash-lite"), 5)
+
+    def test_daily_budget_and_forecast(self):
+        tracker = self.tracker()
+        for _ in range(2):
+            tracker.begin_job()
+            tracker.record("A", "m", 100, 100, 1)
+            tracker.record("A", "m", 100, 100, 1)
+            tracker.end_job()
+        forecast = tracker.forecast(["A", "B"], ["m"])
+        self.assertEqual(forecast["requests_left"], 2 + 6)
+        self.assertEqual(forecast["calls_per_job"], 2.0)
+        self.assertEqual(forecast["jobs_left"], 4)
+
+        tracker.record("A", "m", 1, 1, 0)
+        tracker.record("A", "m", 1, 1, 0)
+        self.assertTrue(tracker.is_exhausted("A", "m"))
+        self.assertFalse(tracker.is_exhausted("A", "other"))
+        self.assertFalse(tracker.is_exhausted("B", "m"))
+
+        # The budget resets the next (Pacific) day
+        self.clock.now += 86400
+        self.assertEqual(tracker.requests_left("A", "m"), 6)
+
+    def test_staged_forecast_is_bounded_per_model(self):
+        """Analysis and rewrite calls count against their own model's budget."""
+        tracker = UsageTracker(self.path, limits=self.limits, clock=self.clock,
+                               model_limits={"lite": {"rpm": 0, "tpm": 0, "rpd": 100}})
+        for _ in range(2):
+            tracker.begin_job()
+            tracker.record("A", "lite", 100, 100, 1)
+            tracker.record("A", "lite", 100, 100, 1)
+            tracker.record("A", "strong", 100, 100, 1)
+            tracker.end_job()
+        forecast = tracker.forecast(["A"], ["lite", "strong"])
+        self.assertEqual(forecast["model"], "strong")
+        self.assertEqual(forecast["requests_left"], 6 - 2)
+        self.assertEqual(forecast["calls_per_job"], 1.0)
+        self.assertEqual(forecast["jobs_left"], 4)
+
+    def test_throttle_per_minute(self):
+        tracker = self.tracker()
+        tracker.record("A", "m", 100, 100, 1)
+        self.clock.now += 10
+        tracker.record("A", "m", 100, 100, 1)
+        self.assertAlmostEqual(tracker.throttle_delay("A", "m"), 50)
+        self.assertEqual(tracker.throttle_delay("A", "other"), 0)
+        self.assertEqual(tracker.throttle_delay("B", "m"), 0)
+        self.clock.now += 51
+        self.assertEqual(tracker.throttle_delay("A", "m"), 0)
+
+        # Token budget: a large prompt waits for older calls to leave the window
+        self.assertGreater(tracker.throttle_delay("A", "m", upcoming_tokens=9_900), 0)
+
+    def test_processes_sharing_the_file_add_up(self):
+        """The daemon, API server and CLI each add their calls to the same daily budget."""
+        daemon, api = self.tracker(), self.tracker()
+        for _ in range(2):
+            daemon.record("A", "m", 10, 10, 1)
+            api.record("A", "m", 10, 10, 1)
+        self.assertEqual(daemon.requests_left("A", "m"), 2)
+        self.assertEqual(self.tracker().requests_left("A", "m"), 2)
+        with open(self.path, encoding="utf-8") as f:
+            runs = json.load(f)["runs"]
+        self.assertEqual(sorted(r["requests"] for r in runs), [2, 2])
+
+    def test_reserve_takes_the_slot(self):
+        """Concurrent workers cannot all pass the per-minute check before any call is recorded."""
+        tracker = self.tracker()
+        delays = []
+        barrier = threading.Barrier(3)
+
+        def worker():
+            barrier.wait()
+            delays.append(tracker.reserve("A", "m", upcoming_tokens=100))
+
+        threads = [threading.Thread(target=worker) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(delays)[:2], [0, 0])  # rpm=2
+        self.assertGreater(max(delays), 0)
+
+        # The recorded call replaces its reserved estimate instead of taking a second slot
+        tracker.reserve("B", "m", upcoming_tokens=100)
+        tracker.record("B", "m", 4000, 4000, 1)
+        self.assertEqual(tracker.throttle_delay("B", "m"), 0)
+        self.assertGreater(tracker.throttle_delay("B", "m", upcoming_tokens=2_500), 0)
+
+    def test_unlimited(self):
+        tracker = UsageTracker(self.path, limits={"rpm": 0, "tpm": 0, "rpd": 0}, clock=self.clock)
+        tracker.record("A", "m", 1, 1, 0)
+        self.assertIsNone(tracker.forecast(["A"], ["m"])["jobs_left"])
+        self.assertFalse(tracker.is_exhausted("A", "m"))
+
+
+if __name__ == "__main__":
+    unittest.main()
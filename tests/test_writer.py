@@ -0,0 +1,243 @@
+"""
+tests/test_writer.py
+Unit tests for AIWriter request handling (no network: the model call is patched).
+"""
+
+import os
+import json
+import tempfile
+import unittest
+from unittest import mock
+from ai.writer import AIWriter, InvalidResultError, QuotaExhaustedError
+from ai.prompt_cache import LocalContextCache
+from core.usage_tracker import UsageTracker
+
+
+def full_result(name):
+    return {
+        "metadata": {},
+        "scores": {"original": 6, "tailored": 8},
+        "analysis": {"fit_report": f"fit {name}", "gaps": ["k8s"], "mitigation_strategy": "learn"},
+        "files": {"tailored_resume_md": f"# Resume {name}", "cover_letter_md": f"Dear {name}"}
+    }
+
+
+def job(name):
+    return {"job_description": f"JD {name}", "job_title": name, "company": "Acme", "known_metadata": {}}
+
+
+class WriterTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.env = mock.patch.dict(os.environ, {"GEMINI_API_KEYS": "key-a\nkey-b", "AI_CONTEXT_CACHE": "none",
+                                                "AI_STREAM": "false", "AI_BATCH_SIZE": "4"})
+        self.env.start()
+        self.writer = AIWriter(usage=UsageTracker(path=os.path.join(self.tmp.name, "usage.json"), limits={}))
+        self.writer.retry_policy.wait = lambda seconds: None
+
+    def tearDown(self):
+        self.env.stop()
+        self.tmp.cleanup()
+
+
+class TestProcessBatch(WriterTestCase):
+    def batch_reply(self, *members):
+        return json.dumps({"jobs": [{"job_id": job_id, "result": result} for job_id, result in members]})
+
+    def test_failed_member_keeps_the_others(self):
+        """A member whose single-job fallback raises comes back as its error; the rest are kept."""
+        reply = self.batch_reply(("job0", full_result("a")), ("job2", full_result("c")))
+        with mock.patch.object(self.writer, "_call_model", return_value=reply), \
+                mock.patch.object(self.writer, "process_application", side_effect=InvalidResultError("bad")):
+            results = self.writer.process_batch([job("a"), job("b"), job("c")])
+
+        self.assertEqual(results[0]["files"]["cover_letter_md"], "Dear a")
+        self.assertIsInstance(results[1], InvalidResultError)
+        self.assertEqual(results[2]["files"]["cover_letter_md"], "Dear c")
+
+    def test_quota_error_of_one_member_is_returned(self):
+        reply = self.batch_reply(("job0", full_result("a")))
+        with mock.patch.object(self.writer, "_call_model", return_value=reply), \
+                mock.patch.object(self.writer, "process_application", side_effect=QuotaExhaustedError("429")):
+            results = self.writer.process_batch([job("a"), job("b")])
+        self.assertIn("files", results[0])
+        self.assertIsInstance(results[1], QuotaExhaustedError)
+
+    def test_batch_reuses_the_single_job_cache(self):
+        """Batched requests send only the job blocks; rules and resume are the cached prefix."""
+        configs = []
+
+        def generate_content(model, contents, config):
+            configs.append((contents, config.get("cached_content")))
+            if "job_id=job0" in contents:
+                return mock.Mock(text=self.batch_reply(("job0", full_result("a")), ("job1", full_result("b"))),
+                                 usage_metadata=None)
+            return mock.Mock(text=json.dumps(full_result("c")), usage_metadata=None)
+
+        self.writer.context_cache = LocalContextCache()
+        self.writer.client = mock.Mock()
+        self.writer.client.models.generate_content.side_effect = generate_content
+        with mock.patch.object(self.writer.resume, "load", return_value=("MY RESUME", "digest")):
+            self.writer.process_application("JD c", "c", "Acme")
+            results = self.writer.process_batch([job("a"), job("b")])
+
+        self.assertEqual([r["files"]["cover_letter_md"] for r in results], ["Dear a", "Dear b"])
+        (single, single_cache), (batch, batch_cache) = configs
+        self.assertIsNotNone(single_cache)
+        self.assertEqual(batch_cache, single_cache)
+        self.assertNotIn("MY RESUME", batch)
+        self.assertIn("JD a", batch)
+        self.assertEqual(self.writer.context_cache.stats["hits"], 1)
+
+    def test_clamped_batch_size_is_logged_once(self):
+        self.writer.model_name = "gemini-2.0-flash"
+        with mock.patch.object(self.writer, "_load_resume", return_value="x" * 16000), \
+                mock.patch("builtins.print") as printed:
+            self.assertEqual(self.writer.plan_batch_size(["JD"]), 1)
+            self.assertEqual(self.writer.plan_batch_size(["JD"]), 1)
+        messages = [call.args[0] for call in printed.call_args_list if "AI_BATCH_SIZE" in call.args[0]]
+        self.assertEqual(len(messages), 1)
+        self.assertIn("clamped to 1", messages[0])
+
+
+class TestTruncatedReply(WriterTestCase):
+    def test_cut_document_gets_a_followup(self):
+        """A reply cut inside the cover letter asks again for the letter only, never saves 'Dear'."""
+        text = json.dumps(full_result("a"), indent=4)
+        truncated = text[:text.index("Dear a") + 4]
+        followup = json.dumps({"files": {"cover_letter_md": "Dear a, full letter."}})
+        with mock.patch.object(self.writer, "_call_model", side_effect=[truncated, followup]) as call:
+            result = self.writer.process_application("JD", "Data Engineer", "Acme")
+
+        self.assertEqual(call.call_count, 2)
+        followup_prompt = call.call_args_list[1].args[0]
+        self.assertIn('"cover_letter_md"', followup_prompt)
+        self.assertNotIn('"tailored_resume_md"', followup_prompt)
+        self.assertEqual(result["files"]["cover_letter_md"], "Dear a, full letter.")
+        self.assertEqual(result["files"]["tailored_resume_md"], "# Resume a")
+
+
+class TestContextCacheRejected(WriterTestCase):
+    def test_rejected_cache_falls_back_to_inline(self):
+        """A provider that keeps rejecting caches gets one rebuild, then the prefix inline."""
+        def generate_content(model, contents, config):
+            if "cached_content" in config:
+                raise ValueError("400 INVALID_ARGUMENT: cached content not found")
+            return mock.Mock(text=json.dumps({"contents": contents}), usage_metadata=None)
+
+        self.writer.context_cache = LocalContextCache()
+        self.writer.client = mock.Mock()
+        self.writer.client.models.generate_content.side_effect = generate_content
+        text = self.writer._call_model("suffix", prefix="PREFIX ")
+
+        self.assertEqual(json.loads(text), {"contents": "PREFIX suffix"})
+        self.assertEqual(self.writer.client.models.generate_content.call_count, 3)
+        self.assertEqual(self.writer.context_cache.stats["inline"], 1)
+        # Later calls on the same key/model go straight to the inline prefix
+        self.writer._call_model("again", prefix="PREFIX ")
+        self.assertEqual(self.writer.client.models.generate_content.call_count, 4)
+
+
+class TestStagedGeneration(WriterTestCase):
+    """process_staged with a stub client that answers per model."""
+
+    def setUp(self):
+        super().setUp()
+        self.writer.analysis_model = "cheap-model"
+        self.writer.rewrite_model = "strong-model"
+        self.writer.rewrite_min_score = 5
+        self.calls = []
+        self.replies = {}
+        self.writer.client = mock.Mock()
+        self.writer.client.models.generate_content.side_effect = self.generate_content
+
+    def generate_content(self, model, contents, config):
+        self.calls.append((model, contents))
+        return mock.Mock(text=json.dumps(self.replies[model].pop(0)), usage_metadata=None)
+
+    def analysis(self, score, **changes):
+        reply = {"metadata": {"salary": "AI salary", "country": "Canada"}, "scores": {"original": score},
+                 "analysis": {"fit_report": "solid", "gaps": ["k8s"], "mitigation_strategy": "learn"}}
+        reply.update(changes)
+        return reply
+
+    def test_good_fit_calls_both_models_and_merges(self):
+        self.replies = {"cheap-model": [self.analysis(7)],
+                        "strong-model": [{"scores": {"tailored": 9},
+                                          "files": {"tailored_resume_md": "# CV", "cover_letter_md": "Dear"}}]}
+        result = self.writer.process_staged("JD", "Data Engineer", "Acme", {"salary": "$100k"})
+
+        self.assertEqual([model for model, _ in self.calls], ["cheap-model", "strong-model"])
+        self.assertIn("skill GAPS", self.calls[0][1])  # Analysis prefix
+        self.assertIn("Gaps: k8s", self.calls[1][1])  # Rewrite sees the analysis
+        self.assertEqual(result["scores"], {"original": 7, "tailored": 9})
+        self.assertEqual(result["analysis"]["gaps"], ["k8s"])
+        self.assertEqual(result["files"], {"tailored_resume_md": "# CV", "cover_letter_md": "Dear"})
+        # Locally extracted metadata wins over the AI's
+        self.assertEqual(result["metadata"], {"salary": "$100k", "country": "Canada"})
+        self.assertNotIn("status", result)
+        self.assertEqual(self.writer.stage_stats["analysis"]["model"], "cheap-model")
+        self.assertEqual(self.writer.stage_stats["rewrite"]["model"], "strong-model")
+
+    def test_low_fit_skips_the_rewrite_model(self):
+        self.replies = {"cheap-model": [self.analysis(3)]}
+        result = self.writer.process_staged("JD", "Data Engineer", "Acme")
+        self.assertEqual([model for model, _ in self.calls], ["cheap-model"])
+        self.assertEqual(result["status"], "Low Fit")
+        self.assertEqual(result["scores"], {"original": 3, "tailored": None})
+        self.assertEqual(result["files"], {"tailored_resume_md": "", "cover_letter_md": ""})
+
+    def test_incomplete_analysis_is_completed_by_the_analysis_model(self):
+        """A missing analysis field is asked again of the cheap model only, then merged."""
+        incomplete = self.analysis(7, analysis={"fit_report": "solid", "gaps": ["k8s"]})
+        self.replies = {"cheap-model": [incomplete, {"analysis": {"mitigation_strategy": "pair on infra"}}],
+                        "strong-model": [{"scores": {"tailored": 9},
+                                          "files": {"tailored_resume_md": "# CV", "cover_letter_md": "Dear"}}]}
+        result = self.writer.process_staged("JD", "Data Engineer", "Acme")
+
+        self.assertEqual([model for model, _ in self.calls], ["cheap-model", "cheap-model", "strong-model"])
+        self.assertIn("mitigation_strategy", self.calls[1][1])
+        self.assertIn("Mitigation strategy: pair on infra", self.calls[2][1])
+        self.assertEqual(result["analysis"]["mitigation_strategy"], "pair on infra")
+
+    def test_failed_analysis_never_reaches_the_rewrite_model(self):
+        self.replies = {"cheap-model": [{"metadata": {}}, {}]}
+        with self.assertRaises(InvalidResultError):
+            self.writer.process_staged("JD", "Data Engineer", "Acme")
+        self.assertEqual([model for model, _ in self.calls], ["cheap-model", "cheap-model"])
+
+
+class TestKeyPoolAcrossDays(WriterTestCase):
+    def test_new_quota_day_starts_from_the_first_key(self):
+        """Keys used up yesterday are used again today; the forecast counts them again."""
+        now = [1_700_000_000.0]
+        self.writer.usage = UsageTracker(path=os.path.join(self.tmp.name, "days.json"), limits={"rpd": 1},
+                                         model_limits={}, clock=lambda: now[0])
+        self.writer.reset_keys()
+        model = self.writer.model_name
+
+        for key in ("key-a", "key-b"):
+            self.writer._ensure_budget("prompt", model)
+            self.assertEqual(self.writer.key_mgr.get_current_key(), key)
+            self.writer.usage.record(key, model, 10, 10, 0.1)
+        with self.assertRaises(QuotaExhaustedError):
+            self.writer._ensure_budget("prompt", model)
+        self.assertEqual(self.writer.forecast()["jobs_left"], 0)
+
+        now[0] += 86400
+        self.assertEqual(self.writer.forecast()["requests_left"], 1)  # Only the last key is ahead
+        self.writer._ensure_budget("prompt", model)
+        self.assertEqual(self.writer.key_mgr.get_current_key(), "key-a")
+        self.assertEqual(self.writer.forecast()["requests_left"], 2)
+
+    def test_cycle_reset_skips_keys_still_used_up(self):
+        self.writer.usage = UsageTracker(path=os.path.join(self.tmp.name, "days.json"), limits={"rpd": 1},
+                                         model_limits={})
+        self.writer.usage.record("key-a", self.writer.model_name, 10, 10, 0.1)
+        self.writer.key_mgr.current_index = 1
+        self.writer.reset_keys()
+        self.assertEqual(self.writer.key_mgr.get_current_key(), "key-b")
+
+
+if __name__ == "__main__":
+    unittest.main()